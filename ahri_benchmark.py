@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+AHRI Benchmark - offline performance harness for the scraper
+Serves recorded and synthetic directory pages from ahri_fixture_server, drives
+AHRISpecialized6Products against them (headless Chrome, HTTP backend and the
+bare table parser) and writes per-stage timings, rows/sec and memory to a JSON
+report that can be compared across commits
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from statistics import median
+
+from ahri_metrics import browser_memory_mb
+from ahri_fixture_server import FixtureDirectory, render_results_page, start_fixture_server
+from ahri_table_parser import iter_row_products, parse_results_table_html
+
+DEFAULT_OUTPUT_DIR = "bench_results"
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageTimer:
+    """Collects wall-clock samples per stage name"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def time(self, stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.samples.setdefault(stage, []).append(time.perf_counter() - start)
+
+    def summary(self):
+        return {
+            stage: {"count": len(s), "total_s": round(sum(s), 4), "median_s": round(median(s), 4),
+                    "max_s": round(max(s), 4)}
+            for stage, s in self.samples.items()
+        }
+
+
+def make_scraper(base_url, work_dir, backend="selenium", lean=False):
+    from selenium_scraper import AHRISpecialized6Products
+
+    scraper = AHRISpecialized6Products(headless=True, backend=backend, base_url=base_url)
+    scraper.lean = lean
+    scraper.dedup_file = os.path.join(work_dir, f"dedup-{backend}-{time.time_ns()}.sqlite")
+    scraper.max_per_brand = 0  # every served row should be read, not sampled away
+    for category_info in scraper.categories.values():
+        category_info["target"] = 0
+    return scraper
+
+
+def bench_selenium(base_url, work_dir, categories=None, lean=False):
+    """Drive Chrome through homepage → card → search → every results page"""
+    scraper = make_scraper(base_url, work_dir, lean=lean)
+    timer = StageTimer()
+    rows = 0
+    accepted = 0
+
+    if not timer.time("setup_driver", scraper.setup_driver):
+        return {"error": "WebDriver setup failed (is Chrome installed?)"}
+
+    start = time.perf_counter()
+    browser_peak = None
+    try:
+        for category_name, category_info in scraper.categories.items():
+            if categories and category_name not in categories:
+                continue
+            if not timer.time("go_to_homepage_fresh", scraper.go_to_homepage_fresh):
+                continue
+            if not timer.time("find_and_click_category_card", scraper.find_and_click_category_card,
+                              category_name, category_info):
+                continue
+            if not timer.time("click_search_button_and_wait", scraper.click_search_button_and_wait):
+                continue
+
+            while True:
+                page_rows = timer.time("extract_table_rows", scraper.extract_table_rows) or []
+                products = timer.time("extract_table_data", scraper.extract_table_data, category_name, 0)
+                rows += max(0, len(page_rows) - 1)
+                accepted += len(products)
+                if not timer.time("go_to_next_page", scraper.go_to_next_page):
+                    break
+
+            memory = browser_memory_mb(scraper.driver)
+            if memory is not None:
+                browser_peak = max(browser_peak or 0, memory)
+    finally:
+        elapsed = time.perf_counter() - start
+        if scraper.dedup_index:
+            scraper.dedup_index.close()
+        scraper.driver.quit()
+
+    # extract_table_data re-reads the page itself, so rows/sec counts its time only
+    extract_s = sum(timer.samples.get("extract_table_data", [])) or None
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "rows_read": rows,
+        "products_accepted": accepted,
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else None,
+        "extract_rows_per_s": round(rows / extract_s, 1) if extract_s else None,
+        "browser_memory_mb": browser_peak,
+        "stages": timer.summary()
+    }
+
+
+def bench_http(base_url, work_dir, page_size):
+    """Browserless backend: paged search endpoint with prefetch"""
+    scraper = make_scraper(base_url, work_dir, backend="http")
+    scraper.api_page_size = page_size
+    scraper.setup_http_session()
+    timer = StageTimer()
+    rows = 0
+
+    start = time.perf_counter()
+    for category_name, category_info in scraper.categories.items():
+        def read_category():
+            count = 0
+            pages = scraper.iter_http_result_pages(category_name, category_info)
+            for _ in scraper.iter_category_products(category_name, 0, pages):
+                count += 1
+            return count
+        rows += timer.time("http_category", read_category)
+    elapsed = time.perf_counter() - start
+    scraper.dedup_index.close()
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "products_accepted": rows,
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else None,
+        "stages": timer.summary()
+    }
+
+
+def bench_parser(directory, repeat=3):
+    """Parse each category's whole table as one rendered page (no browser, no network)"""
+    timer = StageTimer()
+    rows = 0
+    for program, (category_name, _, table_rows) in directory.tables.items():
+        document = render_results_page(directory, program, 1, page_size=max(1, len(table_rows)))
+        for _ in range(repeat):
+            table = timer.time("parse_results_table_html", parse_results_table_html, document)
+            products = timer.time("iter_row_products", lambda: list(iter_row_products(category_name, table)))
+        rows += len(products)
+
+    parse_s = sum(timer.samples["parse_results_table_html"]) / repeat
+    return {
+        "rows_parsed": rows,
+        "rows_per_s": round(rows / parse_s, 1) if parse_s else None,
+        "stages": timer.summary()
+    }
+
+
+def compare(report, baseline):
+    """Print median stage deltas and throughput change against an earlier report"""
+    print(f"\n📊 vs {baseline.get('git_revision')} ({baseline.get('timestamp')})")
+    for scenario, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if not before or "stages" not in result or "stages" not in before:
+            continue
+        print(f"   {scenario}:")
+        for stage, stats in result["stages"].items():
+            old = before["stages"].get(stage)
+            if old and old["median_s"]:
+                change = (stats["median_s"] - old["median_s"]) / old["median_s"] * 100
+                print(f"     • {stage}: {old['median_s']:.4f}s → {stats['median_s']:.4f}s ({change:+.1f}%)")
+        if result.get("rows_per_s") and before.get("rows_per_s"):
+            print(f"     • rows/s: {before['rows_per_s']} → {result['rows_per_s']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline AHRI scraper benchmark against a local fixture server")
+    parser.add_argument("--scenarios", default="parser,http,selenium",
+                        help="comma-separated subset of parser,http,selenium")
+    parser.add_argument("--rows", type=int, default=10000,
+                        help="synthetic rows per category (0 = recorded rows only)")
+    parser.add_argument("--page-size", type=int, default=250, help="rows per rendered results page")
+    parser.add_argument("--latency-ms", type=int, default=0, help="added server latency per request")
+    parser.add_argument("--recorded", default="ahri_6_products_results.json", help="recorded results to serve")
+    parser.add_argument("--recorded-html", default=None, help="directory of captured pages served verbatim")
+    parser.add_argument("--lean", action="store_true", help="use the lean headless browser profile")
+    parser.add_argument("--category", action="append", default=None, help="limit the selenium scenario (repeatable)")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--compare", default=None, metavar="REPORT", help="earlier report to diff against")
+    args = parser.parse_args()
+
+    from selenium_scraper import AHRISpecialized6Products
+
+    directory = FixtureDirectory(AHRISpecialized6Products().categories, recorded_path=args.recorded,
+                                 synthetic_rows=args.rows, page_size=args.page_size,
+                                 recorded_html_dir=args.recorded_html, latency_ms=args.latency_ms)
+    server, base_url = start_fixture_server(directory)
+    print(f"🧪 Fixture directory at {base_url} "
+          f"({sum(len(t[2]) for t in directory.tables.values())} rows, {args.page_size}/page)")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "config": {"rows": args.rows, "page_size": args.page_size, "latency_ms": args.latency_ms, "lean": args.lean},
+        "scenarios": {}
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scenario in args.scenarios.split(","):
+            print(f"⏱️  {scenario}...")
+            if scenario == "parser":
+                result = bench_parser(directory)
+            elif scenario == "http":
+                result = bench_http(base_url, work_dir, args.page_size)
+            elif scenario == "selenium":
+                result = bench_selenium(base_url, work_dir, args.category, args.lean)
+            else:
+                print(f"❌ Unknown scenario {scenario}")
+                continue
+            report["scenarios"][scenario] = result
+            print(f"   {json.dumps({k: v for k, v in result.items() if k != 'stages'})}")
+
+    server.shutdown()
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['git_revision'] or 'nogit'}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved to {output_path} (peak RSS {report['peak_rss_mb']} MB)")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+AHRI Catalog Build - post-scrape normalization for the HVAC catalog UI
+Canonicalizes brands, resolves brand / series / model fields once per category
+schema and writes normalized records plus precomputed lookup maps
+(brand -> category -> series -> record ids, model number -> record ids)
+"""
+
+import os
+import sys
+import json
+import time
+from collections import OrderedDict
+
+from ahri_dedup_index import MODEL_FIELDS
+
+DEFAULT_INPUT = "ahri_6_products_results.json"
+DEFAULT_OUTPUT = os.path.join("hvac-catalog", "src", "catalog_index.json")
+SPECS_FILE = "catalog_specs.json"  # written next to the catalog
+
+# Same rules as normalizeBrand in hvac-catalog/src/BrandsPage.js
+GE_BRANDS = {"GE", "GE PROFILE", "GE APPLIANCES"}
+EXCLUDED_BRANDS = {"ALSETRIA", "IDEAL USA", "PUREPRO", "STATE", "BRYANT HEATING AND COOLING SYSTEMS"}
+BRAND_PREFIXES = ["KEPLER", "RUUD", "SAINT ROCH"]
+
+# Field priority the UI uses when reading a product
+SERIES_FIELDS = ["Outdoor Unit Series Name", "Indoor Unit Series Name", "Series Name"]
+META_FIELDS = ("extraction_timestamp", "data_source", "product_category")
+
+
+def canonical_brand(raw):
+    """Canonical brand name, or None for brands the catalog excludes"""
+    if not raw or not str(raw).strip():
+        return None
+    upper = str(raw).strip().upper()
+    if upper in GE_BRANDS:
+        return "GE"
+    if upper in EXCLUDED_BRANDS:
+        return None
+    for prefix in BRAND_PREFIXES:
+        if upper.startswith(prefix):
+            return prefix
+    return upper
+
+
+def resolve_schema(products):
+    """Ordered brand / series / model field candidates present in one category"""
+    headers = list(OrderedDict((key, None) for product in products for key in product))
+    return {
+        "brand": [h for h in headers if "brand" in h.lower() and h not in META_FIELDS],
+        "series": [f for f in SERIES_FIELDS if f in headers],
+        "model": [f for f in MODEL_FIELDS if f in headers]
+    }
+
+
+def first_value(product, fields):
+    for field in fields:
+        value = product.get(field)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+
+def build_catalog(data):
+    """Normalized records plus lookup maps from a scraper results document"""
+    records = []
+    brand_index = {}
+    model_index = {}
+    ref_index = {}
+    schemas = {}
+
+    for category, products in data.get("products_by_category", {}).items():
+        schema = resolve_schema(products)
+        schemas[category] = schema
+
+        for product in products:
+            record_id = len(records)
+            brand = canonical_brand(first_value(product, schema["brand"]))
+            series = first_value(product, schema["series"])
+            model = first_value(product, schema["model"])
+            ref = product.get("AHRI Ref. #")
+
+            records.append({
+                "id": record_id,
+                "ref": ref,
+                "brand": brand,
+                "category": category,
+                "series": series,
+                "model": model,
+                "product": product
+            })
+
+            if brand:
+                # Products without a series are listed directly under their category
+                group = series or category
+                brand_index.setdefault(brand, {}).setdefault(category, {}).setdefault(group, []).append(record_id)
+            if model:
+                model_index.setdefault(model, []).append(record_id)
+            if ref:
+                ref_index[ref] = record_id
+
+    # Stable, sorted map ordering so the UI can render keys as-is
+    brand_index = {
+        brand: {category: dict(sorted(groups.items())) for category, groups in sorted(categories.items())}
+        for brand, categories in sorted(brand_index.items())
+    }
+
+    return {
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source_summary": data.get("scraping_summary", {}),
+        "brands": list(brand_index),
+        "categories": list(data.get("products_by_category", {})),
+        "schemas": schemas,
+        "records": records,
+        "brand_index": brand_index,
+        "model_index": model_index,
+        "ref_index": ref_index
+    }
+
+
+def spec_table(catalog):
+    """Spec columns per category plus one row of values per record id (None = no value)"""
+    columns = {}
+    for record in catalog["records"]:
+        seen = columns.setdefault(record["category"], OrderedDict())
+        for key in record["product"]:
+            if key not in META_FIELDS:
+                seen[key] = None
+    columns = {category: list(keys) for category, keys in columns.items()}
+    rows = [[record["product"].get(key) for key in columns[record["category"]]] for record in catalog["records"]]
+    return {"columns": columns, "rows": rows}
+
+
+def _write_json(data, output_path):
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, output_path)
+
+
+def write_catalog(catalog, output_path, specs_path=None):
+    """Write the normalized catalog minified; the raw spec fields go to specs_path, if given
+
+    Records on disk carry only the resolved entity fields (id, ref, brand,
+    category, series, model) - the full product stays out of the index.
+    """
+    entities = [{key: value for key, value in record.items() if key != "product"} for record in catalog["records"]]
+    _write_json({**catalog, "records": entities}, output_path)
+    if specs_path:
+        _write_json(spec_table(catalog), specs_path)
+
+
+def main():
+    """Build the catalog index: ahri_catalog_build.py [results.json] [catalog_index.json] [catalog_specs.json]"""
+    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT
+    output_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT
+    specs_path = sys.argv[3] if len(sys.argv) > 3 else None
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    start = time.perf_counter()
+    catalog = build_catalog(data)
+    write_catalog(catalog, output_path, specs_path)
+    elapsed = time.perf_counter() - start
+
+    print(f"📚 {len(catalog['records'])} records, {len(catalog['brands'])} brands, "
+          f"{len(catalog['model_index'])} model numbers → {output_path} ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+AHRI Columnar - typed, per-category columnar export of the scraped catalog
+Infers a schema per category from the captured table headers, stores numeric
+columns as float64 arrays and text as int32 codes into one shared string
+dictionary (NumPy .npz per category + manifest.json), and loads them back
+with vectorized range filters
+"""
+
+import os
+import re
+import sys
+import json
+import time
+from collections import OrderedDict
+
+DEFAULT_INPUT = "ahri_6_products_results.json"
+DEFAULT_HEADERS = "ahri_6_products_headers.json"
+DEFAULT_OUTPUT_DIR = "ahri_columnar"
+
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+# Identifiers that look numeric but must never be treated as measurements
+_ID_HINTS = ("ref", "#", "model", "name", "phase", "tier")
+
+
+def parse_number(value):
+    """Float for a numeric cell ("29,800" / "15.5"), else None"""
+    text = str(value).replace(",", "").strip()
+    return float(text) if _NUMBER.match(text) else None
+
+
+def is_identifier_column(column):
+    """Columns whose digits are identifiers, never measurements (refs, model numbers, tiers...)"""
+    return any(hint in column.lower() for hint in _ID_HINTS)
+
+
+def category_slug(category):
+    return re.sub(r"[^a-z0-9]+", "_", category.lower()).strip("_")
+
+
+def infer_schema(headers, products):
+    """[(column name, "number" | "string")] in table header order"""
+    columns = list(OrderedDict((h, None) for h in headers if h))
+    # Keys not in the captured header row (metadata, field_N) go after the table columns
+    seen = set(columns)
+    for product in products:
+        for key in product:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+
+    schema = []
+    for column in columns:
+        values = [product[column] for product in products if product.get(column) not in (None, "")]
+        numeric = (bool(values)
+                   and not is_identifier_column(column)
+                   and all(parse_number(v) is not None for v in values))
+        schema.append((column, "number" if numeric else "string"))
+    return schema
+
+
+class StringDictionary:
+    """Shared string -> code table (code -1 means missing)"""
+
+    def __init__(self, strings=None):
+        self.strings = list(strings or [])
+        self.codes = {s: i for i, s in enumerate(self.strings)}
+
+    def encode(self, value):
+        if value in (None, ""):
+            return -1
+        value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+
+def export_columnar(data, output_dir, category_headers=None):
+    """Write one .npz per category plus manifest.json (schemas + string dictionary)"""
+    import numpy as np
+
+    os.makedirs(output_dir, exist_ok=True)
+    category_headers = category_headers or {}
+    dictionary = StringDictionary()
+    manifest = {
+        "version": 1,
+        "source_summary": data.get("scraping_summary", {}),
+        "categories": OrderedDict()
+    }
+
+    for category, products in data.get("products_by_category", {}).items():
+        schema = infer_schema(category_headers.get(category, []), products)
+        arrays = {}
+        columns = []
+        for i, (column, kind) in enumerate(schema):
+            key = f"c{i}"
+            if kind == "number":
+                values = [parse_number(p[column]) if p.get(column) not in (None, "") else None for p in products]
+                arrays[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                arrays[key] = np.array([dictionary.encode(p.get(column)) for p in products], dtype=np.int32)
+            columns.append({"name": column, "key": key, "type": kind})
+
+        filename = category_slug(category) + ".npz"
+        np.savez_compressed(os.path.join(output_dir, filename), **arrays)
+        manifest["categories"][category] = {"file": filename, "rows": len(products), "columns": columns}
+
+    with open(os.path.join(output_dir, "strings.json"), 'w', encoding='utf-8') as f:
+        json.dump(dictionary.strings, f, ensure_ascii=False, separators=(",", ":"))
+    with open(os.path.join(output_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+class CategoryTable:
+    """Typed columns of one category with vectorized filters"""
+
+    def __init__(self, name, meta, arrays, strings, codes):
+        self.name = name
+        self.rows = meta["rows"]
+        self.columns = meta["columns"]
+        self.arrays = arrays
+        self.strings = strings
+        self.codes = codes
+        self.by_name = {c["name"]: c for c in self.columns}
+
+    def resolve(self, column):
+        """Exact column name, or a unique case-insensitive substring ("HSPF2", "Cooling Capacity (95F)")"""
+        if column in self.by_name:
+            return self.by_name[column]
+        matches = [c for c in self.columns if column.lower() in c["name"].lower()]
+        if len(matches) != 1:
+            raise KeyError(f"{column!r} matches {len(matches)} columns in {self.name}")
+        return matches[0]
+
+    def column(self, column):
+        """float64 array for numbers, decoded list of str/None for text"""
+        meta = self.resolve(column)
+        values = self.arrays[meta["key"]]
+        if meta["type"] == "number":
+            return values
+        return [self.strings[code] if code >= 0 else None for code in values.tolist()]
+
+    def mask(self, conditions):
+        """Boolean row mask: {column: (low, high)} inclusive ranges (None = open), or {column: "text"} equality"""
+        import numpy as np
+
+        mask = np.ones(self.rows, dtype=bool)
+        for column, condition in conditions.items():
+            meta = self.resolve(column)
+            values = self.arrays[meta["key"]]
+            if meta["type"] == "number":
+                low, high = condition
+                # NaN (missing) compares False, so rows without a value drop out
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+                if low is None and high is None:
+                    mask &= ~np.isnan(values)
+            else:
+                mask &= values == self.codes.get(condition, -2)
+        return mask
+
+    def records(self, mask=None):
+        """Rebuild product dicts (missing cells omitted) for the selected rows"""
+        import numpy as np
+
+        indices = np.arange(self.rows) if mask is None else np.flatnonzero(mask)
+        decoded = []
+        for meta in self.columns:
+            values = self.arrays[meta["key"]][indices].tolist()
+            if meta["type"] == "number":
+                decoded.append([None if v != v else v for v in values])
+            else:
+                decoded.append([self.strings[c] if c >= 0 else None for c in values])
+
+        for row in range(len(indices)):
+            yield {meta["name"]: column[row] for meta, column in zip(self.columns, decoded)
+                   if column[row] is not None}
+
+
+class ColumnarCatalog:
+    """Loader for an export_columnar() directory; category arrays load lazily"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json"), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(directory, "strings.json"), 'r', encoding='utf-8') as f:
+            self.strings = json.load(f)
+        self.codes = {s: i for i, s in enumerate(self.strings)}
+        self.tables = {}
+
+    @property
+    def categories(self):
+        return list(self.manifest["categories"])
+
+    def table(self, category):
+        import numpy as np
+
+        if category not in self.tables:
+            meta = self.manifest["categories"][category]
+            with np.load(os.path.join(self.directory, meta["file"])) as npz:
+                arrays = {key: npz[key] for key in npz.files}
+            self.tables[category] = CategoryTable(category, meta, arrays, self.strings, self.codes)
+        return self.tables[category]
+
+
+def main():
+    """Export: ahri_columnar.py [results.json] [out_dir] [headers.json]"""
+    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT_DIR
+    headers_path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_HEADERS
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    category_headers = {}
+    if os.path.exists(headers_path):
+        with open(headers_path, 'r', encoding='utf-8') as f:
+            category_headers = json.load(f)
+
+    start = time.perf_counter()
+    manifest = export_columnar(data, output_dir, category_headers)
+    size = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+    print(f"🧱 {len(manifest['categories'])} categories → {output_dir} "
+          f"({size / 1024:.0f} KB, {time.perf_counter() - start:.2f}s)")
+
+    # Example query: heat pumps with HSPF2 >= 8 and 24k-36k BTU/h cooling capacity
+    catalog = ColumnarCatalog(output_dir)
+    if "Air-Source Heat Pumps" in catalog.categories:
+        table = catalog.table("Air-Source Heat Pumps")
+        mask = table.mask({"HSPF2": (8, None), "Cooling Capacity (95F)": (24000, 36000)})
+        print(f"🔎 Heat pumps with HSPF2 ≥ 8 and 24k-36k BTU/h: {int(mask.sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+AHRI Daemon - long-running scraper service with a job queue and warm sessions
+Keeps browser sessions (or one pooled HTTP client) alive between jobs, accepts
+scrape jobs (categories, target, filters) from the Python API or a local HTTP
+API, runs them under a concurrency limit and recycles sessions after N jobs,
+on memory growth or when a health check fails. Job status and results are
+written to disk and served over HTTP - nothing ever waits for a human.
+
+    POST /jobs              {"categories": [...], "target": 50, "max_pages": 2, "max_per_brand": 0}
+    GET  /jobs              all jobs
+    GET  /jobs/<id>         status, counts, summary
+    GET  /jobs/<id>/results the job's results document
+    DELETE /jobs/<id>       cancel a queued job
+    GET  /health            sessions and queue depth
+    GET  /metrics           Prometheus text
+"""
+
+import os
+import json
+import time
+import queue
+import signal
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium_scraper import AHRISpecialized6Products
+from ahri_metrics import RunMetrics, browser_memory_mb
+from ahri_nav_cache import NavigationCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "ahri_jobs"
+JOB_FIELDS = ("categories", "target", "max_pages", "max_per_brand", "max_per_brand_per_category",
+              "sampling", "seed", "incremental")
+
+
+class ScrapeJob:
+    """One queued scrape request and its outcome"""
+
+    def __init__(self, job_id, spec):
+        self.id = job_id
+        self.spec = {k: v for k, v in spec.items() if k in JOB_FIELDS}
+        self.status = "queued"
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.session = None
+        self.results = {}
+        self.summary = None
+        self.error = None
+        self.output_file = None
+        self.done = threading.Event()
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "spec": self.spec,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed_s": round(self.finished - self.started, 3) if self.finished and self.started else None,
+            "session": self.session,
+            "results": self.results,
+            "summary": self.summary,
+            "error": self.error,
+            "output_file": self.output_file
+        }
+
+
+class WarmSession:
+    """A browser session reused across jobs, with its recycling bookkeeping"""
+
+    def __init__(self, number, driver):
+        self.number = number
+        self.driver = driver
+        self.jobs = 0
+        self.created = time.time()
+        self.baseline_mb = browser_memory_mb(driver) if driver else None
+        self.memory_mb = self.baseline_mb
+
+
+class ScraperDaemon:
+    def __init__(self, workers=2, backend="selenium", base_url="https://www.ahridirectory.org",
+                 output_dir=DEFAULT_OUTPUT_DIR, lean=True, profile_dir=None, driver_path=None):
+        self.workers = max(1, int(workers))
+        self.backend = backend
+        self.base_url = base_url
+        self.output_dir = output_dir
+        self.dedup_file = os.path.join(output_dir, "ahri_dedup_index.sqlite")
+        self.nav_cache = NavigationCache(os.path.join(output_dir, "ahri_nav_cache.json"))
+
+        # Recycle a session after this many jobs, or once it grows this much past its first reading
+        self.recycle_after = 50
+        self.max_growth_mb = 750
+
+        self.metrics = RunMetrics()
+        self.jobs = {}
+        self.job_queue = queue.Queue()
+        self.sessions = queue.Queue()
+        self.session_count = 0
+        self.lock = threading.Lock()
+        self.threads = []
+        self.running = False
+
+        # Launcher scraper: owns the browser options, driver cache and warm profile dirs
+        self.launcher = AHRISpecialized6Products(headless=True, backend=backend, base_url=base_url)
+        self.launcher.lean = lean
+        self.launcher.profile_dir = profile_dir
+        self.launcher.driver_path = driver_path
+        self.launcher.metrics = self.metrics
+        self.cookies_accepted = self.launcher.cookies_accepted  # shared: warm sessions keep their consent
+
+    def new_session(self):
+        with self.lock:
+            self.session_count += 1
+            number = self.session_count
+        driver = self.launcher.create_driver() if self.backend != "http" else None
+        self.metrics.count("sessions_started")
+        logger.info(f"🔥 Warm session {number} ready")
+        return WarmSession(number, driver)
+
+    def start(self):
+        """Launch the warm sessions and worker threads"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.backend == "http" and not self.launcher.setup_http_session():
+            raise RuntimeError("HTTP session setup failed")
+
+        for _ in range(self.workers):
+            self.sessions.put(self.new_session())
+
+        self.running = True
+        for n in range(self.workers):
+            thread = threading.Thread(target=self.worker, name=f"ahri-job-{n + 1}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"🛰️  Daemon ready: {self.workers} warm sessions ({self.backend})")
+
+    def stop(self):
+        """Finish running jobs, then quit every session"""
+        self.running = False
+        for _ in self.threads:
+            self.job_queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        while not self.sessions.empty():
+            session = self.sessions.get()
+            if session.driver:
+                try:
+                    session.driver.quit()
+                except Exception:
+                    pass
+        logger.info("✅ Daemon stopped")
+
+    def submit(self, spec):
+        """Queue a job; returns the ScrapeJob (poll .status or wait on .done)"""
+        unknown = [c for c in spec.get("categories") or [] if c not in self.launcher.categories]
+        if unknown:
+            raise ValueError(f"Unknown categories: {unknown}")
+
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 1000000:06d}"
+        job = ScrapeJob(job_id, spec)
+        with self.lock:
+            self.jobs[job_id] = job
+        self.write_status(job)
+        self.job_queue.put(job)
+        self.metrics.count("jobs_submitted")
+        return job
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if not job or job.status != "queued":
+            return False
+        job.status = "cancelled"
+        job.finished = time.time()
+        job.done.set()
+        self.write_status(job)
+        return True
+
+    def job_dir(self, job):
+        return os.path.join(self.output_dir, job.id)
+
+    def write_status(self, job):
+        os.makedirs(self.job_dir(job), exist_ok=True)
+        path = os.path.join(self.job_dir(job), "status.json")
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(job.to_json(), f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def worker(self):
+        while True:
+            job = self.job_queue.get()
+            if job is None:
+                return
+            if job.status == "cancelled":
+                continue
+
+            session = self.sessions.get()
+            try:
+                self.run_job(job, session)
+            finally:
+                self.sessions.put(self.check_session(session))
+
+    def build_scraper(self, job, session):
+        """Fresh per-job scraper state, pointed at the warm session"""
+        spec = job.spec
+        scraper = AHRISpecialized6Products(headless=True, backend=self.backend, base_url=self.base_url)
+        scraper.lean = self.launcher.lean
+        scraper.pause_before_close = False
+        scraper.metrics = self.metrics
+        scraper.cookies_accepted = self.cookies_accepted
+        scraper.nav_cache = self.nav_cache  # results URLs resolved by any job skip the click-through for all
+        scraper.driver = session.driver
+        scraper.http_session = self.launcher.http_session
+
+        if spec.get("categories"):
+            scraper.categories = {name: info for name, info in scraper.categories.items() if name in spec["categories"]}
+        if spec.get("target") is not None:
+            for category_info in scraper.categories.values():
+                category_info["target"] = spec["target"]
+        if spec.get("max_pages") is not None:
+            scraper.max_pages = spec["max_pages"]
+        if spec.get("max_per_brand") is not None:
+            scraper.max_per_brand = spec["max_per_brand"]
+        if spec.get("max_per_brand_per_category") is not None:
+            scraper.max_per_brand_per_category = spec["max_per_brand_per_category"]
+        if spec.get("sampling"):
+            scraper.sampling = spec["sampling"]
+            scraper.sample_seed = spec.get("seed", 0)
+        scraper.incremental = bool(spec.get("incremental"))
+
+        job_dir = self.job_dir(job)
+        scraper.output_file = os.path.join(job_dir, "results.json")
+        scraper.stream_file = os.path.join(job_dir, "results.ndjson")
+        scraper.headers_file = os.path.join(job_dir, "headers.json")
+        scraper.delta_file = os.path.join(job_dir, "delta.json")
+        scraper.failed_pages_file = os.path.join(job_dir, "failed_pages.json")
+        scraper.store_file = os.path.join(self.output_dir, "ahri_record_store.sqlite")
+        scraper.dedup_file = self.dedup_file
+        scraper.shards_dir = None
+        return scraper
+
+    def run_job(self, job, session):
+        job.status = "running"
+        job.started = time.time()
+        job.session = session.number
+        self.write_status(job)
+        logger.info(f"▶️  Job {job.id} on session {session.number}: {job.spec}")
+
+        try:
+            scraper = self.build_scraper(job, session)
+            job.results = scraper.scrape_and_save()
+            job.summary = scraper.run_summary
+            job.output_file = scraper.output_file if job.results else None
+            job.status = "done" if job.results else "empty"
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            session.jobs += 1
+            self.metrics.count("jobs_finished", status=job.status)
+            self.metrics.observe("job_seconds", job.finished - job.started)
+            self.write_status(job)
+            job.done.set()
+            logger.info(f"⏹️  Job {job.id}: {job.status} in {job.finished - job.started:.1f}s")
+
+    def check_session(self, session):
+        """Health-check a session after a job; returns it, or a fresh replacement"""
+        if session.driver is None:
+            return session
+
+        reason = None
+        try:
+            session.driver.execute_script("return 1")
+            session.memory_mb = browser_memory_mb(session.driver)
+        except Exception as e:
+            reason = f"health check failed ({e})"
+
+        if not reason and session.jobs >= self.recycle_after:
+            reason = f"{session.jobs} jobs"
+        elif (not reason and session.memory_mb is not None and session.baseline_mb is not None
+                and session.memory_mb - session.baseline_mb > self.max_growth_mb):
+            reason = f"memory grew {session.baseline_mb:.0f} → {session.memory_mb:.0f} MB"
+        if not reason:
+            return session
+
+        logger.info(f"♻️  Recycling session {session.number}: {reason}")
+        self.metrics.count("sessions_recycled")
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+        self.cookies_accepted.discard(id(session.driver))
+        while True:
+            try:
+                return self.new_session()
+            except Exception as e:
+                logger.error(f"❌ Session relaunch failed: {e}")
+                time.sleep(5)
+
+    def health(self):
+        return {
+            "running": self.running,
+            "backend": self.backend,
+            "workers": self.workers,
+            "idle_sessions": self.sessions.qsize(),
+            "queued_jobs": sum(1 for job in self.jobs.values() if job.status == "queued"),
+            "running_jobs": sum(1 for job in self.jobs.values() if job.status == "running")
+        }
+
+
+def make_handler(daemon):
+    class DaemonHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def parts(self):
+            return [p for p in self.path.split("?")[0].split("/") if p]
+
+        def do_GET(self):
+            parts = self.parts()
+            if parts == ["health"]:
+                self.send_json(daemon.health())
+            elif parts == ["metrics"]:
+                body = daemon.metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif parts == ["jobs"]:
+                self.send_json([job.to_json() for job in daemon.jobs.values()])
+            elif len(parts) >= 2 and parts[0] == "jobs" and parts[1] in daemon.jobs:
+                job = daemon.jobs[parts[1]]
+                if parts[2:] == ["results"]:
+                    if not job.output_file or not os.path.exists(job.output_file):
+                        self.send_json({"error": f"job is {job.status}"}, 404)
+                        return
+                    with open(job.output_file, 'r', encoding='utf-8') as f:
+                        self.send_json(json.load(f))
+                else:
+                    self.send_json(job.to_json())
+            else:
+                self.send_json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            if self.parts() != ["jobs"]:
+                self.send_json({"error": "not found"}, 404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                spec = json.loads(self.rfile.read(length) or b"{}")
+                job = daemon.submit(spec)
+            except (ValueError, TypeError, AttributeError) as e:
+                self.send_json({"error": str(e)}, 400)
+                return
+            self.send_json(job.to_json(), 202)
+
+        def do_DELETE(self):
+            parts = self.parts()
+            if len(parts) == 2 and parts[0] == "jobs" and daemon.cancel(parts[1]):
+                self.send_json({"id": parts[1], "status": "cancelled"})
+            else:
+                self.send_json({"error": "no queued job with that id"}, 409)
+
+    return DaemonHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AHRI scraper daemon with warm sessions and a job API")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, default=2, help="warm sessions = jobs run at once")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--base-url", default="https://www.ahridirectory.org")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--recycle-after", type=int, default=50, help="jobs per session before relaunching it")
+    parser.add_argument("--max-growth-mb", type=int, default=750, help="browser memory growth that triggers a relaunch")
+    parser.add_argument("--full-profile", action="store_true", help="load images, fonts and trackers (no lean profile)")
+    parser.add_argument("--profile-dir", default=None, help="warm Chrome profiles kept between daemon restarts")
+    parser.add_argument("--chromedriver", default=None, help="chromedriver binary (skips the driver manager)")
+    args = parser.parse_args()
+
+    daemon = ScraperDaemon(workers=args.workers, backend=args.backend, base_url=args.base_url,
+                           output_dir=args.output_dir, lean=not args.full_profile,
+                           profile_dir=args.profile_dir, driver_path=args.chromedriver)
+    daemon.recycle_after = args.recycle_after
+    daemon.max_growth_mb = args.max_growth_mb
+    daemon.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(daemon))
+    server.daemon_threads = True
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"🛰️  Job API at http://{args.host}:{args.port}/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
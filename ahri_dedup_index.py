@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+AHRI Dedup Index - persistent, key-based duplicate detection
+Identifies each product by AHRI Ref. # (falling back to normalized brand +
+model numbers, directory-wide like the ref), stores compact 64-bit digests in an on-disk SQLite index and
+answers "seen in this run?" with one indexed lookup per row
+"""
+
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+REF_FIELD = "AHRI Ref. #"
+# Brand / model field priority shared by dedup, brand quotas, the catalog build and its indexes
+BRAND_FIELDS = ["Outdoor Unit Brand Name", "Brand Name", "Brand", "Manufacturer", "Indoor Unit Brand Name"]
+MODEL_FIELDS = ["Outdoor Unit Model Number", "Indoor Unit Model Number", "Model Number", "Furnace Model Number"]
+
+_NON_ALNUM = re.compile(r"[^A-Z0-9*]+")
+
+
+def normalize_text(value):
+    """Uppercase, collapse whitespace - formatting-only differences compare equal"""
+    return " ".join(str(value or "").upper().split())
+
+
+def normalize_model(value):
+    """Model number without separators or trailing wildcards (EL16KC1-030-230A** -> EL16KC1030230A)"""
+    return _NON_ALNUM.sub("", normalize_text(value)).rstrip("*")
+
+
+def product_identity(product):
+    """Primary identity: AHRI Ref. #, else normalized brand + every model number field
+
+    Both keys are directory-wide: a ref is unique across programs, and so is a
+    brand's set of model numbers, so neither is scoped by category.
+    """
+    ref = normalize_text(product.get(REF_FIELD))
+    if ref:
+        return f"ref:{ref}"
+
+    brand = next((normalize_text(product[f]) for f in BRAND_FIELDS if product.get(f)), "")
+    models = [normalize_model(product[f]) for f in MODEL_FIELDS if product.get(f)]
+    if not models:
+        # No model numbers at all - fall back to the full normalized content
+        models = sorted(f"{k}:{normalize_text(v)}" for k, v in product.items()
+                        if k not in ("extraction_timestamp", "data_source") and v)
+    return "bm:" + "|".join([brand] + models)
+
+
+def identity_digest(identity):
+    """Compact signed 64-bit digest (fits a SQLite INTEGER PRIMARY KEY)"""
+    digest = hashlib.blake2b(identity.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class DedupIndex:
+    """On-disk set of identity digests, tagged with the run that last saw them
+
+    A key counts as a duplicate only if it was already seen in the current run,
+    so the index persists across runs (and lets a crashed run resume under the
+    same run_id) without hiding rows from the next full scrape. Threads share
+    the connection under a lock; other processes coordinate through SQLite's
+    WAL locking. New keys are claimed in memory and only written by commit(),
+    once the rows they belong to are durable - a crash can never leave a key
+    marked seen for a row the output stream lost.
+    """
+
+    def __init__(self, path="ahri_dedup_index.sqlite", run_id=None):
+        self.path = path
+        self.run_id = run_id or time.strftime("%Y%m%d%H%M%S") + f".{time.time_ns() % 10**9:09d}"
+        self.lock = threading.Lock()
+        self.claimed = set()  # keys seen this run but not yet committed
+        self.settled = []     # claimed keys whose rows are written (or dropped), for the next commit
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (key INTEGER PRIMARY KEY, run TEXT NOT NULL)")
+
+    def check_and_add(self, product):
+        """True if the product's identity was already seen in this run; claims it otherwise"""
+        key = identity_digest(product_identity(product))
+        with self.lock:
+            if key in self.claimed:
+                return True
+            row = self.conn.execute("SELECT run FROM seen WHERE key = ?", (key,)).fetchone()
+            if row and row[0] == self.run_id:
+                return True
+            self.claimed.add(key)
+            return False
+
+    def settle(self, product):
+        """Mark a claimed product as handled - written to the output, or rejected for good
+
+    Reservoir sampling settles held rows it drops too, so claims never
+    outlive the rows they belong to.
+    """
+        key = identity_digest(product_identity(product))
+        with self.lock:
+            if key in self.claimed:
+                self.settled.append(key)
+
+    def commit(self):
+        """Persist settled keys in one transaction (call after the output they belong to is flushed)"""
+        with self.lock:
+            if not self.settled:
+                return
+            keys, self.settled = self.settled, []
+            self.conn.execute("BEGIN")
+            # Inserts a new key or re-tags one from an older run
+            self.conn.executemany(
+                "INSERT INTO seen (key, run) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET run = excluded.run WHERE seen.run != excluded.run",
+                [(key, self.run_id) for key in keys])
+            self.conn.execute("COMMIT")
+            self.claimed.difference_update(keys)
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    """Report duplicates in a results file: ahri_dedup_index.py results.json"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahri_dedup_index.py <ahri_6_products_results.json> [index.sqlite]")
+        return
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    index = DedupIndex(sys.argv[2] if len(sys.argv) > 2 else ":memory:")
+    total = duplicates = 0
+    start = time.perf_counter()
+    for products in data.get("products_by_category", {}).values():
+        for product in products:
+            total += 1
+            if index.check_and_add(product):
+                duplicates += 1
+            else:
+                index.settle(product)
+    index.commit()
+    elapsed = time.perf_counter() - start
+    index.close()
+
+    print(f"🔎 {total} products, {duplicates} duplicates ({elapsed * 1e6 / max(total, 1):.1f} µs/row)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+AHRI Enrich - per-product detail pages merged into scraped records
+Fetches the certificate / detail page of every AHRI Ref. # on a bounded
+worker pool and merges its extra fields (full ratings, matched components)
+into the product. Responses live in a content-addressed disk cache: bodies
+are stored once under their blake2b digest, and a SQLite index maps each URL
+to its digest plus ETag / Last-Modified, so re-runs either skip the network
+(within max_age) or revalidate with a conditional GET and reuse the body.
+Records are enriched straight off the run's NDJSON stream, a bounded window
+at a time, before it is finalized into the results file.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ahri_dedup_index import REF_FIELD
+from ahri_metrics import NullMetrics
+from ahri_retry import RetryPolicy, ThrottledError, TransientError, run_step
+from ahri_stream import NDJSONSink, brand_distribution_from_ndjson, finalize_results, iter_ndjson
+from ahri_table_parser import cell_value, parse_tables_html
+
+DEFAULT_CACHE_DIR = "ahri_http_cache"
+DEFAULT_DETAIL_PATH = "/details/{program}/{ref}"
+DEFAULT_MAX_AGE = 24 * 3600  # seconds a cached page is trusted without revalidating
+COMPONENTS_FIELD = "Matched Components"
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPCache:
+    """Content-addressed response cache: objects/<aa>/<digest> bodies + a SQLite URL index"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30,
+                                    isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, digest TEXT NOT NULL, "
+            "etag TEXT, last_modified TEXT, content_type TEXT, checked REAL NOT NULL)"
+        )
+
+    def object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    def lookup(self, url):
+        """Index entry for a URL as a dict, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT digest, etag, last_modified, content_type, checked FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if not row or not os.path.exists(self.object_path(row[0])):
+            return None
+        return dict(zip(("digest", "etag", "last_modified", "content_type", "checked"), row))
+
+    def body(self, digest):
+        with open(self.object_path(digest), 'rb') as f:
+            return f.read()
+
+    def store(self, url, body, etag=None, last_modified=None, content_type=None):
+        """Write the body under its digest (once) and point the URL at it"""
+        digest = hashlib.blake2b(body, digest_size=20).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, digest, etag, last_modified, content_type, checked) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (url, digest, etag, last_modified, content_type, time.time())
+            )
+        return digest
+
+    def touch(self, url):
+        """Mark a revalidated entry as fresh again"""
+        with self.lock:
+            self.conn.execute("UPDATE responses SET checked = ? WHERE url = ?", (time.time(), url))
+
+    def get(self, session, url, timeout=30):
+        """(body bytes, content type, outcome) - outcome is "fresh", "revalidated" or "fetched"
+
+        Raises ThrottledError / TransientError for retryable failures and
+        requests' HTTPError for other 4xx.
+        """
+        import requests
+
+        entry = self.lookup(url)
+        if entry and self.max_age and time.time() - entry["checked"] < self.max_age:
+            return self.body(entry["digest"]), entry["content_type"], "fresh"
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientError(f"request failed: {e}")
+
+        if response.status_code == 304 and entry:
+            self.touch(url)
+            return self.body(entry["digest"]), entry["content_type"], "revalidated"
+        if response.status_code in (429, 503):
+            retry_after = response.headers.get("Retry-After", "")
+            raise ThrottledError(f"HTTP {response.status_code}",
+                                 retry_after=float(retry_after) if retry_after.replace(".", "", 1).isdigit() else None)
+        if response.status_code >= 500:
+            raise TransientError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+        content_type = response.headers.get("Content-Type", "")
+        self.store(url, response.content, response.headers.get("ETag"),
+                   response.headers.get("Last-Modified"), content_type)
+        return response.content, content_type, "fetched"
+
+    def prune(self):
+        """Delete bodies no URL points at any more; returns how many were removed"""
+        with self.lock:
+            live = {digest for (digest,) in self.conn.execute("SELECT DISTINCT digest FROM responses")}
+        removed = 0
+        objects_dir = os.path.join(self.cache_dir, "objects")
+        for prefix in os.listdir(objects_dir):
+            for name in os.listdir(os.path.join(objects_dir, prefix)):
+                if name not in live:
+                    os.remove(os.path.join(objects_dir, prefix, name))
+                    removed += 1
+        return removed
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def parse_detail_page(body, content_type=""):
+    """Extra fields of a detail page: JSON record, or HTML key/value and component tables
+
+    Two-cell table rows become fields; wider tables with a header row become
+    a list of {header: value} dicts under "Matched Components".
+    """
+    text = body.decode("utf-8", errors="replace") if isinstance(body, bytes) else body
+    if "json" in (content_type or ""):
+        payload = json.loads(text)
+        record = payload.get("result", payload) if isinstance(payload, dict) else {}
+        fields = {}
+        for key, value in record.items():
+            if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+                fields[key] = [{k: cell_value(v) for k, v in item.items()} for item in value]
+            elif isinstance(value, dict):
+                fields.update({f"{key} - {k}": cell_value(v) for k, v in value.items() if cell_value(v)})
+            elif cell_value(value):
+                fields[key] = cell_value(value)
+        return fields
+
+    fields = {}
+    components = []
+    for rows in parse_tables_html(text):
+        rows = [row for row in rows if any(row)]
+        if rows and all(len(row) == 2 for row in rows):
+            fields.update({key.rstrip(":").strip(): value for key, value in rows if key and value})
+        elif len(rows) > 1:
+            headers = rows[0]
+            components += [{h: v for h, v in zip(headers, row) if h and v} for row in rows[1:]]
+    if components:
+        fields[COMPONENTS_FIELD] = components
+    return fields
+
+
+def merge_detail(product, fields):
+    """Add detail fields the summary row lacks; the results table stays authoritative"""
+    added = 0
+    for key, value in fields.items():
+        if key not in product:
+            product[key] = value
+            added += 1
+    return added
+
+
+class DetailEnricher:
+    """Fetch, cache, parse and merge detail pages for many products concurrently"""
+
+    def __init__(self, base_url, programs, cache=None, workers=8, detail_path=DEFAULT_DETAIL_PATH,
+                 retry_policy=None, rate_limiter=None, metrics=None, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.programs = programs  # {product_category: api program}
+        self.cache = cache or HTTPCache()
+        self.workers = max(1, workers)
+        self.detail_path = detail_path
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics or NullMetrics()
+        self.timeout = timeout
+        self.session = None
+
+    def get_session(self):
+        if self.session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept": "text/html, application/json;q=0.9"})
+            self.session = session
+        return self.session
+
+    def detail_url(self, product):
+        """Detail page URL for a product, or None without a ref / known program"""
+        ref = str(product.get(REF_FIELD) or "").strip()
+        program = self.programs.get(product.get("product_category"))
+        if not ref or not program:
+            return None
+        return self.base_url + self.detail_path.format(program=program, ref=ref)
+
+    def fetch(self, url):
+        """(fields, outcome) for one detail page, retried under the policy"""
+        def attempt():
+            return self.cache.get(self.get_session(), url, self.timeout)
+
+        # Cache hits that need no request skip the limiter slot
+        entry = self.cache.lookup(url) if self.cache.max_age else None
+        fresh = entry and time.time() - entry["checked"] < self.cache.max_age
+        with self.metrics.stage("detail_fetch"):
+            body, content_type, outcome = run_step(attempt, self.retry_policy, None if fresh else self.rate_limiter,
+                                                   retry_on=(TransientError,))
+        return parse_detail_page(body, content_type), outcome
+
+    def iter_enriched(self, products, counts):
+        """Yield every product, in input order, with its detail fields merged; tallies outcomes in counts"""
+        self.get_session()
+        work = iter(products)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ahri-enrich") as executor:
+            pending = deque()
+            while True:
+                # Keep at most 2 x workers requests queued - memory stays flat for any input size
+                while len(pending) < self.workers * 2:
+                    product = next(work, None)
+                    if product is None:
+                        break
+                    url = self.detail_url(product)
+                    pending.append((product, executor.submit(self.fetch, url) if url else None))
+                if not pending:
+                    break
+
+                product, future = pending.popleft()
+                if future is None:
+                    counts["skipped"] += 1
+                    yield product
+                    continue
+                try:
+                    fields, outcome = future.result()
+                except Exception as e:
+                    counts["failed"] += 1
+                    self.metrics.count("detail_pages", outcome="failed")
+                    logger.warning(f"⚠️  Detail page failed for {product.get(REF_FIELD)}: {e}")
+                    yield product
+                    continue
+                merge_detail(product, fields)
+                counts[outcome] += 1
+                self.metrics.count("detail_pages", outcome=outcome)
+                yield product
+
+    def enrich(self, products):
+        """Merge detail fields into every product in place; {outcome: count}"""
+        counts = {"fresh": 0, "revalidated": 0, "fetched": 0, "failed": 0, "skipped": 0}
+        for _ in self.iter_enriched(products, counts):
+            pass
+        return counts
+
+    def enrich_ndjson(self, path):
+        """Enrich an NDJSON stream in place, record by record (atomic replace); {outcome: count}"""
+        counts = {"fresh": 0, "revalidated": 0, "fetched": 0, "failed": 0, "skipped": 0}
+        tmp_path = path + ".enriched.tmp"
+        with NDJSONSink(tmp_path, flush_every=1000) as sink:
+            for product in self.iter_enriched(iter_ndjson(path), counts):
+                sink.write(product)
+        os.replace(tmp_path, path)
+        return counts
+
+    def finalize_enriched(self, ndjson_path, output_path, summary, brand_distribution=None, category_order=None):
+        """finalize_results with detail pages merged into the stream first; counts land in the summary"""
+        counts = self.enrich_ndjson(ndjson_path)
+        return finalize_results(ndjson_path, output_path, {**summary, "detail_pages": counts},
+                                brand_distribution, category_order)
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+        self.cache.close()
+
+
+def main():
+    """Enrich a run's stream and finalize it: ahri_enrich.py results.ndjson [output.json] [base_url] [workers] [cache_dir] [--prune]"""
+    from selenium_scraper import AHRISpecialized6Products
+
+    args = [a for a in sys.argv[1:] if a != "--prune"]
+    path = args[0] if args else "ahri_6_products_results.ndjson"
+    output_path = args[1] if len(args) > 1 else "ahri_6_products_results.json"
+    base_url = args[2] if len(args) > 2 else "https://www.ahridirectory.org"
+    workers = int(args[3]) if len(args) > 3 else 8
+    cache_dir = args[4] if len(args) > 4 else DEFAULT_CACHE_DIR
+
+    scraper = AHRISpecialized6Products()
+    programs = {name: info["api_program"] for name, info in scraper.categories.items()}
+    summary = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": "ahridirectory.org",
+        "method": "specialized_6_products_scraper"
+    }
+    enricher = DetailEnricher(base_url, programs, HTTPCache(cache_dir), workers=workers)
+    try:
+        start = time.time()
+        summary = enricher.finalize_enriched(path, output_path, summary,
+                                             brand_distribution_from_ndjson(path, scraper.extract_brand),
+                                             list(scraper.categories))
+        print(f"🔎 Detail pages {summary['detail_pages']} in {time.time() - start:.1f}s → {output_path}")
+        if "--prune" in sys.argv:
+            print(f"🧹 Pruned {enricher.cache.prune()} unreferenced cache objects")
+    finally:
+        enricher.close()
+
+
+if __name__ == "__main__":
+    main()
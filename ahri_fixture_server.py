@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+AHRI Fixture Server - local stand-in for the AHRI directory
+Serves a homepage with cookie banner and category cards, per-category search
+pages, paginated results tables, per-ref detail pages (with ETag / 304
+revalidation) and the JSON search endpoint, built from
+recorded results (ahri_6_products_results.json), optional recorded HTML pages
+and synthetic rows, so scraper runs and benchmarks never touch the live site.
+Optional fault injection (429s, 500s, half-rendered pages, a requests/s cap)
+exercises the scraper's retry and pacing paths.
+"""
+
+import os
+import sys
+import json
+import time
+import html
+import random
+import hashlib
+import threading
+from collections import deque
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RECORDED = "ahri_6_products_results.json"
+META_FIELDS = ("extraction_timestamp", "data_source", "product_category")
+
+
+class FixtureDirectory:
+    """Category tables the server renders: recorded rows, optionally padded with synthetic ones"""
+
+    def __init__(self, categories, recorded_path=DEFAULT_RECORDED, synthetic_rows=0, page_size=250,
+                 recorded_html_dir=None, latency_ms=0, faults=None):
+        self.categories = categories  # scraper-style {name: {"click_text", "verify_text", "api_program"}}
+        self.page_size = page_size
+        self.recorded_html_dir = recorded_html_dir
+        self.latency_ms = latency_ms
+        self.tables = {}
+        
+        # Fault injection for results pages / the API: {"throttle_rate", "error_rate", "flaky_rate",
+        # "max_rps", "jitter_ms", "seed"} - rates are per-request probabilities
+        self.faults = faults or {}
+        self.random = random.Random(self.faults.get("seed"))
+        self.fault_lock = threading.Lock()
+        self.recent_requests = deque()
+        self.fault_counts = {}
+        self.ref_index = None  # (program, ref) -> row, built on the first detail request
+        self.detail_requests = 0
+
+        recorded = {}
+        if recorded_path and os.path.exists(recorded_path):
+            with open(recorded_path, 'r', encoding='utf-8') as f:
+                recorded = json.load(f).get("products_by_category", {})
+
+        for position, (name, info) in enumerate(categories.items()):
+            products = recorded.get(name, [])
+            headers = []
+            for product in products:
+                headers += [k for k in product if k not in META_FIELDS and k not in headers]
+            rows = [[product.get(h, "") for h in headers] for product in products]
+            if synthetic_rows:
+                rows = self.synthesize(headers, rows, synthetic_rows, position)
+            self.tables[info["api_program"]] = (name, headers, rows)
+
+    @staticmethod
+    def synthesize(headers, rows, count, position=0):
+        """Cycle recorded rows up to count, with refs / model numbers unique across categories so none dedupe"""
+        if not rows:
+            return rows
+        ref_col = headers.index("AHRI Ref. #") if "AHRI Ref. #" in headers else None
+        model_cols = [i for i, h in enumerate(headers) if "Model Number" in h]
+        synthetic = []
+        for i in range(count):
+            row = list(rows[i % len(rows)])
+            if i >= len(rows):
+                if ref_col is not None:
+                    row[ref_col] = str(900000000 + position * 10000000 + i)
+                for col in model_cols:
+                    if row[col]:
+                        row[col] = f"{row[col]}-S{i}"
+            synthetic.append(row)
+        return synthetic
+
+    def page(self, program, page, page_size=None):
+        """(category name, headers, rows of the page, total rows)"""
+        name, headers, rows = self.tables[program]
+        size = page_size or self.page_size
+        start = (page - 1) * size
+        return name, headers, rows[start:start + size], len(rows)
+
+    def detail(self, program, ref):
+        """(category name, headers, row) of one AHRI Ref. #, or None"""
+        if self.ref_index is None:
+            index = {}
+            for table_program, (name, headers, rows) in self.tables.items():
+                if "AHRI Ref. #" in headers:
+                    ref_col = headers.index("AHRI Ref. #")
+                    index.update({(table_program, str(row[ref_col])): row for row in rows})
+            self.ref_index = index
+        row = self.ref_index.get((program, ref))
+        if row is None:
+            return None
+        name, headers, _ = self.tables[program]
+        return name, headers, row
+
+    def inject_fault(self):
+        """None, or "throttle" / "error" / "flaky" for this request (also sleeps any jitter)"""
+        if not self.faults:
+            return None
+        with self.fault_lock:
+            now = time.monotonic()
+            self.recent_requests.append(now)
+            while self.recent_requests and now - self.recent_requests[0] > 1.0:
+                self.recent_requests.popleft()
+            jitter = self.random.uniform(0, self.faults.get("jitter_ms", 0)) / 1000
+            roll = self.random.random()
+
+            fault = None
+            max_rps = self.faults.get("max_rps")
+            if max_rps and len(self.recent_requests) > max_rps:
+                fault = "throttle"
+            else:
+                threshold = 0.0
+                for kind in ("throttle", "error", "flaky"):
+                    threshold += self.faults.get(f"{kind}_rate", 0)
+                    if roll < threshold:
+                        fault = kind
+                        break
+            if fault:
+                self.fault_counts[fault] = self.fault_counts.get(fault, 0) + 1
+        if jitter:
+            time.sleep(jitter)
+        return fault
+
+    def recorded_html(self, relative_path):
+        """Recorded page from recorded_html_dir, if one was captured for this path"""
+        if not self.recorded_html_dir:
+            return None
+        path = os.path.join(self.recorded_html_dir, relative_path)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        return None
+
+
+def _page(title, body):
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title></head><body>{body}</body></html>"
+
+
+def render_homepage(directory):
+    cards = "".join(
+        f"<a class='card' href='/search/{info['api_program']}'><div class='card-body'><h3>{html.escape(info['click_text'])}</h3>"
+        f"<p>Browse certified products</p></div></a>"
+        for info in directory.categories.values()
+    )
+    banner = ("<div id='cookie-banner'><p>We use cookies.</p>"
+              "<button onclick=\"document.getElementById('cookie-banner').remove()\">Accept</button></div>")
+    return _page("AHRI Directory of Certified Product Performance", banner + f"<div class='cards'>{cards}</div>")
+
+
+def render_search_page(directory, program):
+    name = directory.tables[program][0]
+    info = directory.categories[name]
+    form = (f"<form action='/results/{program}' method='get'><input type='hidden' name='page' value='1'>"
+            f"<button type='submit' class='btn btn-primary'>Search</button></form>")
+    return _page(f"{info['verify_text']} - AHRI Directory", f"<h1>{html.escape(name)}</h1>{form}")
+
+
+def render_results_page(directory, program, page, page_size=None):
+    name, headers, rows, total = directory.page(program, page, page_size)
+    info = directory.categories[name]
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in headers)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row) + "</tr>" for row in rows)
+    pager = f"<span>Page {page}</span>"
+    if page * (page_size or directory.page_size) < total:
+        pager += f" <a aria-label='Next' href='/results/{program}?page={page + 1}'>Next</a>"
+    table = f"<table class='results'><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+    return _page(f"{info['verify_text']} - Results", f"<h1>{html.escape(name)}</h1>{table}<nav class='pager'>{pager}</nav>")
+
+
+def render_detail_page(directory, program, ref):
+    """Certificate page: every rating as a two-column table plus a matched-components table"""
+    name, headers, row = directory.detail(program, ref)
+    ratings = [(h, v) for h, v in zip(headers, row) if v != ""]
+    ratings += [("Certificate Number", f"{program.upper()}-{ref}"),
+                ("Certified Rating Standard", "AHRI 210/240-2023"),
+                ("Listing Source", "Fixture Directory")]
+    rating_rows = "".join(f"<tr><th>{html.escape(h)}:</th><td>{html.escape(str(v))}</td></tr>" for h, v in ratings)
+    component_rows = "".join(
+        f"<tr><td>{html.escape(h.replace(' Model Number', ''))}</td><td>{html.escape(str(v))}</td>"
+        f"<td>{html.escape(str(dict(ratings).get(h.replace('Model Number', 'Brand Name'), '')))}</td></tr>"
+        for h, v in zip(headers, row) if "Model Number" in h and v
+    )
+    components = ("<table class='components'><thead><tr><th>Component</th><th>Model Number</th><th>Brand</th>"
+                  f"</tr></thead><tbody>{component_rows}</tbody></table>") if component_rows else ""
+    return _page(f"AHRI Certificate {ref}",
+                 f"<h1>{html.escape(name)} - {html.escape(ref)}</h1>"
+                 f"<table class='ratings'>{rating_rows}</table>{components}")
+
+
+def make_handler(directory):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, body, content_type="text/html; charset=utf-8", status=200):
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def send_fault(self, fault):
+            if fault == "throttle":
+                payload = b"Too Many Requests"
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+            else:
+                payload = b"Internal Server Error"
+                self.send_response(500)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if directory.latency_ms:
+                time.sleep(directory.latency_ms / 1000)
+
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = [p for p in url.path.split("/") if p]
+            page = int(query.get("page", ["1"])[0])
+
+            try:
+                if not parts:
+                    self.send_body(directory.recorded_html("home.html") or render_homepage(directory))
+                elif parts[0] == "search" and len(parts) == 2 and parts[1] in directory.tables:
+                    self.send_body(directory.recorded_html(f"search/{parts[1]}.html")
+                                   or render_search_page(directory, parts[1]))
+                elif parts[0] == "results" and len(parts) == 2 and parts[1] in directory.tables:
+                    fault = directory.inject_fault()
+                    if fault in ("throttle", "error"):
+                        self.send_fault(fault)
+                    elif fault == "flaky":
+                        # Rendered without its table, as a slow client-side render would look
+                        self.send_body(_page("Results", "<div class='loading'>Loading results…</div>"))
+                    else:
+                        self.send_body(directory.recorded_html(f"results/{parts[1]}/page-{page}.html")
+                                       or render_results_page(directory, parts[1], page))
+                elif parts[0] == "details" and len(parts) == 3 and parts[1] in directory.tables:
+                    if directory.detail(parts[1], parts[2]) is None:
+                        self.send_body(_page("Not found", "<h1>404</h1>"), status=404)
+                        return
+                    with directory.fault_lock:
+                        directory.detail_requests += 1
+                    fault = directory.inject_fault()
+                    if fault:
+                        self.send_fault("throttle" if fault == "throttle" else "error")
+                        return
+                    body = render_detail_page(directory, parts[1], parts[2])
+                    etag = '"' + hashlib.blake2b(body.encode("utf-8"), digest_size=12).hexdigest() + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    payload = body.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", "Mon, 02 Jun 2025 00:00:00 GMT")
+                    self.end_headers()
+                    self.wfile.write(payload)
+                elif parts == ["api", "search"] and query.get("program", [""])[0] in directory.tables:
+                    fault = directory.inject_fault()
+                    if fault in ("throttle", "error"):
+                        self.send_fault(fault)
+                        return
+                    if fault == "flaky":
+                        self.send_body('{"totalCount": ', "application/json")  # truncated body
+                        return
+                    page_size = int(query.get("pageSize", [directory.page_size])[0])
+                    _, headers, rows, total = directory.page(query["program"][0], page, page_size)
+                    results = [{h: v for h, v in zip(headers, row) if v != ""} for row in rows]
+                    self.send_body(json.dumps({"totalCount": total, "results": results}), "application/json")
+                else:
+                    self.send_body(_page("Not found", "<h1>404</h1>"), status=404)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return FixtureHandler
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Deep listen backlog - concurrent fetchers overflow the default 5 and stall on SYN retries"""
+
+    request_queue_size = 128
+
+
+def start_fixture_server(directory, host="127.0.0.1", port=0):
+    """Serve the directory on a background thread; returns (server, base_url)"""
+    server = FixtureServer((host, port), make_handler(directory))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    """Run the stand-in directory: ahri_fixture_server.py [port] [synthetic_rows] [page_size] [faults_json]
+
+    faults_json e.g. '{"throttle_rate": 0.1, "error_rate": 0.05, "flaky_rate": 0.05, "max_rps": 20, "seed": 1}'
+    """
+    from selenium_scraper import AHRISpecialized6Products
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    synthetic_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    page_size = int(sys.argv[3]) if len(sys.argv) > 3 else 250
+    faults = json.loads(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    directory = FixtureDirectory(AHRISpecialized6Products().categories,
+                                 synthetic_rows=synthetic_rows, page_size=page_size, faults=faults)
+    server, base_url = start_fixture_server(directory, port=port)
+    print(f"🧪 Fixture directory serving at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+AHRI Incremental - re-scrape only what changed since the last run
+Keeps a local SQLite store of every record keyed by AHRI Ref. # with a content
+hash, classifies each scraped row as added / changed / relisted / unchanged,
+and emits a delta plus a merged full snapshot
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from ahri_stream import NDJSONSink, finalize_results
+
+REF_FIELD = "AHRI Ref. #"
+STATUS_FIELD = "Model Status"
+VOLATILE_FIELDS = ("extraction_timestamp", "data_source")
+
+
+def content_hash(product):
+    """Stable digest of a record's content, ignoring per-run metadata"""
+    parts = [f"{key}:{value}" for key, value in sorted(product.items())
+             if key not in VOLATILE_FIELDS and value]
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).digest()
+
+
+def is_active(product):
+    return str(product.get(STATUS_FIELD, "Active")).strip().lower() == "active"
+
+
+class RecordStore:
+    """SQLite store of previously seen records, keyed by AHRI Ref. #
+
+    Every write autocommits (WAL, synchronous=NORMAL), so no run holds the
+    write lock while it waits on the network and several jobs can share
+    one store.
+    """
+
+    def __init__(self, path="ahri_record_store.sqlite"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                ref TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                content_hash BLOB NOT NULL,
+                record TEXT NOT NULL,
+                active INTEGER NOT NULL,
+                listed INTEGER NOT NULL DEFAULT 1,
+                first_seen TEXT NOT NULL,
+                last_changed TEXT NOT NULL,
+                last_seen_run TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS records_category ON records (category, last_seen_run)")
+
+    def get(self, ref):
+        """(content_hash, active, listed) for a ref, or None if never seen"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT content_hash, active, listed FROM records WHERE ref = ?", (ref,)
+            ).fetchone()
+
+    def upsert(self, ref, product, digest, run_id, now):
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO records (ref, category, content_hash, record, active, listed, first_seen, last_changed, last_seen_run)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)
+                ON CONFLICT(ref) DO UPDATE SET
+                    category = excluded.category, content_hash = excluded.content_hash,
+                    record = excluded.record, active = excluded.active, listed = 1,
+                    last_changed = excluded.last_changed, last_seen_run = excluded.last_seen_run
+            """, (ref, product.get("product_category", ""), digest, json.dumps(product, ensure_ascii=False),
+                  int(is_active(product)), now, now, run_id))
+
+    def touch(self, ref, run_id):
+        with self.lock:
+            self.conn.execute("UPDATE records SET last_seen_run = ?, listed = 1 WHERE ref = ?", (run_id, ref))
+
+    def mark_unlisted(self, category, run_id):
+        """Flag records of a fully crawled category that this run did not see; returns their refs"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                refs = [row[0] for row in self.conn.execute(
+                    "SELECT ref FROM records WHERE category = ? AND last_seen_run != ? AND listed = 1",
+                    (category, run_id))]
+                self.conn.execute(
+                    "UPDATE records SET listed = 0 WHERE category = ? AND last_seen_run != ?", (category, run_id))
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return refs
+
+    def records(self, refs=None, categories=None):
+        """Yield stored records - every listed one (streamed, optionally of some categories), or just the given refs"""
+        if refs is None:
+            query, params = "SELECT record FROM records WHERE listed = 1", []
+            if categories is not None:
+                categories = list(categories)
+                query += f" AND category IN ({','.join('?' * len(categories))})"
+                params = categories
+            # Separate read connection so a full export streams instead of loading every row
+            reader = sqlite3.connect(self.path, timeout=30)
+            try:
+                for (record,) in reader.execute(query + " ORDER BY rowid", params):
+                    yield json.loads(record)
+            finally:
+                reader.close()
+            return
+
+        refs = list(refs)
+        for i in range(0, len(refs), 500):
+            chunk = refs[i:i + 500]
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT record FROM records WHERE ref IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+            for (record,) in rows:
+                yield json.loads(record)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class IncrementalRun:
+    """Classifies scraped rows against the store and decides when to stop paging
+
+    Results are assumed to list the newest certifications first, so once
+    stop_after consecutive rows are already known and unchanged, the rest of
+    the category is too and paging can stop.
+    """
+
+    def __init__(self, store, stop_after=200):
+        self.store = store
+        self.stop_after = stop_after
+        self.run_id = time.strftime("%Y%m%d%H%M%S") + f".{time.time_ns() % 10**9:09d}"
+        self.lock = threading.Lock()
+        self.added = []
+        self.changed = []
+        self.relisted = []
+        self.deactivated = []
+        self.unchanged = 0
+        self.unchanged_streak = {}
+
+    def observe(self, product):
+        """Record one scraped product; returns 'added', 'changed', 'relisted' or 'unchanged'"""
+        category = product.get("product_category", "")
+        ref = str(product.get(REF_FIELD, "")).strip()
+        if not ref:
+            return "added"
+
+        digest = content_hash(product)
+        known = self.store.get(ref)
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+
+        if known and not known[2]:
+            # Delisted by an earlier full crawl and back in the directory, changed or not
+            self.store.upsert(ref, product, digest, self.run_id, now)
+            with self.lock:
+                self.unchanged_streak[category] = 0
+                self.relisted.append(ref)
+            return "relisted"
+
+        if known and bytes(known[0]) == digest:
+            self.store.touch(ref, self.run_id)
+            with self.lock:
+                self.unchanged += 1
+                self.unchanged_streak[category] = self.unchanged_streak.get(category, 0) + 1
+            return "unchanged"
+
+        self.store.upsert(ref, product, digest, self.run_id, now)
+        with self.lock:
+            self.unchanged_streak[category] = 0
+            if not known:
+                self.added.append(ref)
+                return "added"
+            self.changed.append(ref)
+            if known[1] and not is_active(product):
+                self.deactivated.append(ref)
+            return "changed"
+
+    def should_stop(self, category):
+        """True once the category has reached a long run of known, unchanged records"""
+        return bool(self.stop_after) and self.unchanged_streak.get(category, 0) >= self.stop_after
+
+    def finish_category(self, category, complete):
+        """After a full crawl, records the directory no longer lists count as deactivated"""
+        if complete:
+            refs = self.store.mark_unlisted(category, self.run_id)
+            with self.lock:
+                self.deactivated.extend(refs)
+
+    def write_delta(self, path):
+        """Write added / changed / relisted / deactivated records of this run as JSON"""
+        delta = {
+            "run_id": self.run_id,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "counts": {
+                "added": len(self.added),
+                "changed": len(self.changed),
+                "relisted": len(self.relisted),
+                "deactivated": len(self.deactivated),
+                "unchanged": self.unchanged
+            },
+            "added": list(self.store.records(self.added)),
+            "changed": list(self.store.records(self.changed)),
+            "relisted": list(self.store.records(self.relisted)),
+            "deactivated": self.deactivated
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(delta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return delta["counts"]
+
+
+def write_snapshot(store, output_path, summary, brand_distribution=None, category_order=None, categories=None,
+                   finalize=finalize_results, snapshot_stream=None):
+    """Merge every listed record in the store (or those of the given categories) into the full results JSON
+
+    finalize takes finalize_results' arguments (e.g. DetailEnricher.finalize_enriched).
+    The snapshot goes through an NDJSON file first; pass snapshot_stream to keep it.
+    """
+    keep = snapshot_stream is not None
+    snapshot_stream = snapshot_stream or output_path + ".snapshot.ndjson"
+    with NDJSONSink(snapshot_stream, flush_every=1000) as sink:
+        for record in store.records(categories=categories):
+            sink.write(record)
+    try:
+        return finalize(snapshot_stream, output_path, summary, brand_distribution, category_order)
+    finally:
+        if not keep:
+            os.remove(snapshot_stream)
+
+
+def seed_store(results_path, store):
+    """Load an existing ahri_6_products_results.json into the store as the baseline"""
+    with open(results_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    run = IncrementalRun(store, stop_after=0)
+    for category, products in data.get("products_by_category", {}).items():
+        for product in products:
+            run.observe(product)
+        run.finish_category(category, complete=False)
+    return len(run.added) + len(run.changed) + len(run.relisted)
+
+
+def main():
+    """Seed the store from an existing results file: ahri_incremental.py results.json [store.sqlite]"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahri_incremental.py <ahri_6_products_results.json> [store.sqlite]")
+        return
+
+    store = RecordStore(sys.argv[2] if len(sys.argv) > 2 else "ahri_record_store.sqlite")
+    try:
+        count = seed_store(sys.argv[1], store)
+        print(f"🗄️  Seeded {count} records into {store.path}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
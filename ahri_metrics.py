@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+AHRI Metrics - per-stage timings and counters for scraper runs
+RunMetrics collects wall time per stage / category, WebDriver command counts
+and latencies, retries, fallback hits and row outcomes, and exports them as a
+JSON run report or Prometheus text (file or a local /metrics endpoint).
+NullMetrics is the default: same interface, no work, so an uninstrumented run
+pays only for a no-op method call per event.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROMETHEUS_PREFIX = "ahri_"
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prometheus_labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in key) + "}"
+
+
+def browser_memory_mb(driver):
+    """RSS of chromedriver + Chrome processes (psutil), else the page's JS heap"""
+    try:
+        import psutil
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return round(sum(p.memory_info().rss for p in processes) / (1024 * 1024), 1)
+    except Exception:
+        pass
+    try:
+        heap = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null")
+        return round(heap / (1024 * 1024), 1) if heap else None
+    except Exception:
+        return None
+
+
+class NullMetrics:
+    """Metrics switched off - every call is a no-op"""
+
+    enabled = False
+    _null_stage = nullcontext()
+
+    def count(self, name, value=1, **labels):
+        pass
+
+    def observe(self, name, seconds, **labels):
+        pass
+
+    def stage(self, name, **labels):
+        return self._null_stage
+
+    def instrument_driver(self, driver):
+        return driver
+
+
+class RunMetrics:
+    """Thread-safe counters and timings keyed by metric name + labels"""
+
+    enabled = True
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}  # (name, label key) -> value
+        self.timings = {}   # (name, label key) -> [count, total seconds, max seconds]
+
+    def count(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            timing = self.timings.get(key)
+            if timing is None:
+                self.timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """Time a block as stage_seconds{stage=name, ...}"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=name, **labels)
+
+    def instrument_driver(self, driver):
+        """Time every WebDriver command (element calls route through driver.execute too)"""
+        execute = driver.execute
+
+        def timed_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.observe("webdriver_command_seconds", time.perf_counter() - start, command=driver_command)
+
+        driver.execute = timed_execute
+        return driver
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters), {key: list(value) for key, value in self.timings.items()}
+
+    def to_report(self, summary=None):
+        """Structured run report: {counters: {name: [...]}, timings: {name: [...]}}"""
+        counters, timings = self.snapshot()
+        report = {
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            "elapsed_s": round(time.time() - self.started, 3),
+            "summary": summary or {},
+            "counters": {},
+            "timings": {}
+        }
+        for (name, key), value in sorted(counters.items()):
+            report["counters"].setdefault(name, []).append({**dict(key), "value": value})
+        for (name, key), (count, total, longest) in sorted(timings.items()):
+            report["timings"].setdefault(name, []).append({
+                **dict(key), "count": count, "total_s": round(total, 4),
+                "mean_s": round(total / count, 4), "max_s": round(longest, 4)
+            })
+        return report
+
+    def write_report(self, path, summary=None):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_report(summary), f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def prometheus_text(self):
+        """Prometheus text exposition: counters as *_total, timings as *_count / *_sum / *_max"""
+        counters, timings = self.snapshot()
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{PROMETHEUS_PREFIX}{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (n, key), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{metric}{_prometheus_labels(key)} {value}")
+        for name in sorted({name for name, _ in timings}):
+            metric = f"{PROMETHEUS_PREFIX}{name}"
+            lines.append(f"# TYPE {metric} summary")
+            for (n, key), (count, total, longest) in sorted(timings.items()):
+                if n == name:
+                    labels = _prometheus_labels(key)
+                    lines.append(f"{metric}_count{labels} {count}")
+                    lines.append(f"{metric}_sum{labels} {total:.6f}")
+                    lines.append(f"{metric}_max{labels} {longest:.6f}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}run_started_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}run_started_seconds {self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Text file for node_exporter's textfile collector (atomic replace)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+def start_metrics_server(metrics, port, host="127.0.0.1"):
+    """Serve metrics.prometheus_text() at /metrics on a background thread; returns the server"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            payload = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def main():
+    """Summarize a run report: ahri_metrics.py ahri_run_report.json"""
+    path = sys.argv[1] if len(sys.argv) > 1 else "ahri_run_report.json"
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+
+    print(f"⏱️  Run started {report['started']}, {report['elapsed_s']}s")
+    stages = sorted(report["timings"].get("stage_seconds", []), key=lambda t: t["total_s"], reverse=True)
+    for timing in stages[:15]:
+        where = "".join(f" [{v}]" for k, v in timing.items() if k not in ("stage", "count", "total_s", "mean_s", "max_s"))
+        print(f"   • {timing['stage']}{where}: {timing['total_s']}s over {timing['count']} calls (max {timing['max_s']}s)")
+
+    commands = report["timings"].get("webdriver_command_seconds", [])
+    if commands:
+        total = sum(c["count"] for c in commands)
+        seconds = sum(c["total_s"] for c in commands)
+        print(f"🧭 {total} WebDriver commands, {seconds:.2f}s")
+        for timing in sorted(commands, key=lambda c: c["total_s"], reverse=True)[:5]:
+            print(f"   • {timing['command']}: {timing['count']} calls, {timing['total_s']}s")
+
+    for row in report["counters"].get("rows", []):
+        print(f"📦 {row['category']}: {row['outcome']} {row['value']}")
+
+
+if __name__ == "__main__":
+    main()
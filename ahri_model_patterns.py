@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+AHRI Model Patterns - wildcard-aware model number lookup
+AHRI lists model families, not nameplate models: each "*" stands for one
+character, "(A,B)" / "[C,U]" / "(B/*)" offer alternatives, "30/36" either
+run, and "+TDR" names an accessory kit the nameplate usually omits. Every
+pattern is expanded into fixed-length variants grouped by (length, literal
+prefix), so a concrete model number only checks the few variants that share
+its length and prefix instead of testing every pattern in the directory.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import itertools
+
+from ahri_catalog_build import DEFAULT_INPUT, build_catalog
+from ahri_dedup_index import MODEL_FIELDS
+
+DEFAULT_OUTPUT = os.path.join("hvac-catalog", "src", "model_pattern_index.json")
+
+WILDCARD = "*"
+MAX_VARIANTS = 256  # alternation blow-up cap per pattern
+
+_SEPARATORS = re.compile(r"[\s\-._]+")
+_GROUP = re.compile(r"\(([^()]*)\)|\[([^\[\]]*)\]")
+_RUN_CHOICE = re.compile(r"(\d+)/(\d+)")
+
+
+def normalize_model_number(text):
+    """Uppercase without separators - nameplates and listings format dashes / spaces differently"""
+    return _SEPARATORS.sub("", str(text or "").upper())
+
+
+def _split_segments(text):
+    """Pattern text -> list of segments, each a list of alternative strings"""
+    segments = []
+    position = 0
+    for group in _GROUP.finditer(text):
+        segments += _literal_segments(text[position:group.start()])
+        options = re.split(r"[,/]", group.group(1) if group.group(1) is not None else group.group(2))
+        segments.append(sorted({normalize_model_number(option) for option in options}))
+        position = group.end()
+    segments += _literal_segments(text[position:])
+    return segments
+
+
+def _literal_segments(text):
+    """Literal text; "30/36" between equal-length digit runs is a choice of either run"""
+    text = normalize_model_number(text).replace("(", "").replace(")", "").replace("[", "").replace("]", "")
+    segments = []
+    position = 0
+    for choice in _RUN_CHOICE.finditer(text):
+        left, right = choice.group(1), choice.group(2)
+        if len(left) != len(right):
+            continue
+        segments.append([text[position:choice.start()]])
+        segments.append([left, right])
+        position = choice.end()
+    segments.append([text[position:].replace("/", "")])
+    return segments
+
+
+def expand_pattern(text):
+    """Concrete-length variants of one AHRI model pattern ("*" = any one character)
+
+    A "+ACCESSORY" suffix also yields the variant without it, flagged True
+    in the returned (variant, accessory_dropped) pairs.
+    """
+    variants = []
+    for options in itertools.islice(itertools.product(*_split_segments(str(text).upper())), MAX_VARIANTS):
+        variant = "".join(options)
+        if variant:
+            variants.append((variant, False))
+            base = variant.split("+", 1)[0]
+            if base and base != variant:
+                variants.append((base, True))
+    return list(dict.fromkeys(variants))
+
+
+def literal_prefix(variant):
+    index = variant.find(WILDCARD)
+    return variant if index < 0 else variant[:index]
+
+
+def variant_matches(variant, model):
+    """Same length, and every non-wildcard character equal"""
+    return len(variant) == len(model) and all(v == m or v == WILDCARD for v, m in zip(variant, model))
+
+
+class ModelPatternIndex:
+    """Model pattern variants bucketed by (length, literal prefix), pointing at catalog records
+
+    patterns: distinct raw pattern texts; pattern_records: [(record_id, field), ...]
+    per pattern; buckets: {"<length>:<prefix>": [[variant, pattern_id, accessory_dropped], ...]}.
+    A lookup of an n-character model probes one bucket per prefix length that
+    exists for n-character variants, then compares only those variants.
+    """
+
+    def __init__(self, patterns=None, pattern_records=None, buckets=None):
+        self.patterns = patterns or []
+        self.pattern_records = pattern_records or []
+        self.buckets = buckets or {}
+        self.prefix_lengths = {}  # variant length -> sorted literal prefix lengths present
+        for key in self.buckets:
+            length, prefix = key.split(":", 1)
+            self.prefix_lengths.setdefault(int(length), set()).add(len(prefix))
+        self.prefix_lengths = {length: sorted(sizes) for length, sizes in self.prefix_lengths.items()}
+
+    @classmethod
+    def build(cls, records):
+        """Index catalog records (ahri_catalog_build.build_catalog()["records"])"""
+        pattern_ids = {}
+        patterns, pattern_records = [], []
+        buckets = {}
+        for record in records:
+            product = record["product"]
+            for field in MODEL_FIELDS:
+                value = product.get(field)
+                if not isinstance(value, str) or not value.strip():
+                    continue
+                text = value.strip()
+                pid = pattern_ids.get(text)
+                if pid is None:
+                    pid = pattern_ids[text] = len(patterns)
+                    patterns.append(text)
+                    pattern_records.append([])
+                    for variant, accessory_dropped in expand_pattern(text):
+                        key = f"{len(variant)}:{literal_prefix(variant)}"
+                        buckets.setdefault(key, []).append([variant, pid, accessory_dropped])
+                pattern_records[pid].append([record["id"], field])
+        return cls(patterns, pattern_records, buckets)
+
+    def match_patterns(self, model):
+        """[(pattern_id, specificity, accessory_dropped)] of every pattern the concrete model fits"""
+        query = normalize_model_number(model)
+        n = len(query)
+        best = {}
+        for size in self.prefix_lengths.get(n, ()):
+            for variant, pid, accessory_dropped in self.buckets.get(f"{n}:{query[:size]}", ()):
+                if not variant_matches(variant, query):
+                    continue
+                score = (n - variant.count(WILDCARD), not accessory_dropped)
+                if pid not in best or score > best[pid]:
+                    best[pid] = score
+        return [(pid, score[0], not score[1]) for pid, score in best.items()]
+
+    def match(self, model, limit=None):
+        """Certified records whose model patterns fit model, most specific first
+
+        Specificity is the number of literal (non-wildcard) characters the
+        matching pattern pins down; exact listings rank above wildcard
+        families, and a match that needed its "+accessory" suffix dropped
+        ranks below one that did not. One entry per record (its best field).
+        """
+        hits = {}
+        for pid, specificity, accessory_dropped in self.match_patterns(model):
+            for record_id, field in self.pattern_records[pid]:
+                hit = {
+                    "record": record_id,
+                    "pattern": self.patterns[pid],
+                    "field": field,
+                    "specificity": specificity,
+                    "exact": specificity == len(normalize_model_number(model)) and not accessory_dropped,
+                    "accessory_dropped": accessory_dropped
+                }
+                current = hits.get(record_id)
+                if current is None or (specificity, not accessory_dropped) > (current["specificity"],
+                                                                              not current["accessory_dropped"]):
+                    hits[record_id] = hit
+        ranked = sorted(hits.values(), key=lambda h: (-h["specificity"], h["accessory_dropped"], h["record"]))
+        return ranked[:limit] if limit else ranked
+
+    def to_json(self):
+        return {
+            "version": 1,
+            "patterns": self.patterns,
+            "pattern_records": self.pattern_records,
+            "buckets": self.buckets
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["patterns"], data["pattern_records"], data["buckets"])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_json(json.load(f))
+
+
+def main():
+    """Build the pattern index: ahri_model_patterns.py [results.json] [model_pattern_index.json] [model ...]"""
+    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT
+    output_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        catalog = build_catalog(json.load(f))
+
+    start = time.perf_counter()
+    index = ModelPatternIndex.build(catalog["records"])
+    index.save(output_path)
+    variants = sum(len(entries) for entries in index.buckets.values())
+    print(f"🧬 {len(index.patterns)} patterns, {variants} variants in {len(index.buckets)} buckets → {output_path} "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    for model in sys.argv[3:]:
+        start = time.perf_counter()
+        hits = index.match(model)
+        elapsed = time.perf_counter() - start
+        print(f"🔍 {model}: {len(hits)} records in {elapsed * 1000:.3f} ms")
+        for hit in hits[:10]:
+            record = catalog["records"][hit["record"]]
+            print(f"   • {hit['pattern']} [{hit['field']}] → {record['brand']} {record['ref']} "
+                  f"(specificity {hit['specificity']}{', exact' if hit['exact'] else ''})")
+
+
+if __name__ == "__main__":
+    main()
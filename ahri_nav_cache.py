@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+AHRI Navigation Cache - resolved search-results URLs per category
+After a category has been opened the slow way (homepage → card → Search), its
+results URL is remembered here so later runs can load it directly. Entries are
+keyed by directory root, so a local stand-in never shadows the live site.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+DEFAULT_CACHE_FILE = "ahri_nav_cache.json"
+
+
+class NavigationCache:
+    """{base_url: {category: {"url", "recorded", "hits"}}} persisted as JSON"""
+
+    def __init__(self, path=DEFAULT_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}  # unreadable cache just means a cold start
+
+    def get(self, base_url, category):
+        with self.lock:
+            entry = self.entries.get(base_url, {}).get(category)
+            return entry["url"] if entry else None
+
+    def record(self, base_url, category, url):
+        with self.lock:
+            entry = self.entries.setdefault(base_url, {}).get(category)
+            if entry and entry["url"] == url:
+                return
+            self.entries[base_url][category] = {"url": url, "recorded": time.strftime("%Y-%m-%d %H:%M:%S"), "hits": 0}
+            self.save()
+
+    def hit(self, base_url, category):
+        with self.lock:
+            entry = self.entries.get(base_url, {}).get(category)
+            if entry:
+                entry["hits"] = entry.get("hits", 0) + 1
+                self.save()
+
+    def invalidate(self, base_url, category):
+        with self.lock:
+            if self.entries.get(base_url, {}).pop(category, None):
+                self.save()
+
+    def save(self):
+        """Write via a temp file (caller holds the lock)"""
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def main():
+    """Show or clear the cache: ahri_nav_cache.py [cache.json] [--clear]"""
+    args = [a for a in sys.argv[1:] if a != "--clear"]
+    cache = NavigationCache(args[0] if args else DEFAULT_CACHE_FILE)
+    if "--clear" in sys.argv:
+        cache.entries = {}
+        with cache.lock:
+            cache.save()
+        print(f"🧹 Cleared {cache.path}")
+        return
+
+    for base_url, categories in cache.entries.items():
+        print(f"🌐 {base_url}")
+        for category, entry in categories.items():
+            print(f"   • {category}: {entry['url']} (recorded {entry['recorded']}, {entry.get('hits', 0)} hits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+AHRI Query Service - indexed catalog queries over a local HTTP API
+Loads a results snapshot once into posting lists (brand, category, series,
+status), per-record code columns and value-sorted metric columns, then answers
+filtered, sorted, paginated queries with facet counts without scanning the
+catalog: each query starts from its most selective filter and only verifies
+the rest on those candidates. A watcher rebuilds the index off to the side
+when a new snapshot lands and swaps it in, so readers never see a half-load.
+
+    GET  /products?brand=LENNOX&category=Air Conditioning&status=Active
+                  &min.seer2_appendix_m1=16&max.seer2_appendix_m1=20
+                  &model=EL16KC1-030-230A01&sort=-seer2_appendix_m1&page=1&page_size=50
+    GET  /products/<AHRI Ref. #>
+    GET  /facets              facet counts for the whole catalog (same filters as /products)
+    GET  /metrics             numeric metrics: slug, column, min, max, count
+    GET  /health              records, snapshot, reloads
+    POST /reload              rebuild now
+"""
+
+import os
+import json
+import math
+import time
+import bisect
+import heapq
+import logging
+import itertools
+import argparse
+import threading
+from array import array
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ahri_catalog_build import DEFAULT_INPUT, META_FIELDS, build_catalog
+from ahri_columnar import category_slug, is_identifier_column, parse_number
+from ahri_incremental import STATUS_FIELD
+from ahri_model_patterns import ModelPatternIndex
+
+logger = logging.getLogger(__name__)
+
+FACETS = ("brand", "category", "series", "status")
+TEXT_SORTS = ("brand", "category", "series", "model", "ref")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_FACET_LIMIT = 100
+POLL_INTERVAL = 5.0
+
+
+def facet_value(record, facet):
+    if facet == "status":
+        return record["product"].get(STATUS_FIELD) or None
+    return record.get(facet)
+
+
+class CatalogIndex:
+    """Immutable, query-ready view of one results snapshot
+
+    Facets: value -> sorted record ids (postings) plus a per-record code
+    column for verification and counting. Metrics: a float column (NaN when
+    missing) plus record ids ordered by value for range slices and sorting.
+    """
+
+    def __init__(self, data, source=None):
+        catalog = build_catalog(data)
+        self.records = catalog["records"]
+        self.source = source
+        self.loaded = time.strftime("%Y-%m-%d %H:%M:%S")
+        n = len(self.records)
+
+        self.values = {}    # facet -> [value per code]
+        self.codes = {}     # facet -> {value: code}
+        self.columns = {}   # facet -> array of codes per record (-1 = none)
+        self.postings = {}  # facet -> [array of record ids per code]
+        for facet in FACETS:
+            codes, values, column, postings = {}, [], array('i', [-1]) * n, []
+            for record in self.records:
+                value = facet_value(record, facet)
+                if value is None:
+                    continue
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(values)
+                    values.append(value)
+                    postings.append(array('I'))
+                column[record["id"]] = code
+                postings[code].append(record["id"])
+            self.values[facet], self.codes[facet] = values, codes
+            self.columns[facet], self.postings[facet] = column, postings
+
+        # Numeric metrics: columns whose every non-empty value parses as a number.
+        # One pass over the values records actually have; repeated cells parse once.
+        parsed = {}
+        column_values = {}  # column -> {record id: number}, None once a value fails to parse
+        for record in self.records:
+            rid = record["id"]
+            for column, value in record["product"].items():
+                if value in (None, ""):
+                    continue
+                found = column_values.get(column, ())
+                if found is None:
+                    continue
+                if found == ():
+                    if column in META_FIELDS or is_identifier_column(column):
+                        column_values[column] = None
+                        continue
+                    found = column_values[column] = {}
+                number = parsed.get(value, False) if isinstance(value, str) else parse_number(value)
+                if number is False:
+                    number = parsed[value] = parse_number(value)
+                if number is None:
+                    column_values[column] = None
+                else:
+                    found[rid] = number
+
+        self.metric_columns = {}  # slug -> column name
+        self.metric_values = {}   # slug -> array('d') per record
+        self.metric_order = {}    # slug -> record ids with a value, ascending by value
+        self.metric_sorted = {}   # slug -> the matching ascending values
+        for column, found in column_values.items():
+            if not found:
+                continue
+            slug = category_slug(column)
+            while slug in self.metric_columns:
+                slug += "_"
+            self.metric_columns[slug] = column
+            values = array('d', [math.nan]) * n
+            for rid, number in found.items():
+                values[rid] = number
+            order = sorted(found, key=found.__getitem__)
+            self.metric_values[slug] = values
+            self.metric_order[slug] = array('I', order)
+            self.metric_sorted[slug] = array('d', (values[rid] for rid in order))
+
+        # Text sort orders: rank of every record, missing values last
+        self.text_rank = {}
+        for key in TEXT_SORTS:
+            order = sorted(range(n), key=lambda rid: (self.records[rid].get(key) is None,
+                                                      str(self.records[rid].get(key) or "").upper(), rid))
+            rank = array('I', [0]) * n
+            for position, rid in enumerate(order):
+                rank[rid] = position
+            present = sum(1 for record in self.records if record.get(key) is not None)
+            self.text_rank[key] = (array('I', order), rank, present)
+
+        self.patterns = ModelPatternIndex.build(self.records)
+        self.by_ref = {record["ref"]: record["id"] for record in self.records if record["ref"]}
+
+    def __len__(self):
+        return len(self.records)
+
+    # --- filtering -----------------------------------------------------------
+
+    def candidates(self, query, skip_facet=None):
+        """Sorted record ids matching every filter (skip_facet's own filter left out, for facet counts)"""
+        sources = []  # (size, function returning those ids sorted)
+        checks = []   # per-record predicates for the other filters
+
+        for facet in FACETS:
+            wanted = query["facets"].get(facet)
+            if not wanted or facet == skip_facet:
+                continue
+            codes = {self.codes[facet][v] for v in wanted if v in self.codes[facet]}
+            if not codes:
+                return []
+            lists = [self.postings[facet][code] for code in codes]
+            sources.append((sum(map(len, lists)),
+                            lambda lists=lists: lists[0] if len(lists) == 1 else sorted(itertools.chain(*lists))))
+            column = self.columns[facet]
+            checks.append(lambda rid, column=column, codes=codes: column[rid] in codes)
+
+        for slug, (low, high) in query["ranges"].items():
+            values, ordered = self.metric_values[slug], self.metric_sorted[slug]
+            start = bisect.bisect_left(ordered, low) if low is not None else 0
+            end = bisect.bisect_right(ordered, high) if high is not None else len(ordered)
+            sources.append((end - start, lambda order=self.metric_order[slug], start=start, end=end: sorted(order[start:end])))
+            low = -math.inf if low is None else low
+            high = math.inf if high is None else high
+            checks.append(lambda rid, values=values, low=low, high=high: low <= values[rid] <= high)
+
+        if query.get("model"):
+            ids = {hit["record"] for hit in self.patterns.match(query["model"])}
+            sources.append((len(ids), lambda ids=ids: sorted(ids)))
+            checks.append(ids.__contains__)
+
+        if not sources:
+            return range(len(self.records))
+
+        # Walk only the most selective filter; verify the others per candidate
+        smallest = min(range(len(sources)), key=lambda i: sources[i][0])
+        others = checks[:smallest] + checks[smallest + 1:]
+        ids = sources[smallest][1]()
+        for check in others:
+            ids = filter(check, ids)
+        return ids if not others else list(ids)
+
+    # --- sorting / paging ----------------------------------------------------
+
+    def page_ids(self, ids, sort, offset, limit):
+        """Record ids of one page of ids in sort order ("key" / "-key"; metrics missing last)"""
+        if not sort:
+            return list(ids[offset:offset + limit])
+
+        descending = sort.startswith("-")
+        key = sort.lstrip("-")
+        needed = offset + limit
+        if key in self.metric_values:
+            values = self.metric_values[key]
+            order = self.metric_order[key]
+            if len(ids) * 8 >= len(self.records):
+                # Dense result: walk the presorted order, stop once the page is filled
+                mask = self._mask(ids)
+                walk = reversed(order) if descending else order
+                page = []
+                for rid in walk:
+                    if mask[rid]:
+                        page.append(rid)
+                        if len(page) == needed:
+                            return page[offset:]
+                missing = [rid for rid in ids if math.isnan(values[rid])]
+                return (page + missing)[offset:needed]
+            valued = [rid for rid in ids if not math.isnan(values[rid])]
+            missing = [rid for rid in ids if math.isnan(values[rid])]
+            # Descending is the exact reverse of ascending (ties by id), as in the dense walk
+            sign = -1 if descending else 1
+            top = heapq.nsmallest(needed, valued, key=lambda rid: (sign * values[rid], sign * rid))
+            return (top + missing)[offset:needed]
+
+        order, rank, present = self.text_rank[key]
+        if len(ids) * 8 >= len(self.records):
+            mask = self._mask(ids)
+            walk = itertools.chain(reversed(order[:present]), order[present:]) if descending else order
+            page = []
+            for rid in walk:
+                if mask[rid]:
+                    page.append(rid)
+                    if len(page) == needed:
+                        break
+            return page[offset:]
+        if descending:
+            # Valued records reversed, missing ones still last and in id order
+            top = heapq.nsmallest(needed, ids, key=lambda rid: (rank[rid] >= present,
+                                                                -rank[rid] if rank[rid] < present else rank[rid]))
+        else:
+            top = heapq.nsmallest(needed, ids, key=rank.__getitem__)
+        return top[offset:needed]
+
+    def _mask(self, ids):
+        if isinstance(ids, range):
+            return bytearray(b"\x01") * len(self.records)
+        mask = bytearray(len(self.records))
+        for rid in ids:
+            mask[rid] = 1
+        return mask
+
+    # --- queries -------------------------------------------------------------
+
+    def facet_counts(self, query, ids, facets=FACETS, limit=DEFAULT_FACET_LIMIT):
+        """{facet: [[value, count], ...]} by count; a filtered facet counts as if it were not filtered"""
+        counts = {}
+        for facet in facets:
+            source = self.candidates(query, skip_facet=facet) if query["facets"].get(facet) else ids
+            column, values = self.columns[facet], self.values[facet]
+            if isinstance(source, range) and len(source) == len(self.records):
+                tally = {code: len(postings) for code, postings in enumerate(self.postings[facet])}
+            else:
+                tally = Counter(map(column.__getitem__, source))
+                tally.pop(-1, None)
+            top = heapq.nlargest(limit, tally.items(), key=lambda item: (item[1], -item[0]))
+            counts[facet] = [[values[code], count] for code, count in top]
+        return counts
+
+    def search(self, query, sort=None, page=1, page_size=DEFAULT_PAGE_SIZE, facets=FACETS,
+               facet_limit=DEFAULT_FACET_LIMIT):
+        """One page of matching records plus facet counts"""
+        start = time.perf_counter()
+        ids = self.candidates(query)
+        offset = (page - 1) * page_size
+        page_ids = self.page_ids(ids, sort, offset, page_size)
+        result = {
+            "total": len(ids),
+            "page": page,
+            "page_size": page_size,
+            "results": [self.records[rid] for rid in page_ids],
+            "facets": self.facet_counts(query, ids, facets, facet_limit) if facets else {}
+        }
+        result["took_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+
+    def metric_summary(self):
+        return [{
+            "metric": slug,
+            "column": column,
+            "count": len(self.metric_order[slug]),
+            "min": self.metric_sorted[slug][0] if self.metric_order[slug] else None,
+            "max": self.metric_sorted[slug][-1] if self.metric_order[slug] else None
+        } for slug, column in self.metric_columns.items()]
+
+
+def parse_query(params, index):
+    """(query, sort, page, page_size, facets) from URL query parameters; ValueError on bad input"""
+    query = {"facets": {}, "ranges": {}, "model": (params.get("model") or [None])[0]}
+    for facet in FACETS:
+        if facet in params:
+            query["facets"][facet] = set(params[facet])
+    for name, values in params.items():
+        bound, _, slug = name.partition(".")
+        if bound not in ("min", "max") or not slug:
+            continue
+        if slug not in index.metric_columns:
+            raise ValueError(f"unknown metric {slug!r}")
+        low, high = query["ranges"].get(slug, (None, None))
+        number = float(values[0])
+        query["ranges"][slug] = (number, high) if bound == "min" else (low, number)
+
+    sort = (params.get("sort") or [None])[0]
+    if sort and sort.lstrip("-") not in index.metric_columns and sort.lstrip("-") not in TEXT_SORTS:
+        raise ValueError(f"unknown sort key {sort!r}")
+    page = max(1, int((params.get("page") or ["1"])[0]))
+    page_size = min(MAX_PAGE_SIZE, max(1, int((params.get("page_size") or [DEFAULT_PAGE_SIZE])[0])))
+    facets = [f for f in (params.get("facets") or [",".join(FACETS)])[0].split(",") if f in FACETS]
+    return query, sort, page, page_size, facets
+
+
+class CatalogService:
+    """Holds the current CatalogIndex and swaps in a rebuilt one when the snapshot changes"""
+
+    def __init__(self, path=DEFAULT_INPUT, poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.index = None
+        self.signature = None
+        self.reloads = 0
+        self.last_error = None
+        self.stopping = threading.Event()
+        if not self.reload():
+            raise ValueError(f"Could not load {path}: {self.last_error}")
+
+    def snapshot_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self):
+        """Build a fresh index from the snapshot and swap it in; the old one serves until then"""
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                signature = self.snapshot_signature()
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    index = CatalogIndex(json.load(f), source=self.path)
+            except (OSError, ValueError) as e:
+                # A snapshot caught mid-write (or broken) keeps the previous index serving
+                self.last_error = str(e)
+                logger.error(f"❌ Reload of {self.path} failed: {e}")
+                return False
+            self.index = index
+            self.signature = signature
+            self.reloads += 1
+            self.last_error = None
+        logger.info(f"📚 Loaded {len(index)} records from {self.path} in {time.perf_counter() - start:.2f}s")
+        return True
+
+    def watch(self):
+        """Poll the snapshot's mtime / size on a background thread"""
+        def loop():
+            while not self.stopping.wait(self.poll_interval):
+                try:
+                    if self.snapshot_signature() != self.signature:
+                        self.reload()
+                except OSError:
+                    pass  # snapshot being replaced - try again next tick
+        threading.Thread(target=loop, name="catalog-watch", daemon=True).start()
+
+    def stop(self):
+        self.stopping.set()
+
+    def health(self):
+        index = self.index
+        return {
+            "records": len(index),
+            "snapshot": self.path,
+            "loaded": index.loaded,
+            "reloads": self.reloads,
+            "last_error": self.last_error
+        }
+
+
+def make_handler(service):
+    class QueryHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Access-Control-Allow-Origin", "*")  # the React dev server runs on another port
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            params = parse_qs(url.query)
+            index = service.index  # one snapshot per request, even if a reload lands meanwhile
+
+            if parts == ["health"]:
+                self.send_json(service.health())
+            elif parts == ["metrics"]:
+                self.send_json(index.metric_summary())
+            elif parts in (["products"], ["facets"]):
+                try:
+                    query, sort, page, page_size, facets = parse_query(params, index)
+                except ValueError as e:
+                    self.send_json({"error": str(e)}, 400)
+                    return
+                if parts == ["facets"]:
+                    start = time.perf_counter()
+                    ids = index.candidates(query)
+                    self.send_json({"total": len(ids), "facets": index.facet_counts(query, ids, facets),
+                                    "took_ms": round((time.perf_counter() - start) * 1000, 3)})
+                else:
+                    self.send_json(index.search(query, sort, page, page_size, facets))
+            elif len(parts) == 2 and parts[0] == "products":
+                record_id = index.by_ref.get(parts[1])
+                if record_id is None:
+                    self.send_json({"error": "no product with that AHRI Ref. #"}, 404)
+                else:
+                    self.send_json(index.records[record_id])
+            else:
+                self.send_json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            if [p for p in self.path.split("?")[0].split("/") if p] != ["reload"]:
+                self.send_json({"error": "not found"}, 404)
+                return
+            if service.reload():
+                self.send_json(service.health())
+            else:
+                self.send_json(service.health(), 500)
+
+    return QueryHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AHRI catalog query service")
+    parser.add_argument("snapshot", nargs="?", default=DEFAULT_INPUT, help=f"results snapshot (default {DEFAULT_INPUT})")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="seconds between snapshot checks (0 = no hot reload)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    service = CatalogService(args.snapshot, poll_interval=args.poll)
+    if args.poll:
+        service.watch()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    server.daemon_threads = True
+    print(f"🔎 Catalog API at http://{args.host}:{args.port}/products ({len(service.index)} records)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
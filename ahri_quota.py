@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+AHRI Quota - brand diversity caps and deterministic stratified sampling
+One brand resolution shared by the scraper's diversity check and reporting,
+plus a thread-safe QuotaEngine that applies per-category and global brand
+caps either greedily (first rows win, streaming) or as a seeded bottom-k
+reservoir per (category, brand) stratum whose selection depends only on the
+set of rows offered, never on the order they arrive in. Rows without any
+brand field are capped under their first meaningful value (as the original
+diversity check did), not pooled under one UNKNOWN brand.
+"""
+
+import sys
+import json
+import heapq
+import hashlib
+import itertools
+import threading
+from collections import defaultdict
+
+from ahri_dedup_index import BRAND_FIELDS, product_identity
+
+UNKNOWN_BRAND = "UNKNOWN"
+
+
+def resolve_brand(product):
+    """Uppercased brand of a product (first non-empty brand field), else UNKNOWN"""
+    for field in BRAND_FIELDS:
+        value = product.get(field)
+        if value and str(value).strip():
+            return " ".join(str(value).upper().split())
+    return UNKNOWN_BRAND
+
+
+def quota_brand(product):
+    """Brand a product is capped under: resolve_brand, else its first meaningful field value"""
+    brand = resolve_brand(product)
+    if brand != UNKNOWN_BRAND:
+        return brand
+    for key, value in product.items():
+        if key not in ("extraction_timestamp", "data_source", "product_category"):
+            if value and 2 < len(str(value)) < 30:  # reasonable brand name length
+                return " ".join(str(value).upper().split())
+    return UNKNOWN_BRAND
+
+
+def sample_priority(product, seed=0):
+    """Seeded 64-bit rank of a product - lower ranks are sampled first"""
+    digest = hashlib.blake2b(f"{seed}\x00{product_identity(product)}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class QuotaEngine:
+    """Brand caps per category and across categories, greedy or reservoir-sampled
+
+    mode "first": offer() decides immediately; caps fill in arrival order.
+    mode "reservoir": offer() holds the row in its (category, brand) stratum,
+    a bounded max-heap keeping the lowest seeded priorities, and selection()
+    walks every held row in priority order once all rows have been seen,
+    taking each one unless its brand or its category is already full.
+    Per-row cost is O(log k) for strata of at most k rows - no re-scans.
+    on_release(product) is called for every held row that will never be
+    selected: swapped out of its stratum, or left out by selection().
+    """
+
+    def __init__(self, global_cap=40, category_cap=0, category_targets=None, seed=0, mode="first", on_release=None):
+        if mode not in ("first", "reservoir"):
+            raise ValueError(f"Unknown sampling mode {mode!r}")
+        self.global_cap = global_cap or 0
+        self.category_cap = category_cap or 0
+        self.category_targets = category_targets or {}
+        self.seed = seed
+        self.mode = mode
+        self.on_release = on_release
+        self.lock = threading.Lock()
+
+        self.brand_counts = defaultdict(int)       # first: accepted per brand
+        self.category_counts = defaultdict(int)    # first: accepted per (category, brand)
+        self.strata = defaultdict(list)            # reservoir: (category, brand) -> heap of (-priority, identity, serial, product)
+        self.serials = itertools.count()           # keeps heap comparisons off the product dicts
+
+    def stratum_limit(self, category):
+        """Most rows of one (category, brand) any final selection can keep (0 = unbounded)"""
+        limits = [c for c in (self.category_cap, self.global_cap, self.category_targets.get(category, 0)) if c]
+        return min(limits) if limits else 0
+
+    def offer(self, product):
+        """True = accept now, False = over a cap, None = held for the reservoir selection"""
+        category = product.get("product_category", "")
+        brand = quota_brand(product)
+
+        if self.mode == "first":
+            with self.lock:
+                if self.global_cap and self.brand_counts[brand] >= self.global_cap:
+                    return False
+                if self.category_cap and self.category_counts[(category, brand)] >= self.category_cap:
+                    return False
+                self.brand_counts[brand] += 1
+                self.category_counts[(category, brand)] += 1
+            return True
+
+        limit = self.stratum_limit(category)
+        if not limit:
+            return True  # nothing to sample against - stream it straight through
+
+        identity = product_identity(product)
+        priority = sample_priority(product, self.seed)
+        evicted = None
+        with self.lock:
+            entry = (-priority, identity, next(self.serials), product)
+            heap = self.strata[(category, brand)]
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                # Lower priority than the stratum's current worst row - swap it out
+                evicted = heapq.heapreplace(heap, entry)
+            else:
+                return False
+        if evicted and self.on_release:
+            self.on_release(evicted[3])
+        return None
+
+    def restore(self, product):
+        """Count a product a resumed run already emitted, as if offer() had just accepted it"""
+        if self.mode == "first":
+            category = product.get("product_category", "")
+            brand = quota_brand(product)
+            with self.lock:
+                self.brand_counts[brand] += 1
+                self.category_counts[(category, brand)] += 1
+        else:
+            # The selection is order-independent, so re-offering rebuilds the same reservoir
+            self.offer(product)
+
+    def selection(self, category_order=None):
+        """{category: [products]} after global brand caps and per-category targets, by priority"""
+        with self.lock:
+            strata = {key: [(-neg, identity, product) for neg, identity, _, product in heap]
+                      for key, heap in self.strata.items()}
+
+        # One pass in priority order: a row is taken unless its brand has reached the
+        # global cap or its category its target, so slots one limit frees go to the next row
+        rows = sorted((priority, identity, category, brand, product)
+                      for (category, brand), stratum in strata.items()
+                      for priority, identity, product in stratum)
+        brand_taken = defaultdict(int)
+        by_category = defaultdict(list)
+        for priority, identity, category, brand, product in rows:
+            target = self.category_targets.get(category, 0)
+            if self.global_cap and brand_taken[brand] >= self.global_cap:
+                continue
+            if target and len(by_category[category]) >= target:
+                continue
+            brand_taken[brand] += 1
+            by_category[category].append(product)
+
+        categories = list(category_order or []) + sorted(c for c in by_category if c not in (category_order or []))
+        selected = {category: by_category.get(category, []) for category in categories}
+
+        if self.on_release:
+            kept = {id(product) for products in selected.values() for product in products}
+            for rows in strata.values():
+                for _, _, product in rows:
+                    if id(product) not in kept:
+                        self.on_release(product)
+        return selected
+
+    def held(self):
+        with self.lock:
+            return sum(len(heap) for heap in self.strata.values())
+
+
+def main():
+    """Resample a results file: ahri_quota.py results.json [per_category_target] [global_cap] [category_cap] [seed]"""
+    input_path = sys.argv[1] if len(sys.argv) > 1 else "ahri_6_products_results.json"
+    target = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    global_cap = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+    category_cap = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    seed = sys.argv[5] if len(sys.argv) > 5 else 0
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        by_category = json.load(f)["products_by_category"]
+
+    engine = QuotaEngine(global_cap, category_cap, {c: target for c in by_category}, seed, mode="reservoir")
+    for products in by_category.values():
+        for product in products:
+            engine.offer(product)
+
+    for category, products in engine.selection(list(by_category)).items():
+        brands = {resolve_brand(p) for p in products}
+        print(f"   • {category}: {len(products)}/{len(by_category[category])} products ({len(brands)} brands)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+AHRI Retry - per-step retries, adaptive pacing and a failed-page log
+RetryPolicy retries one step (a page fetch, a navigation click) with capped
+exponential backoff and full jitter. AdaptiveRateLimiter paces requests
+AIMD-style: the rate creeps up while responses are fast and clean, and is
+cut multiplicatively on throttling, errors or slow responses. FailureLog keeps
+the pages that still failed so a later run can re-fetch just those.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+
+
+class TransientError(Exception):
+    """A step failure worth retrying (timeouts, 5xx, a page that rendered wrong)"""
+
+
+class ThrottledError(TransientError):
+    """The server asked us to slow down (HTTP 429 / 503), optionally with Retry-After seconds"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter"""
+
+    def __init__(self, attempts=4, base_delay=1.0, max_delay=30.0, seed=None):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.random = random.Random(seed)
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number attempt (1-based); never less than Retry-After"""
+        backoff = self.random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(backoff, retry_after or 0)
+
+
+class AdaptiveRateLimiter:
+    """AIMD request pacing shared by every thread of a run
+
+    acquire() spaces requests 1 / rate seconds apart. success() adds
+    increase_step requests/s when the response came back under target_latency,
+    and cuts the rate by slow_factor when it did not; throttled() and failure()
+    cut it by backoff_factor and, for Retry-After, hold every caller back.
+    """
+
+    def __init__(self, rate=10.0, min_rate=0.2, max_rate=50.0, increase_step=0.5,
+                 backoff_factor=0.5, slow_factor=0.8, target_latency=3.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.backoff_factor = backoff_factor
+        self.slow_factor = slow_factor
+        self.target_latency = target_latency
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+        self.decreases = 0
+
+    def acquire(self):
+        """Block until this caller's slot; returns seconds waited"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + 1.0 / self.rate
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def success(self, latency):
+        with self.lock:
+            if latency <= self.target_latency:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+            else:
+                self.decrease(self.slow_factor)
+
+    def throttled(self, retry_after=None):
+        with self.lock:
+            self.decrease(self.backoff_factor)
+            if retry_after:
+                self.next_slot = max(self.next_slot, time.monotonic() + retry_after)
+
+    def failure(self):
+        with self.lock:
+            self.decrease(self.backoff_factor)
+
+    def decrease(self, factor):
+        """Multiplicative decrease (caller holds the lock)"""
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.decreases += 1
+
+
+class PageSet:
+    """Results pages a re-run must read: listed pages, plus every page from onward on
+
+    onward is set when paging itself broke (Next never rendered), since the
+    pages after that point were never seen and their count is unknown.
+    """
+
+    def __init__(self, pages=(), onward=None):
+        self.onward = onward
+        self.pages = sorted({p for p in pages if onward is None or p < onward})
+
+    def __contains__(self, page):
+        return page in self.pages or (self.onward is not None and page >= self.onward)
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    @property
+    def last(self):
+        """Highest page to read, or None when the set is open-ended"""
+        if self.onward is not None:
+            return None
+        return self.pages[-1] if self.pages else 0
+
+    def describe(self):
+        parts = [str(p) for p in self.pages] + ([f"{self.onward} onward"] if self.onward is not None else [])
+        return "pages " + ", ".join(parts)
+
+    def __eq__(self, other):
+        return isinstance(other, PageSet) and (self.pages, self.onward) == (other.pages, other.onward)
+
+    def __repr__(self):
+        return f"PageSet({self.pages!r}, onward={self.onward!r})"
+
+
+class FailureLog:
+    """Pages / steps that failed after every retry, saved for a targeted re-run"""
+
+    def __init__(self, path="ahri_failed_pages.json", run_id=None):
+        self.path = path
+        self.run_id = run_id  # the run a re-run resumes, so recovered rows land in the same stream
+        self.lock = threading.Lock()
+        self.failures = []
+
+    def record(self, category, step, error, page=None, attempts=None, onward=False):
+        """page=None re-runs the whole category; onward=True also every page after page"""
+        with self.lock:
+            failure = {
+                "category": category,
+                "step": step,
+                "page": page,
+                "error": str(error)[:300],
+                "attempts": attempts,
+                "time": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+            if onward:
+                failure["onward"] = True
+            self.failures.append(failure)
+
+    def __len__(self):
+        return len(self.failures)
+
+    def has_failures(self, category):
+        """True if any page / step of the category failed in this run"""
+        with self.lock:
+            return any(failure["category"] == category for failure in self.failures)
+
+    def save(self):
+        """Write the log (an empty run removes a stale one)"""
+        if not self.path:
+            return
+        with self.lock:
+            if not self.failures:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"run_id": self.run_id, "failures": self.failures}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def load(path):
+        """(run_id, {category: PageSet, or None when the whole category must be re-run})"""
+        with open(path, 'r', encoding='utf-8') as f:
+            log = json.load(f)
+        targets = {}
+        for failure in log["failures"]:
+            category, page = failure["category"], failure.get("page")
+            if page is None or targets.get(category, ()) is None:
+                targets[category] = None
+                continue
+            pages, onward = targets.get(category, ([], None))
+            if failure.get("onward"):
+                onward = page if onward is None else min(onward, page)
+            else:
+                pages.append(page)
+            targets[category] = (pages, onward)
+        return log.get("run_id"), {category: PageSet(*target) if target is not None else None
+                                   for category, target in targets.items()}
+
+
+def run_step(func, policy, limiter=None, on_retry=None, retry_on=(Exception,)):
+    """Call func() until it succeeds or the policy's attempts run out (re-raises the last error)
+
+    Exceptions matching retry_on are retried, anything else is raised at once;
+    each retry waits the policy's jittered backoff, and throttling also slows
+    the limiter. on_retry(attempt, error, delay) is called before every wait.
+    """
+    for attempt in range(1, policy.attempts + 1):
+        if limiter:
+            limiter.acquire()
+        started = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None)
+            if limiter:
+                # Only failures worth retrying say anything about load; a 4xx does not
+                if isinstance(e, ThrottledError):
+                    limiter.throttled(retry_after)
+                elif isinstance(e, retry_on):
+                    limiter.failure()
+            if attempt == policy.attempts or not isinstance(e, retry_on):
+                raise
+            delay = policy.delay(attempt, retry_after)
+            if on_retry:
+                on_retry(attempt, e, delay)
+            time.sleep(delay)
+            continue
+        if limiter:
+            limiter.success(time.monotonic() - started)
+        return result
+
+
+def main():
+    """Show a failed-page log: ahri_retry.py [ahri_failed_pages.json]"""
+    path = sys.argv[1] if len(sys.argv) > 1 else "ahri_failed_pages.json"
+    run_id, targets = FailureLog.load(path)
+    print(f"🧾 Run {run_id}: {len(targets)} categories to re-run")
+    for category, pages in targets.items():
+        print(f"   • {category}: {'whole category' if pages is None else pages.describe()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+AHRI Search Index - trigram postings for case-insensitive substring search
+Indexes model numbers and series / category names of the catalog records so a
+substring query touches a short posting list instead of scanning every product.
+Queries shorter than a trigram match whole tokens instead. Ranking matches
+BrandsPage: model number hits first, then series hits.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import heapq
+from array import array
+from itertools import accumulate
+
+from ahri_catalog_build import DEFAULT_INPUT, build_catalog
+from ahri_dedup_index import MODEL_FIELDS
+
+DEFAULT_OUTPUT = os.path.join("hvac-catalog", "src", "search_index.json")
+
+# Same fields BrandsPage's filteredModels checks (model fields are the shared MODEL_FIELDS)
+SERIES_FIELDS = ["Outdoor Unit Series Name", "Indoor Unit Series Name", "Series Name", "product_category"]
+MODEL_TIER, SERIES_TIER = 0, 1
+GRAM = 3
+TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def grams(text, n=GRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def short_tokens(term):
+    """Tokens a query shorter than GRAM can match: the whole term, or one of its alphanumeric runs"""
+    return {token for token in TOKEN_SPLIT.split(term) + [term] if token and len(token) < GRAM}
+
+
+def delta_encode(values):
+    """Ascending ints as gaps from the previous one (small numbers serialize and compress well)"""
+    return [value - previous for previous, value in zip([0, *values], values)]
+
+
+def delta_decode(deltas):
+    return array('I', accumulate(deltas))
+
+
+class SearchIndex:
+    """Distinct lowercased field values (terms) with trigram postings over them
+
+    Every product field value becomes a term; each term lists the records it
+    came from as record_id * 2 + tier. A query of GRAM or more characters picks
+    its rarest trigram, then verifies the substring on just those terms; a
+    shorter query looks up terms with that exact token. Postings and record
+    lists are delta-encoded on disk and decoded to arrays on load.
+    """
+
+    def __init__(self, terms=None, term_records=None, postings=None, tokens=None):
+        self.terms = terms or []
+        self.term_records = term_records or []
+        self.postings = postings or {}
+        self.tokens = tokens or {}
+
+    @classmethod
+    def build(cls, records):
+        """Index catalog records (ahri_catalog_build.build_catalog()["records"])"""
+        term_ids = {}
+        terms, term_records = [], []
+        for record in records:
+            product = record["product"]
+            for tier, fields in ((MODEL_TIER, MODEL_FIELDS), (SERIES_TIER, SERIES_FIELDS)):
+                for field in fields:
+                    value = product.get(field)
+                    if not isinstance(value, str) or not value:
+                        continue
+                    term = value.lower()
+                    tid = term_ids.get(term)
+                    if tid is None:
+                        tid = term_ids[term] = len(terms)
+                        terms.append(term)
+                        term_records.append(array('I'))
+                    entry = record["id"] * 2 + tier
+                    if not term_records[tid] or term_records[tid][-1] != entry:
+                        term_records[tid].append(entry)
+
+        postings, tokens = {}, {}
+        for tid, term in enumerate(terms):
+            for gram in grams(term):
+                postings.setdefault(gram, array('I')).append(tid)
+            for token in short_tokens(term):
+                tokens.setdefault(token, array('I')).append(tid)
+        return cls(terms, term_records, postings, tokens)
+
+    def search(self, query, limit=None):
+        """Record ids whose model / series fields contain query, model hits first"""
+        q = (query or "").lower()
+        if not q:
+            return []
+
+        if len(q) < GRAM:
+            candidates = self.tokens.get(q)
+            if candidates is None:
+                return []
+        else:
+            candidate_lists = [self.postings.get(gram) for gram in grams(q)]
+            if not all(candidate_lists):
+                return []
+            candidates = min(candidate_lists, key=len)
+
+        model_hits, series_hits = set(), set()
+        for tid in candidates:
+            if len(q) < GRAM or q in self.terms[tid]:
+                for entry in self.term_records[tid]:
+                    (series_hits if entry & 1 else model_hits).add(entry >> 1)
+
+        series_hits -= model_hits
+        if not limit:
+            return sorted(model_hits) + sorted(series_hits)
+        ranked = heapq.nsmallest(limit, model_hits)
+        if len(ranked) < limit:
+            ranked += heapq.nsmallest(limit - len(ranked), series_hits)
+        return ranked
+
+    def to_json(self):
+        """Compact JSON form the UI can load: terms, record lists, trigram and short-token postings (delta-encoded)"""
+        return {
+            "version": 2,
+            "gram": GRAM,
+            "terms": self.terms,
+            "term_records": [delta_encode(entries) for entries in self.term_records],
+            "postings": {gram: delta_encode(tids) for gram, tids in self.postings.items()},
+            "tokens": {token: delta_encode(tids) for token, tids in self.tokens.items()}
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data["terms"],
+            [delta_decode(entries) for entries in data["term_records"]],
+            {gram: delta_decode(tids) for gram, tids in data["postings"].items()},
+            {token: delta_decode(tids) for token, tids in data["tokens"].items()}
+        )
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_json(json.load(f))
+
+
+def main():
+    """Build the search index: ahri_search_index.py [results.json] [search_index.json] [query]"""
+    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT
+    output_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        catalog = build_catalog(json.load(f))
+
+    start = time.perf_counter()
+    index = SearchIndex.build(catalog["records"])
+    index.save(output_path)
+    print(f"🔤 {len(index.terms)} terms, {len(index.postings)} trigrams, {len(index.tokens)} short tokens → {output_path} "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    if len(sys.argv) > 3:
+        start = time.perf_counter()
+        hits = index.search(sys.argv[3])
+        elapsed = time.perf_counter() - start
+        for record_id in hits[:10]:
+            record = catalog["records"][record_id]
+            print(f"   • {record['model']} ({record['brand']}, {record['series'] or record['category']})")
+        print(f"🔍 {len(hits)} hits in {elapsed * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
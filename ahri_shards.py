@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+AHRI Shards - per-category and per-brand catalog artifacts with a manifest
+Splits the results into minified JSON shards, pre-compresses them (gzip, plus
+brotli when installed), names them by content hash and writes a small
+manifest so consumers fetch only the shards they need and cache them forever.
+A run's NDJSON stream can be sharded directly: only byte offsets are indexed,
+and one shard's records are loaded at a time.
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import time
+import hashlib
+from collections import OrderedDict
+
+from ahri_catalog_build import DEFAULT_INPUT, canonical_brand, first_value, resolve_schema
+from ahri_incremental import VOLATILE_FIELDS
+
+DEFAULT_OUTPUT_DIR = os.path.join("hvac-catalog", "public", "catalog")
+
+
+def shard_slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "unknown"
+
+
+def compress_gzip(payload):
+    # mtime=0 keeps the compressed bytes identical for identical content
+    return gzip.compress(payload, compresslevel=9, mtime=0)
+
+
+def compress_brotli(payload):
+    """Brotli bytes, or None when the brotli package is not installed"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(payload, quality=11)
+
+
+def group_shards(data):
+    """{shard key: (kind, name, products)} for every category and canonical brand"""
+    shards = {}
+    for category, products in data.get("products_by_category", {}).items():
+        shards[f"category:{category}"] = ("category", category, products)
+
+        brand_fields = resolve_schema(products)["brand"]
+        for product in products:
+            brand = canonical_brand(first_value(product, brand_fields))
+            if brand:
+                shards.setdefault(f"brand:{brand}", ("brand", brand, []))[2].append(product)
+    return shards
+
+
+def group_ndjson_shards(ndjson_path, category_order=None):
+    """{shard key: (kind, name, byte offsets)} for an NDJSON stream, in finalize_results' category order"""
+    offsets = OrderedDict()
+    headers = {}
+    with open(ndjson_path, 'rb') as f:
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            try:
+                product = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # blank or torn line
+            category = product.get("product_category", "")
+            offsets.setdefault(category, []).append(pos)
+            headers.setdefault(category, OrderedDict()).update((key, None) for key in product)
+
+        categories = [c for c in (category_order or []) if c in offsets]
+        categories += [c for c in offsets if c not in categories]
+        shards = {}
+        for category in categories:
+            shards[f"category:{category}"] = ("category", category, offsets[category])
+
+            # Every header the category uses stands in for its products when resolving brand fields
+            brand_fields = resolve_schema([headers[category]])["brand"]
+            for pos in offsets[category]:
+                f.seek(pos)
+                brand = canonical_brand(first_value(json.loads(f.readline()), brand_fields))
+                if brand:
+                    shards.setdefault(f"brand:{brand}", ("brand", brand, []))[2].append(pos)
+    return shards
+
+
+def read_offsets(ndjson_path, offsets):
+    """Records at the given byte offsets of an NDJSON file"""
+    with open(ndjson_path, 'rb') as f:
+        products = []
+        for pos in offsets:
+            f.seek(pos)
+            products.append(json.loads(f.readline()))
+        return products
+
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_shards(data, output_dir=DEFAULT_OUTPUT_DIR):
+    """Write changed shards of a results document and the manifest; returns (manifest, rebuilt shard count)"""
+    return _write_groups(group_shards(data), lambda products: products, data.get("scraping_summary", {}), output_dir)
+
+
+def write_ndjson_shards(ndjson_path, summary, output_dir=DEFAULT_OUTPUT_DIR, category_order=None):
+    """write_shards straight from an NDJSON stream, holding one shard's records at a time"""
+    return _write_groups(group_ndjson_shards(ndjson_path, category_order),
+                         lambda offsets: read_offsets(ndjson_path, offsets), summary, output_dir)
+
+
+def _write_groups(groups, load, source_summary, output_dir):
+    """Write changed shards of {key: (kind, name, items)}, load(items) giving the products"""
+    previous = load_manifest(output_dir).get("shards", {})
+    shards = {}
+    rebuilt = 0
+
+    for key, (kind, name, items) in sorted(groups.items()):
+        products = load(items)
+        # Per-run metadata would give identical content a new hash on every scrape
+        products = [{k: v for k, v in product.items() if k not in VOLATILE_FIELDS} for product in products]
+        payload = json.dumps(products, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        path = f"{kind}/{shard_slug(name)}.{digest[:12]}.json"
+        full_path = os.path.join(output_dir, path)
+
+        entry = previous.get(key)
+        if entry and entry.get("sha256") == digest and os.path.exists(full_path):
+            # Unchanged content - keep the existing files (and every client's cache)
+            shards[key] = entry
+            continue
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        entry = {"kind": kind, "name": name, "path": path, "records": len(products),
+                 "bytes": len(payload), "sha256": digest}
+        for suffix, encoded in ((".gz", compress_gzip(payload)), (".br", compress_brotli(payload))):
+            if encoded is not None:
+                with open(full_path + suffix, 'wb') as f:
+                    f.write(encoded)
+                entry[suffix.lstrip(".") + "_bytes"] = len(encoded)
+        with open(full_path, 'wb') as f:
+            f.write(payload)
+        shards[key] = entry
+        rebuilt += 1
+
+    # Drop files of shards whose content moved to a new hash (or disappeared)
+    for key, entry in previous.items():
+        if shards.get(key, {}).get("path") != entry.get("path"):
+            for suffix in ("", ".gz", ".br"):
+                stale = os.path.join(output_dir, entry["path"] + suffix)
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+    manifest = {
+        "version": 1,
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source_summary": source_summary,
+        "categories": {e["name"]: k for k, e in shards.items() if e["kind"] == "category"},
+        "brands": {e["name"]: k for k, e in shards.items() if e["kind"] == "brand"},
+        "shards": shards
+    }
+    tmp_path = os.path.join(output_dir, "manifest.json.tmp")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, os.path.join(output_dir, "manifest.json"))
+    return manifest, rebuilt
+
+
+def main():
+    """Shard a results file or a run's stream: ahri_shards.py [results.json | results.ndjson] [output_dir]"""
+    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT_DIR
+
+    if input_path.endswith(".ndjson"):
+        manifest, rebuilt = write_ndjson_shards(input_path, {"source": os.path.basename(input_path)}, output_dir)
+    else:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        manifest, rebuilt = write_shards(data, output_dir)
+    shards = manifest["shards"].values()
+    raw = sum(s["bytes"] for s in shards)
+    gz = sum(s.get("gz_bytes", 0) for s in shards)
+    manifest_size = os.path.getsize(os.path.join(output_dir, "manifest.json"))
+    print(f"🧩 {len(manifest['shards'])} shards ({rebuilt} rebuilt) → {output_dir}")
+    print(f"   {raw / 1024:.0f} KB minified, {gz / 1024:.0f} KB gzip, manifest {manifest_size / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+AHRI Stream - incremental NDJSON output for scraper runs
+Products are appended one per line as they are parsed, with periodic flushes,
+and a finalizer rebuilds the classic ahri_6_products_results.json shape
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import OrderedDict, defaultdict
+
+
+class NDJSONSink:
+    """Append-only, thread-safe NDJSON writer with periodic flushes
+
+    on_flush() runs after every fsync, once the rows written so far are durable.
+    """
+
+    def __init__(self, path, flush_every=50, append=False, on_flush=None):
+        self.path = path
+        self.flush_every = max(1, int(flush_every))
+        self.on_flush = on_flush
+        self.lock = threading.Lock()
+        self.category_counts = OrderedDict()
+        self.pending = 0
+        if append:
+            truncate_torn_line(path)
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, product):
+        """Append one product; flushes to disk every flush_every records"""
+        line = json.dumps(product, ensure_ascii=False)
+        category = product.get("product_category", "")
+        with self.lock:
+            self.file.write(line + "\n")
+            self.category_counts[category] = self.category_counts.get(category, 0) + 1
+            self.pending += 1
+            if self.pending >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        if self.on_flush:
+            self.on_flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    @property
+    def total(self):
+        return sum(self.category_counts.values())
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self._flush()
+                self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def truncate_torn_line(path):
+    """Cut a half-written last line left by a crash, so appended records start on a fresh line"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the last complete line
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(position - step + newline + 1)
+                return
+            position -= step
+        f.truncate(0)
+
+
+def iter_ndjson(path):
+    """Yield records from an NDJSON file, skipping a torn last line after a crash"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _indent_block(text, prefix):
+    """Re-indent a json.dumps(indent=2) block so it nests inside the output document"""
+    return text.replace("\n", "\n" + prefix)
+
+
+def finalize_results(ndjson_path, output_path, summary, brand_distribution=None, category_order=None):
+    """Stream NDJSON records into the ahri_6_products_results.json layout
+
+    Only byte offsets are held in memory, never the products themselves,
+    and writes to a temp file first so a crash never leaves a half-written result.
+    """
+    # Index pass: byte offsets of each category's records, in first-seen order
+    offsets = OrderedDict()
+    with open(ndjson_path, 'rb') as f:
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                category = json.loads(line).get("product_category", "")
+            except json.JSONDecodeError:
+                continue
+            offsets.setdefault(category, []).append(pos)
+
+    categories = [c for c in (category_order or []) if c in offsets]
+    categories += [c for c in offsets if c not in categories]
+
+    summary = {
+        "total_products": sum(len(offsets[c]) for c in categories),
+        "categories_scraped": len(categories),
+        **{k: v for k, v in summary.items() if k not in ("total_products", "categories_scraped")}
+    }
+
+    tmp_path = output_path + ".tmp"
+    with open(ndjson_path, 'rb') as src, open(tmp_path, 'w', encoding='utf-8') as out:
+        out.write("{\n")
+        out.write('  "scraping_summary": ' + _indent_block(json.dumps(summary, indent=2, ensure_ascii=False), "  ") + ",\n")
+        out.write('  "brand_distribution": ' + _indent_block(json.dumps(brand_distribution or {}, indent=2, ensure_ascii=False), "  ") + ",\n")
+        out.write('  "products_by_category": {')
+
+        for i, category in enumerate(categories):
+            out.write("," if i else "")
+            out.write("\n    " + json.dumps(category, ensure_ascii=False) + ": [")
+            for j, pos in enumerate(offsets[category]):
+                src.seek(pos)
+                product = json.loads(src.readline())
+                out.write("," if j else "")
+                out.write("\n      " + _indent_block(json.dumps(product, indent=2, ensure_ascii=False), "      "))
+            out.write("\n    ]")
+
+        out.write("\n  }\n}" if categories else "}\n}")
+
+    os.replace(tmp_path, output_path)
+    return summary
+
+
+def brand_distribution_from_ndjson(ndjson_path, brand_fn):
+    """Recount brands from the stream (used when finalizing a crashed run)"""
+    counts = defaultdict(int)
+    for product in iter_ndjson(ndjson_path):
+        counts[brand_fn(product)] += 1
+    return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+
+def main():
+    """Finalize a stream from a crashed or interrupted run: ahri_stream.py in.ndjson [out.json]"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahri_stream.py <results.ndjson> [output.json]")
+        return
+
+    ndjson_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else "ahri_6_products_results.json"
+
+    from selenium_scraper import AHRISpecialized6Products
+
+    summary = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "source": "ahridirectory.org",
+        "method": "specialized_6_products_scraper"
+    }
+    brand_distribution = brand_distribution_from_ndjson(ndjson_path, AHRISpecialized6Products().extract_brand)
+    summary = finalize_results(ndjson_path, output_path, summary, brand_distribution)
+    print(f"📁 {summary['total_products']} products from {summary['categories_scraped']} categories saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
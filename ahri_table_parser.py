@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+AHRI Table Parser - bulk results table extraction
+Pulls the whole results table in one browser round-trip (or from saved HTML)
+and builds the header -> value product dicts in Python
+"""
+
+import sys
+import json
+import time
+from html.parser import HTMLParser
+from collections import OrderedDict
+
+DATA_SOURCE = "ahri_specialized_6_products"
+
+# Runs inside the browser: pick the table with the most rows and return every
+# row as a list of cell texts. Mirrors find_elements("tr") / ("td, th") + .text
+TABLE_EXTRACT_SCRIPT = """
+const tables = Array.from(document.querySelectorAll('table'));
+if (!tables.length) { return null; }
+let best = tables[0];
+let bestCount = best.querySelectorAll('tr').length;
+for (const table of tables) {
+    const count = table.querySelectorAll('tr').length;
+    if (count > bestCount) { best = table; bestCount = count; }
+}
+return Array.from(best.querySelectorAll('tr')).map(
+    row => Array.from(row.querySelectorAll('td, th')).map(cell => (cell.innerText || '').trim())
+);
+"""
+
+
+def normalize_cell_text(text):
+    """Collapse raw markup whitespace the way rendered cell text reads"""
+    lines = [" ".join(line.split()) for line in (text or "").splitlines()]
+    return "\n".join(line for line in lines if line).strip()
+
+
+class _TableCollector(HTMLParser):
+    """Stdlib fallback: collect rows/cells of every table, nested rows included"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self.stack = []  # open tables: {"rows": [...], "row": [...] | None, "cell": [...] | None}
+        self.skip_depth = 0
+
+    def _close_cell(self, frame):
+        if frame["cell"] is not None:
+            frame["row"].append(normalize_cell_text("".join(frame["cell"])))
+            frame["cell"] = None
+
+    def _close_row(self, frame):
+        self._close_cell(frame)
+        frame["row"] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self.skip_depth += 1
+        elif tag == "table":
+            frame = {"rows": [], "row": None, "cell": None}
+            self.tables.append(frame["rows"])
+            self.stack.append(frame)
+        elif not self.stack:
+            return
+        elif tag == "tr":
+            frame = self.stack[-1]
+            self._close_row(frame)
+            frame["row"] = []
+            frame["rows"].append(frame["row"])
+            # querySelectorAll('tr') also counts rows of nested tables
+            for outer_frame in self.stack[:-1]:
+                outer_frame["rows"].append([])
+        elif tag in ("td", "th"):
+            frame = self.stack[-1]
+            if frame["row"] is None:
+                frame["row"] = []
+                frame["rows"].append(frame["row"])
+            self._close_cell(frame)
+            frame["cell"] = []
+        elif tag == "br":
+            self.handle_data("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif not self.stack:
+            return
+        elif tag == "table":
+            frame = self.stack.pop()
+            self._close_row(frame)
+        elif tag == "tr":
+            self._close_row(self.stack[-1])
+        elif tag in ("td", "th"):
+            self._close_cell(self.stack[-1])
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        # Text belongs to every open cell, like innerText of an enclosing cell
+        for frame in self.stack:
+            if frame["cell"] is not None:
+                frame["cell"].append(data)
+
+
+def _parse_tables_lxml(html):
+    """Parse with lxml when it is installed - much faster on large tables"""
+    import lxml.html
+
+    doc = lxml.html.fromstring(html)
+    for junk in doc.xpath("//script | //style"):
+        junk.drop_tree()
+    for br in doc.xpath("//br"):
+        br.tail = "\n" + (br.tail or "")
+
+    tables = []
+    for table in doc.iter("table"):
+        rows = []
+        for row in table.iter("tr"):
+            rows.append([normalize_cell_text(cell.text_content())
+                         for cell in row.iter("td", "th")])
+        tables.append(rows)
+    return tables
+
+
+def parse_tables_html(html):
+    """Return every table in the HTML as a list of rows of cell texts"""
+    try:
+        return _parse_tables_lxml(html)
+    except ImportError:
+        collector = _TableCollector()
+        collector.feed(html)
+        collector.close()
+        return collector.tables
+
+
+def largest_table_rows(tables):
+    """Pick the table with the most rows (most likely to be results)"""
+    if not tables:
+        return None
+    return max(tables, key=len)
+
+
+def parse_results_table_html(html):
+    """Rows of the results table in a page_source snapshot or saved fixture"""
+    return largest_table_rows(parse_tables_html(html))
+
+
+def cell_value(value):
+    """Render an API value the way the results table would show it"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(cell_value(v) for v in value)
+    return str(value).strip()
+
+
+def api_payload_to_rows(payload):
+    """Normalize a JSON search response into (rows, total_count)
+
+    Accepts a bare list of records, a {"results"|"data"|"items"|"records": [...]}
+    envelope, or a {"headers"|"columns": [...], "rows": [[...]]} table. rows[0] is
+    the header row, so the result feeds iter_row_products like a scraped table.
+    total_count is None when the response does not say how many rows exist.
+    """
+    total = None
+    records = payload
+
+    if isinstance(payload, dict):
+        for key in ("total", "totalCount", "totalRecords", "recordsTotal", "count"):
+            if isinstance(payload.get(key), int):
+                total = payload[key]
+                break
+
+        if "rows" in payload and ("headers" in payload or "columns" in payload):
+            headers = payload.get("headers") or payload.get("columns")
+            headers = [h.get("title") or h.get("name") if isinstance(h, dict) else h for h in headers]
+            rows = [[cell_value(h) for h in headers]]
+            rows += [[cell_value(v) for v in row] for row in payload["rows"]]
+            return rows, total
+
+        records = next((payload[key] for key in ("results", "data", "items", "records")
+                        if isinstance(payload.get(key), list)), [])
+
+    if not records:
+        return [], total
+
+    # Union of record keys in first-seen order becomes the header row
+    headers = list(OrderedDict((key, None) for record in records for key in record))
+    rows = [headers]
+    rows += [[cell_value(record.get(h)) for h in headers] for record in records]
+    return rows, total
+
+
+def row_to_product(category_name, headers, cell_texts):
+    """Map one row of cell texts onto the header row, same shape as before"""
+    product = {
+        "extraction_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "data_source": DATA_SOURCE,
+        "product_category": category_name
+    }
+
+    for j, text in enumerate(cell_texts):
+        if text and j < len(headers) and headers[j]:
+            product[headers[j]] = text
+        elif text:
+            product[f"field_{j}"] = text
+
+    return product
+
+
+def iter_row_products(category_name, rows):
+    """Yield a product dict for every non-empty data row (first row is headers)"""
+    if not rows or len(rows) < 2:
+        return
+
+    headers = [str(h).strip() for h in rows[0]]
+    for row in rows[1:]:
+        cell_texts = [str(cell).strip() for cell in row]
+        if not any(cell_texts):
+            continue
+        yield row_to_product(category_name, headers, cell_texts)
+
+
+def main():
+    """Parse a saved results page: ahri_table_parser.py page.html [category]"""
+    if len(sys.argv) < 2:
+        print("Usage: python ahri_table_parser.py <saved_results.html> [category]")
+        return
+
+    category_name = sys.argv[2] if len(sys.argv) > 2 else "Unknown"
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    start = time.perf_counter()
+    rows = parse_results_table_html(html) or []
+    products = list(iter_row_products(category_name, rows))
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps(products[:3], indent=2, ensure_ascii=False))
+    print(f"📋 {len(rows)} rows → {len(products)} products in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,81 +5,302 @@ File name: ahri_specialized_6_products.py
 Specializes in the 6 main product categories from homepage cards
 """
 
+import os
+import sys
 import json
 import time
+import queue
 import logging
-import hashlib
-from collections import defaultdict
+import argparse
+import threading
+import itertools
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from ahri_table_parser import TABLE_EXTRACT_SCRIPT, api_payload_to_rows, iter_row_products, parse_results_table_html
+from ahri_stream import NDJSONSink, finalize_results, iter_ndjson
+from ahri_incremental import IncrementalRun, RecordStore, write_snapshot
+from ahri_dedup_index import DedupIndex, product_identity
+from ahri_catalog_build import (DEFAULT_OUTPUT as DEFAULT_CATALOG_FILE, SPECS_FILE as CATALOG_SPECS_FILE,
+                                build_catalog, write_catalog)
+from ahri_search_index import SearchIndex
+from ahri_model_patterns import ModelPatternIndex
+from ahri_columnar import DEFAULT_OUTPUT_DIR as DEFAULT_COLUMNAR_DIR, export_columnar
+from ahri_shards import DEFAULT_OUTPUT_DIR as DEFAULT_SHARDS_DIR, write_ndjson_shards
+from ahri_metrics import NullMetrics, RunMetrics, start_metrics_server
+from ahri_nav_cache import DEFAULT_CACHE_FILE as DEFAULT_NAV_CACHE_FILE, NavigationCache
+from ahri_quota import QuotaEngine, resolve_brand
+from ahri_enrich import DEFAULT_CACHE_DIR as DEFAULT_DETAIL_CACHE_DIR, DEFAULT_MAX_AGE as DEFAULT_DETAIL_MAX_AGE, DetailEnricher, HTTPCache
+from ahri_retry import AdaptiveRateLimiter, FailureLog, RetryPolicy, ThrottledError, TransientError, run_step
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def page_url(url, page, param="page"):
+    """url pointing at another results page, or None when url does not carry a page number"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(key == param for key, _ in query):
+        return None
+    query = [(key, str(page) if key == param else value) for key, value in query]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
 class AHRISpecialized6Products:
-    def __init__(self, headless=False):
-        self.base_url = "https://www.ahridirectory.org"
-        self.driver = None
+    def __init__(self, headless=False, workers=1, backend="selenium", base_url="https://www.ahridirectory.org"):
+        self.base_url = base_url.rstrip("/")
+        self._driver = None
         self.headless = headless
+        self.pause_before_close = not headless  # wait for Enter before quitting a visible browser
+        
+        # Lean browser profile: eager loads, heavy resources blocked, warm profile + cached driver
+        self.lean = False
+        self.profile_dir = None  # per-session Chrome user-data dirs live under here (kept between runs)
+        self.profile_sessions = 0
+        self.driver_path = None  # chromedriver binary; resolved once and cached in driver_cache_file
+        self.driver_cache_file = ".ahri_chromedriver_path"
+        self.blocked_url_patterns = [
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+            "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+            "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg", "*.wav",
+            "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+            "*facebook.net*", "*hotjar.com*", "*clarity.ms*", "*hubspot.com*", "*hs-scripts.com*",
+            "*linkedin.com/px*", "*licdn.com*", "*newrelic.com*", "*nr-data.net*", "*youtube.com*"
+        ]
         
-        # Track products globally
-        self.seen_products = set()
+        # Fetch backend: "selenium" drives Chrome, "http" calls the search endpoint directly
+        self.backend = backend
+        self.http_session = None
+        self.http_concurrency = 8
+        self.api_page_size = 100
+        self.api_search_path = "/api/search?program={program}&page={page}&pageSize={page_size}"
+        
+        # Concurrent mode: pool of isolated browser sessions; categories are split
+        # into jobs of pages_per_job results pages, run on whichever session is free
+        self.workers = max(1, int(workers))
+        self.drivers = []
+        self.pages_per_job = 5
+        self.driver_pool = None  # queue of idle sessions while a concurrent run is going
+        self.page_executor = None
+        self._local = threading.local()
+        self.lock = threading.RLock()
+        
+        # Track products globally (guarded by self.lock); dedup keys live on disk
+        self.dedup_file = "ahri_dedup_index.sqlite"
+        self.run_id = None  # reuse a previous run's id to resume it without re-emitting rows
+        self.dedup_index = None
         self.duplicate_count = 0
-        self.brand_counts = defaultdict(int)
+        self.brand_counts = defaultdict(int)  # emitted products per brand
+        self.resumed_counts = {}  # products per category a resumed run's stream already holds
+        self.resumed_identities = set()  # reservoir sampling only: identities not to emit twice
+        
+        # Brand diversity: caps across / within categories; "first" fills them in arrival
+        # order while streaming, "reservoir" samples by seeded priority once every row is read
         self.max_per_brand = 40
+        self.max_per_brand_per_category = 0
+        self.sampling = "first"
+        self.sample_seed = 0
+        self.quota = None
+        
+        # Per-step readiness timeouts (seconds) - waits return as soon as the page is ready
+        self.timeouts = {
+            "page_load": 20,
+            "cookie_banner": 3,
+            "category_card": 10,
+            "navigation": 15,
+            "search_button": 10,
+            "results_table": 30,
+            "next_page": 20
+        }
+        self.poll_interval = 0.1
+        self.cookies_accepted = set()  # id() of sessions past the cookie banner
+        
+        # Navigation cache: resolved results URL per category (None = always click through)
+        self.nav_cache_file = DEFAULT_NAV_CACHE_FILE
+        self.nav_cache = None
+        
+        # Streaming output: products are appended to NDJSON as parsed, then finalized
+        self.output_file = "ahri_6_products_results.json"
+        self.stream_file = "ahri_6_products_results.ndjson"
+        self.flush_every = 50
+        self.sink = None
+        self.category_brands = defaultdict(set)
+        
+        # Incremental mode: compare against the ref-keyed store, stop at known rows
+        self.incremental = False
+        self.store_file = "ahri_record_store.sqlite"
+        self.delta_file = "ahri_6_products_delta.json"
+        self.stop_after_unchanged = 200
+        self.incremental_run = None
+        
+        # Detail-page enrichment per AHRI Ref. # through an on-disk HTTP cache (off by default)
+        self.enrich_details = False
+        self.detail_workers = 8
+        self.detail_cache_dir = DEFAULT_DETAIL_CACHE_DIR
+        self.detail_max_age = DEFAULT_DETAIL_MAX_AGE  # 0 = always revalidate with ETag / Last-Modified
+        
+        # Post-scrape catalog build for the UI (None = skip)
+        self.catalog_file = None
+        
+        # Table headers per category, saved alongside results for typed exports
+        self.headers_file = "ahri_6_products_headers.json"
+        self.category_headers = {}
+        self.columnar_dir = None
+        
+        # Per-category / per-brand compressed shards + manifest (None = skip)
+        self.shards_dir = DEFAULT_SHARDS_DIR
+        
+        # Run metrics: NullMetrics (off) unless a report, Prometheus file or endpoint is requested
+        self.metrics = NullMetrics()
+        self.metrics_file = None
+        self.prometheus_file = None
+        self.run_summary = None
+        
+        # Retries and pacing: per-step backoff, AIMD request rate, failed pages kept for a re-run
+        self.retry_policy = RetryPolicy()
+        self.rate_limiter = AdaptiveRateLimiter()
+        self.failed_pages_file = "ahri_failed_pages.json"
+        self.failure_log = FailureLog(None)  # replaced at the start of each run
+        self.page_filter = {}  # {category: PageSet or None} when re-running failed pages
+        
+        # Pagination: None walks every results page of a category
+        self.max_pages = None
+        self.next_page_selectors = [
+            "//button[@aria-label='Next page' or @aria-label='Next']",
+            "//a[@aria-label='Next page' or @aria-label='Next']",
+            "//li[contains(@class, 'next')]/a",
+            "//button[normalize-space()='Next' or normalize-space()='›' or normalize-space()='»']",
+            "//a[normalize-space()='Next' or normalize-space()='›' or normalize-space()='»']"
+        ]
         
         # EXACT 6 categories from homepage cards - in order they appear
         self.categories = {
             "Air Conditioning": {
                 "target": 250,
                 "click_text": "Air Conditioning",
-                "verify_text": "Air Conditioners"
+                "verify_text": "Air Conditioners",
+                "api_program": "air-conditioners"
             },
             "Air-Source Heat Pumps": {
                 "target": 250,
                 "click_text": "Air-Source Heat Pumps",
-                "verify_text": "Heat Pumps"
+                "verify_text": "Heat Pumps",
+                "api_program": "air-source-heat-pumps"
             },
             "Residential Furnaces": {
                 "target": 250,
                 "click_text": "Residential Furnaces",
-                "verify_text": "Furnaces"
+                "verify_text": "Furnaces",
+                "api_program": "residential-furnaces"
             },
             "Residential Water Heaters": {
                 "target": 250,
                 "click_text": "Residential Water Heaters",
-                "verify_text": "Water Heaters"
+                "verify_text": "Water Heaters",
+                "api_program": "residential-water-heaters"
             },
             "Residential Boilers": {
                 "target": 250,
                 "click_text": "Residential Boilers",
-                "verify_text": "Boilers"
+                "verify_text": "Boilers",
+                "api_program": "residential-boilers"
             },
             "Geothermal - Water-Source Heat Pumps": {
                 "target": 250,
                 "click_text": "Geothermal - Water-Source Heat Pumps",
-                "verify_text": "Geothermal"
+                "verify_text": "Geothermal",
+                "api_program": "water-source-heat-pumps"
             }
         }
         
+    @property
+    def driver(self):
+        """WebDriver bound to the current worker thread, else the main session"""
+        return getattr(self._local, "driver", None) or self._driver
+    
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
+    
+    def resolve_driver_path(self):
+        """chromedriver path: explicit, else cached from an earlier run, else downloaded once"""
+        with self.lock:
+            if self.driver_path and os.path.exists(self.driver_path):
+                return self.driver_path
+            
+            if self.driver_cache_file and os.path.exists(self.driver_cache_file):
+                with open(self.driver_cache_file, 'r', encoding='utf-8') as f:
+                    cached = f.read().strip()
+                if cached and os.path.exists(cached):
+                    self.driver_path = cached
+                    return cached
+            
+            from webdriver_manager.chrome import ChromeDriverManager
+            self.driver_path = ChromeDriverManager().install()
+            if self.driver_cache_file:
+                with open(self.driver_cache_file, 'w', encoding='utf-8') as f:
+                    f.write(self.driver_path)
+            logger.info(f"💾 chromedriver cached at {self.driver_path}")
+            return self.driver_path
+    
+    def next_profile_dir(self):
+        """Own user-data dir per live session (Chrome locks it), reused by the next run"""
+        with self.lock:
+            path = os.path.join(self.profile_dir, f"session-{self.profile_sessions}")
+            self.profile_sessions += 1
+        os.makedirs(path, exist_ok=True)
+        return os.path.abspath(path)
+    
+    def create_driver(self):
+        """Create one Chrome WebDriver session"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        
+        chrome_options = Options()
+        if self.headless or self.lean:
+            chrome_options.add_argument("--headless=new")
+        
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--window-size=1920,1080")
+        
+        if self.lean:
+            # Return from get() at DOMContentLoaded; the waits below cover the rest
+            chrome_options.page_load_strategy = "eager"
+            for argument in ("--disable-gpu", "--disable-extensions", "--mute-audio", "--no-first-run",
+                             "--disable-background-networking", "--disable-component-update",
+                             "--disable-default-apps", "--disable-sync", "--blink-settings=imagesEnabled=false",
+                             "--disable-features=Translate,MediaRouter,OptimizationHints"):
+                chrome_options.add_argument(argument)
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2
+            })
+        
+        if self.profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={self.next_profile_dir()}")
+        
+        service = Service(self.resolve_driver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Explicit waits only - an implicit wait would stall every missed find_elements probe
+        driver.implicitly_wait(0)
+        driver.set_page_load_timeout(self.timeouts["page_load"])
+        
+        if self.lean:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_url_patterns})
+            except Exception as e:
+                logger.warning(f"⚠️  Request blocking unavailable: {e}")
+        return self.metrics.instrument_driver(driver)
+    
     def setup_driver(self):
         """Setup Chrome WebDriver - one session for all"""
         try:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from webdriver_manager.chrome import ChromeDriverManager
-            from selenium.webdriver.chrome.service import Service
-            
-            chrome_options = Options()
-            if self.headless:
-                chrome_options.add_argument("--headless")
-            
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--window-size=1920,1080")
-            
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(10)
-            
+            self.driver = self.create_driver()
             logger.info("✅ Single WebDriver session created for all 6 categories")
             return True
             
@@ -87,6 +308,64 @@ class AHRISpecialized6Products:
             logger.error(f"❌ WebDriver setup failed: {e}")
             return False
     
+    def setup_driver_pool(self):
+        """Setup a pool of isolated WebDriver sessions for concurrent mode"""
+        size = self.workers
+        
+        # Browser startup dominates, so launch the sessions in parallel too
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(self.create_driver) for _ in range(size)]
+            for future in as_completed(futures):
+                try:
+                    self.drivers.append(future.result())
+                except Exception as e:
+                    logger.error(f"❌ WebDriver setup failed: {e}")
+        
+        if not self.drivers:
+            return False
+        
+        logger.info(f"✅ Pool of {len(self.drivers)} WebDriver sessions created")
+        return True
+    
+    def wait_for(self, condition, step):
+        """Poll condition(driver) until truthy or the step's timeout expires; None on timeout"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+        
+        try:
+            return WebDriverWait(self.driver, self.timeouts[step], poll_frequency=self.poll_interval).until(condition)
+        except TimeoutException:
+            logger.debug(f"Timed out after {self.timeouts[step]}s waiting for {step}")
+            return None
+    
+    def wait_for_document_ready(self):
+        """Wait until the document has finished loading (DOM parsed is enough for lean sessions)"""
+        ready_states = ("interactive", "complete") if self.lean else ("complete",)
+        return self.wait_for(
+            lambda d: d.execute_script("return document.readyState") in ready_states, "page_load"
+        )
+    
+    def wait_for_url_change(self, old_url):
+        """Wait until navigation away from old_url; returns the new URL or None"""
+        return self.wait_for(lambda d: d.current_url if d.current_url != old_url else False, "navigation")
+    
+    def wait_for_results_table(self):
+        """Wait until a table with at least one data row is rendered"""
+        return self.wait_for(lambda d: d.execute_script(
+            "return Array.from(document.querySelectorAll('table'))"
+            ".some(t => t.querySelectorAll('tr').length > 1);"
+        ), "results_table")
+    
+    def find_displayed(self, by, selector, predicate=None):
+        """First displayed element matching selector (and predicate), or None - never blocks"""
+        for elem in self.driver.find_elements(by, selector):
+            try:
+                if elem.is_displayed() and (predicate is None or predicate(elem)):
+                    return elem
+            except Exception:
+                continue
+        return None
+    
     def go_to_homepage_fresh(self):
         """Go to AHRI homepage and handle any popups"""
         try:
@@ -94,21 +373,23 @@ class AHRISpecialized6Products:
             
             logger.info("🏠 Loading fresh AHRI homepage...")
             self.driver.get(self.base_url)
-            time.sleep(4)
+            self.wait_for_document_ready()
             
-            # Handle cookie banner
-            try:
-                accept_button = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Accept')]")
-                if accept_button.is_displayed():
-                    accept_button.click()
-                    logger.info("✅ Accepted cookies")
-                    time.sleep(2)
-            except:
-                pass
+            # Handle cookie banner - once per session, the consent cookie sticks after that
+            if id(self.driver) not in self.cookies_accepted:
+                try:
+                    accept_xpath = "//button[contains(text(), 'Accept')]"
+                    accept_button = self.wait_for(lambda d: self.find_displayed(By.XPATH, accept_xpath), "cookie_banner")
+                    if accept_button:
+                        accept_button.click()
+                        logger.info("✅ Accepted cookies")
+                        self.wait_for(lambda d: self.find_displayed(By.XPATH, accept_xpath) is None, "cookie_banner")
+                    self.cookies_accepted.add(id(self.driver))
+                except:
+                    pass
             
             # Scroll to make sure category cards are visible
             self.driver.execute_script("window.scrollTo(0, 600);")
-            time.sleep(2)
             
             logger.info("✅ Homepage loaded and ready")
             return True
@@ -129,15 +410,14 @@ class AHRISpecialized6Products:
             # Look for the category card - try multiple approaches
             found_element = None
             
-            # Strategy 1: Look for exact text in any element
+            # Strategy 1: Look for exact text in any element (waits for cards to render)
             try:
                 xpath = f"//*[contains(text(), '{click_text}')]"
-                elements = self.driver.find_elements(By.XPATH, xpath)
-                for elem in elements:
-                    if elem.is_displayed() and click_text.lower() in elem.text.lower():
-                        found_element = elem
-                        logger.info(f"✅ Found exact match: '{elem.text.strip()}'")
-                        break
+                found_element = self.wait_for(lambda d: self.find_displayed(
+                    By.XPATH, xpath, lambda elem: click_text.lower() in elem.text.lower()
+                ), "category_card")
+                if found_element:
+                    logger.info(f"✅ Found exact match: '{found_element.text.strip()}'")
             except:
                 pass
             
@@ -154,6 +434,7 @@ class AHRISpecialized6Products:
                                 elem_text = elem.text.lower()
                                 if any(word in elem_text for word in click_text.lower().split()):
                                     found_element = elem
+                                    self.metrics.count("fallback_hits", step="category_card", selector="partial_text")
                                     logger.info(f"✅ Found partial match: '{elem.text.strip()}'")
                                     break
                         if found_element:
@@ -170,21 +451,21 @@ class AHRISpecialized6Products:
             current_element = found_element
             
             for attempt in range(3):  # Try element, parent, grandparent
+                if attempt:
+                    self.metrics.count("click_retries", step="category_card")
                 try:
                     # Scroll element into view
                     self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", current_element)
-                    time.sleep(1)
                     
                     # Get current URL to check if we navigate
                     current_url = self.driver.current_url
                     
                     # Try to click
                     ActionChains(self.driver).move_to_element(current_element).click().perform()
-                    time.sleep(4)  # Wait for navigation
                     
-                    # Check if URL changed (indicating successful navigation)
-                    new_url = self.driver.current_url
-                    if new_url != current_url:
+                    # Wait for the URL to change (indicating successful navigation)
+                    new_url = self.wait_for_url_change(current_url)
+                    if new_url:
                         logger.info(f"✅ Successfully clicked '{click_text}' - navigated to new page")
                         logger.info(f"📍 New URL: {new_url}")
                         clicked = True
@@ -237,19 +518,22 @@ class AHRISpecialized6Products:
                 "//button[@type='submit']"
             ]
             
-            search_button = None
-            for selector in search_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for elem in elements:
-                        if elem.is_displayed() and elem.is_enabled():
-                            search_button = elem
-                            logger.info(f"✅ Found search button")
-                            break
-                    if search_button:
-                        break
-                except:
-                    continue
+            def find_search_button(driver):
+                # Probe every selector per poll - misses cost nothing without implicit waits
+                for position, selector in enumerate(search_selectors):
+                    try:
+                        elem = self.find_displayed(By.XPATH, selector, lambda e: e.is_enabled())
+                        if elem:
+                            if position:
+                                self.metrics.count("fallback_hits", step="search_button", selector=selector)
+                            return elem
+                    except:
+                        continue
+                return None
+            
+            search_button = self.wait_for(find_search_button, "search_button")
+            if search_button:
+                logger.info(f"✅ Found search button")
             
             if not search_button:
                 logger.warning("⚠️  No search button found")
@@ -259,7 +543,8 @@ class AHRISpecialized6Products:
             try:
                 ActionChains(self.driver).move_to_element(search_button).click().perform()
                 logger.info("🖱️  Clicked Search button")
-                time.sleep(8)  # Wait for results to load
+                if not self.wait_for_results_table():
+                    logger.warning(f"⚠️  No results table after {self.timeouts['results_table']}s")
                 return True
             except Exception as e:
                 logger.error(f"❌ Error clicking search button: {e}")
@@ -269,80 +554,347 @@ class AHRISpecialized6Products:
             logger.error(f"❌ Error in search process: {e}")
             return False
     
+    def extract_table_rows(self):
+        """Pull the whole results table as rows of cell texts in one round-trip"""
+        try:
+            rows = self.driver.execute_script(TABLE_EXTRACT_SCRIPT)
+            if rows is not None:
+                return rows
+        except Exception as e:
+            logger.debug(f"Table script failed, parsing page source instead: {e}")
+        
+        # Fallback: one page_source snapshot parsed locally
+        self.metrics.count("fallback_hits", step="table_extract", selector="page_source")
+        return parse_results_table_html(self.driver.page_source)
+    
     def extract_table_data(self, category_name, target_count):
-        """Extract data from results table"""
+        """Extract data from the currently rendered results page"""
         try:
-            from selenium.webdriver.common.by import By
-            
             logger.info(f"📊 Extracting data for {category_name}...")
             
-            # Find table
-            tables = self.driver.find_elements(By.TAG_NAME, "table")
-            if not tables:
-                logger.error("❌ No table found")
+            rows = self.extract_table_rows()
+            if not self.check_table_rows(rows):
                 return []
             
-            # Use largest table (most likely to be results)
-            main_table = max(tables, key=lambda t: len(t.find_elements(By.TAG_NAME, "tr")))
-            rows = main_table.find_elements(By.TAG_NAME, "tr")
-            
-            logger.info(f"📋 Table has {len(rows)} rows")
-            
-            if len(rows) < 2:
-                logger.error("❌ No data rows")
-                return []
+            return list(self.iter_accepted_products(category_name, iter_row_products(category_name, rows), target_count))
             
-            # Extract headers
-            header_cells = rows[0].find_elements(By.CSS_SELECTOR, "th, td")
-            headers = [cell.text.strip() for cell in header_cells]
+        except Exception as e:
+            logger.error(f"❌ Error extracting data: {e}")
+            return []
+    
+    def check_table_rows(self, rows):
+        """Log table shape; False when there is nothing to extract"""
+        if rows is None:
+            logger.error("❌ No table found")
+            return False
+        
+        logger.info(f"📋 Table has {len(rows)} rows")
+        
+        if len(rows) < 2:
+            logger.error("❌ No data rows")
+            return False
+        
+        headers = rows[0]
+        if headers:
+            logger.info(f"📋 Headers: {headers[:3]}...")
+        return True
+    
+    def table_signature(self):
+        """Cheap fingerprint of the rendered results page (row count + first data row); None mid-render"""
+        try:
+            return self.driver.execute_script(
+                "const t = Array.from(document.querySelectorAll('table'))"
+                ".sort((a, b) => b.querySelectorAll('tr').length - a.querySelectorAll('tr').length)[0];"
+                "if (!t) { return null; }"
+                "const rows = t.querySelectorAll('tr');"
+                "return rows.length + '|' + (rows.length > 1 ? rows[1].innerText : '');"
+            )
+        except Exception:
+            return None
+    
+    def find_next_button(self):
+        """The pager's enabled Next control, or None on the last page"""
+        from selenium.webdriver.common.by import By
+        
+        def is_enabled_pager(elem):
+            classes = (elem.get_attribute("class") or "").lower()
+            return (elem.is_enabled() and "disabled" not in classes
+                    and elem.get_attribute("aria-disabled") != "true")
+        
+        for position, selector in enumerate(self.next_page_selectors):
+            try:
+                next_button = self.find_displayed(By.XPATH, selector, is_enabled_pager)
+                if next_button:
+                    if position:
+                        self.metrics.count("fallback_hits", step="next_page", selector=selector)
+                    return next_button
+            except:
+                continue
+        return None
+    
+    def go_to_next_page(self):
+        """Click the pager's Next control and wait for new rows; False on the last page
+
+        Raises TransientError when the click does not render a new page, so the
+        caller can retry just this step.
+        """
+        next_button = self.find_next_button()
+        if not next_button:
+            return False
+        
+        before = self.table_signature()
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", next_button)
+        
+        if not self.wait_for(lambda d: self.table_signature() not in (before, None), "next_page"):
+            raise TransientError("next page did not render new rows")
+        return True
+    
+    def retry_logger(self, category_name, step):
+        """on_retry callback for run_step: log and count each retry of a step"""
+        def on_retry(attempt, error, delay):
+            self.metrics.count("retries", step=step)
+            logger.warning(f"🔁 {category_name}: {step} failed ({error}) - retry {attempt} in {delay:.1f}s")
+        return on_retry
+    
+    def run_step(self, category_name, step, func, page=None, limited=True, retry_on=(Exception,), onward=False):
+        """Run one step under the retry policy; records it in the failure log and re-raises if it never succeeds
+
+        onward=True records the failure as "page and everything after it".
+        """
+        try:
+            return run_step(func, self.retry_policy, self.rate_limiter if limited else None,
+                            on_retry=self.retry_logger(category_name, step), retry_on=retry_on)
+        except Exception as e:
+            self.metrics.count("step_failures", step=step)
+            # Nothing past a failed first page was read, so that re-runs the whole category
+            self.failure_log.record(category_name, step, e, page=page if page != 1 else None,
+                                    attempts=self.retry_policy.attempts, onward=onward)
+            where = f" (page {page}{' onward' if onward else ''})" if page else ""
+            logger.error(f"❌ {category_name}: {step}{where} failed after "
+                         f"{self.retry_policy.attempts} attempts: {e}")
+            raise
+    
+    def read_results_page(self, category_name, page):
+        """Table rows of the rendered page; a table without data rows is re-rendered and retried"""
+        def attempt():
+            if attempt.count:
+                # Flaky render: reload the page and wait for the table before reading again
+                self.driver.refresh()
+                self.wait_for_document_ready()
+                self.wait_for_results_table()
+            attempt.count += 1
+            with self.metrics.stage("extract_table", category=category_name):
+                rows = self.extract_table_rows()
+            if not rows or len(rows) < 2:
+                raise TransientError(f"page {page} rendered no data rows")
+            return rows
+        attempt.count = 0
+        return self.run_step(category_name, "extract_table", attempt, page=page, limited=False,
+                             retry_on=(TransientError,))
+    
+    def iter_result_pages(self, category_name):
+        """Yield the table rows of every results page, following the pager"""
+        wanted = self.page_filter.get(category_name)  # re-run of failed pages: walk the pager, read only these
+        page = 1
+        while True:
+            if wanted is None or page in wanted:
+                try:
+                    rows = self.read_results_page(category_name, page)
+                except TransientError:
+                    rows = None
+                if page == 1 and not self.check_table_rows(rows):
+                    return
+                if page == 1:
+                    self.record_headers(category_name, rows[0])
+                if rows:
+                    logger.info(f"📄 {category_name}: page {page} ({len(rows) - 1} rows)")
+                    yield rows
             
-            if headers:
-                logger.info(f"📋 Headers: {headers[:3]}...")
+            if self.max_pages and page >= self.max_pages:
+                return
+            if wanted is not None and wanted.last is not None and page >= wanted.last:
+                return
+            try:
+                # Pages past a pager that never advanced were not seen: re-run them all
+                with self.metrics.stage("next_page", category=category_name):
+                    if not self.run_step(category_name, "next_page", self.go_to_next_page, page=page + 1,
+                                         retry_on=(TransientError,), onward=True):
+                        return
+            except TransientError:
+                return
+            page += 1
+    
+    def load_results_page(self, url, page):
+        """Open one page of a page-addressable results URL; (rows, has_next), rows None past the last page
+
+        Raises TransientError when the page renders without a table or rows
+        although the pager says more follow, so the caller can retry it.
+        """
+        self.driver.get(page_url(url, page))
+        self.wait_for_document_ready()
+        if not self.wait_for(lambda d: self.table_signature() is not None, "results_table"):
+            raise TransientError(f"page {page} rendered no table")
+        rows = self.extract_table_rows()
+        has_next = self.find_next_button() is not None
+        if not rows or len(rows) < 2:
+            if not has_next:
+                return None, False  # an empty table with nowhere to go: past the last page
+            raise TransientError(f"page {page} rendered no data rows")
+        return rows, has_next
+    
+    def read_page_range(self, category_name, url, first, last):
+        """Read pages first..last by URL on the current session; ([(page, rows)], reached the end)"""
+        pages = []
+        for page in range(first, last + 1):
+            try:
+                with self.metrics.stage("page_job", category=category_name):
+                    rows, has_next = self.run_step(category_name, "load_page", lambda: self.load_results_page(url, page),
+                                                   page=page, retry_on=(TransientError,))
+            except Exception:
+                continue  # already logged and recorded for a re-run
+            if rows is None:
+                return pages, True
+            pages.append((page, rows))
+            if not has_next:
+                return pages, True
+        return pages, False
+    
+    def run_on_session(self, func, *args):
+        """Run func on a session borrowed from the pool for the duration of the call"""
+        driver = self.driver_pool.get()
+        self._local.driver = driver
+        try:
+            return func(*args)
+        finally:
+            self._local.driver = None
+            self.driver_pool.put(driver)
+    
+    def iter_pooled_result_pages(self, category_name, category_info):
+        """Yield table rows of every results page, reading page ranges across the session pool
+
+        Page 1 is opened the usual way. When its URL carries the page number, the
+        rest of the category becomes jobs of pages_per_job pages that load their
+        pages by URL on whichever session is free; results consumed in page order.
+        A pager that only works by clicking Next (or a re-run of failed pages) is
+        walked on one session instead.
+        """
+        driver = self.driver_pool.get()
+        self._local.driver = driver
+        try:
+            if not self.open_results_with_retry(category_name, category_info):
+                return
+            url = self.driver.current_url
+            if page_url(url, 2) is None or self.page_filter.get(category_name) is not None:
+                yield from self.iter_result_pages(category_name)
+                return
             
-            # Extract products
-            products = []
-            for i, row in enumerate(rows[1:]):  # Skip header
-                if len(products) >= target_count:
-                    break
+            try:
+                rows = self.read_results_page(category_name, 1)
+            except TransientError:
+                rows = None
+            if not self.check_table_rows(rows):
+                return
+            self.record_headers(category_name, rows[0])
+            more = self.find_next_button() is not None
+        finally:
+            self._local.driver = None
+            self.driver_pool.put(driver)
+        
+        logger.info(f"📄 {category_name}: page 1 ({len(rows) - 1} rows)")
+        yield rows
+        if not more:
+            return
+        
+        # Keep one range job per session in flight; the page count is unknown, so
+        # a job that starts past the last page just finds it empty
+        pending = deque()
+        first = 2
+        try:
+            while True:
+                while len(pending) < len(self.drivers) and not (self.max_pages and first > self.max_pages):
+                    last = first + self.pages_per_job - 1
+                    if self.max_pages:
+                        last = min(last, self.max_pages)
+                    pending.append(self.page_executor.submit(
+                        self.run_on_session, self.read_page_range, category_name, url, first, last
+                    ))
+                    first = last + 1
+                if not pending:
+                    return
                 
-                try:
-                    cells = row.find_elements(By.CSS_SELECTOR, "td, th")
-                    cell_texts = [cell.text.strip() for cell in cells]
-                    
-                    if not any(cell_texts):
-                        continue
-                    
-                    # Create product
-                    product = {
-                        "extraction_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                        "data_source": "ahri_specialized_6_products",
-                        "product_category": category_name
-                    }
-                    
-                    # Map cells to headers
-                    for j, text in enumerate(cell_texts):
-                        if text and j < len(headers) and headers[j]:
-                            product[headers[j]] = text
-                        elif text:
-                            product[f"field_{j}"] = text
-                    
-                    # Basic validation and duplicate check
-                    if self.is_valid_product(product) and not self.is_duplicate(product):
-                        if self.check_brand_diversity(product):
-                            products.append(product)
-                            
-                            if len(products) % 50 == 0:
-                                logger.info(f"📦 {len(products)} products extracted...")
+                pages, reached_end = pending.popleft().result()
+                for page, rows in pages:
+                    logger.info(f"📄 {category_name}: page {page} ({len(rows) - 1} rows)")
+                    yield rows
+                if reached_end:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def iter_category_products(self, category_name, target_count, pages=None):
+        """Stream accepted products across all results pages of the open category"""
+        if pages is None:
+            pages = self.iter_result_pages(category_name)
+        
+        def candidates():
+            for rows in pages:
+                yield from iter_row_products(category_name, rows)
+        
+        yield from self.iter_accepted_products(category_name, candidates(), target_count)
+    
+    def iter_accepted_products(self, category_name, candidates, target_count):
+        """Run candidate products through validation, dedup and brand diversity"""
+        accepted = 0
+        outcomes = defaultdict(int)  # read / invalid / duplicate / brand_cap / held, reported once per call
+        try:
+            for product in candidates:
+                if target_count and accepted >= target_count:
+                    break
+                outcomes["read"] += 1
                 
-                except Exception as e:
+                # Basic validation and duplicate check
+                if not self.is_valid_product(product):
+                    outcomes["invalid"] += 1
                     continue
+                if self.is_duplicate(product):
+                    outcomes["duplicate"] += 1
+                    continue
+                
+                # Brand diversity: True = accept, False = over a cap, None = held for sampling
+                decision = self.check_brand_diversity(product)
+                if decision is None:
+                    outcomes["held"] += 1
+                elif not decision:
+                    outcomes["brand_cap"] += 1
+                    self.get_dedup_index().settle(product)
+                else:
+                    accepted += 1
+                    yield product
+                    
+                    if accepted % 50 == 0:
+                        logger.info(f"📦 {accepted} products extracted...")
             
-            logger.info(f"✅ Extracted {len(products)} products for {category_name}")
-            return products
-            
-        except Exception as e:
-            logger.error(f"❌ Error extracting data: {e}")
-            return []
+            logger.info(f"✅ Extracted {accepted} products for {category_name}")
+        finally:
+            outcomes["accepted"] = accepted
+            for outcome, value in outcomes.items():
+                self.metrics.count("rows", value, category=category_name, outcome=outcome)
+    
+    def record_headers(self, category_name, headers):
+        """Remember the results table's header row for the category schema"""
+        with self.lock:
+            self.category_headers[category_name] = [str(h).strip() for h in headers]
+    
+    def emit_product(self, product):
+        """Hand one accepted product to the streaming sink"""
+        self.sink.write(product)
+        # Its dedup key is committed with the sink's next flush, never before the row is on disk
+        self.get_dedup_index().settle(product)
+        brand = self.extract_brand(product)
+        with self.lock:
+            self.brand_counts[brand] += 1
+            self.category_brands[product["product_category"]].add(brand)
     
     def is_valid_product(self, product):
         """Basic product validation"""
@@ -352,156 +904,604 @@ class AHRISpecialized6Products:
                            and v and len(str(v)) > 1]
         return len(meaningful_fields) >= 3
     
+    def restore_stream_state(self):
+        """Resuming: count rows the stream already holds toward brands, caps and targets"""
+        self.resumed_counts = {}
+        self.resumed_identities = set()
+        if os.path.exists(self.headers_file):
+            # Categories this run does not revisit keep the headers saved before
+            with open(self.headers_file, 'r', encoding='utf-8') as f:
+                self.category_headers = {**json.load(f), **self.category_headers}
+        if not os.path.exists(self.stream_file):
+            return 0
+        quota = self.get_quota()
+        dedup_index = self.get_dedup_index()
+        for product in iter_ndjson(self.stream_file):
+            # Rows flushed just before a crash may not have had their keys committed yet
+            if not dedup_index.check_and_add(product):
+                dedup_index.settle(product)
+            category = product.get("product_category", "")
+            brand = self.extract_brand(product)
+            self.brand_counts[brand] += 1
+            self.category_brands[category].add(brand)
+            self.resumed_counts[category] = self.resumed_counts.get(category, 0) + 1
+            quota.restore(product)
+            if self.sampling == "reservoir":
+                self.resumed_identities.add(product_identity(product))
+        dedup_index.commit()
+        return sum(self.resumed_counts.values())
+    
+    def get_dedup_index(self):
+        """Open the persistent dedup index on first use"""
+        with self.lock:
+            if self.dedup_index is None:
+                self.dedup_index = DedupIndex(self.dedup_file, run_id=self.run_id)
+                self.run_id = self.dedup_index.run_id
+            return self.dedup_index
+    
     def is_duplicate(self, product):
-        """Check for duplicates"""
+        """Check for duplicates by AHRI Ref. # (or normalized brand + model) in this run"""
         try:
-            key_parts = []
-            for key, value in product.items():
-                if key not in ['extraction_timestamp', 'data_source']:
-                    if value:
-                        key_parts.append(f"{key}:{value}")
-            
-            fingerprint = "|".join(sorted(key_parts))
-            hash_val = hashlib.md5(fingerprint.encode()).hexdigest()
-            
-            if hash_val in self.seen_products:
-                self.duplicate_count += 1
+            if self.get_dedup_index().check_and_add(product):
+                with self.lock:
+                    self.duplicate_count += 1
                 return True
-            
-            self.seen_products.add(hash_val)
             return False
         except:
             return False
     
+    def get_quota(self):
+        """Build the brand quota engine on first use from the configured caps"""
+        with self.lock:
+            if self.quota is None:
+                targets = {name: info["target"] for name, info in self.categories.items()}
+                # A row the reservoir drops is rejected for good: settle its dedup claim
+                self.quota = QuotaEngine(self.max_per_brand, self.max_per_brand_per_category, targets,
+                                         seed=self.sample_seed, mode=self.sampling,
+                                         on_release=lambda product: self.get_dedup_index().settle(product))
+            return self.quota
+    
     def check_brand_diversity(self, product):
-        """Check brand diversity"""
+        """Brand caps: True = accept now, False = over a cap, None = held for sampling"""
         try:
-            # Find brand field
-            brand = "UNKNOWN"
-            brand_fields = ["Outdoor Unit Brand Name", "Brand Name", "Brand", "Manufacturer"]
+            return self.get_quota().offer(product)
+        except Exception as e:
+            logger.debug(f"Brand quota check failed: {e}")
+            return True
+    
+    def emit_sampled_products(self):
+        """Emit the reservoir selection in category order; returns {category: count}"""
+        results = {}
+        for category_name, products in self.get_quota().selection(list(self.categories)).items():
+            if self.resumed_identities:
+                products = [p for p in products if product_identity(p) not in self.resumed_identities]
+            for product in products:
+                self.emit_product(product)
+                if self.incremental_run:
+                    self.incremental_run.observe(product)
+            if products:
+                results[category_name] = len(products)
+                brands = len(self.category_brands[category_name])
+                logger.info(f"🎲 {category_name}: sampled {len(products)} products from {brands} brands")
+        return results
+    
+    def setup_http_session(self):
+        """Setup a pooled HTTP client for the browserless backend"""
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
             
-            for field in brand_fields:
-                if field in product and product[field]:
-                    brand = str(product[field]).upper().strip()
-                    break
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.http_concurrency, pool_maxsize=self.http_concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "Accept": "application/json, text/html;q=0.9",
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+            })
+            self.http_session = session
             
-            # If no brand field, use first meaningful field
-            if brand == "UNKNOWN":
-                for key, value in product.items():
-                    if key not in ['extraction_timestamp', 'data_source', 'product_category']:
-                        if value and 2 < len(str(value)) < 30:  # Reasonable brand name length
-                            brand = str(value).upper().strip()
-                            break
+            logger.info(f"✅ HTTP session ready ({self.http_concurrency} pooled connections)")
+            return True
             
-            # Check brand limit
-            if self.brand_counts[brand] >= self.max_per_brand:
+        except Exception as e:
+            logger.error(f"❌ HTTP session setup failed: {e}")
+            return False
+    
+    def search_url(self, category_info, page):
+        """Search endpoint URL for one results page of a category"""
+        path = self.api_search_path.format(
+            program=category_info["api_program"], page=page, page_size=self.api_page_size
+        )
+        return self.base_url + path
+    
+    def fetch_results_page(self, category_info, page):
+        """Fetch one results page as (rows, total_count); JSON or rendered HTML
+
+        Throttling (429 / 503) raises ThrottledError, other 5xx and malformed
+        bodies raise TransientError - both retryable; 4xx raise HTTPError.
+        """
+        import requests
+        
+        with self.metrics.stage("http_fetch", program=category_info["api_program"]):
+            try:
+                response = self.http_session.get(self.search_url(category_info, page), timeout=self.timeouts["page_load"])
+            except (requests.ConnectionError, requests.Timeout) as e:
+                raise TransientError(f"request failed: {e}")
+        self.metrics.count("http_responses", status=response.status_code)
+        
+        if response.status_code in (429, 503):
+            retry_after = response.headers.get("Retry-After", "")
+            raise ThrottledError(f"HTTP {response.status_code}",
+                                 retry_after=float(retry_after) if retry_after.replace(".", "", 1).isdigit() else None)
+        if response.status_code >= 500:
+            raise TransientError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        
+        if "json" in response.headers.get("Content-Type", ""):
+            try:
+                payload = response.json()
+            except ValueError as e:
+                raise TransientError(f"malformed JSON: {e}")
+            return api_payload_to_rows(payload)
+        return parse_results_table_html(response.text) or [], None
+    
+    def fetch_page_with_retry(self, category_name, category_info, page, last_page=None):
+        """fetch_results_page under the retry policy and the adaptive rate limiter"""
+        def attempt():
+            rows, total = self.fetch_results_page(category_info, page)
+            # A page the total count says exists must have rows - an empty one is a bad render
+            if last_page and page <= last_page and (not rows or len(rows) < 2):
+                raise TransientError(f"page {page} came back empty")
+            return rows, total
+        return self.run_step(category_name, "fetch_page", attempt, page=page, retry_on=(TransientError,))
+    
+    def iter_http_result_pages(self, category_name, category_info):
+        """Yield table rows of every results page, fetching ahead on a bounded pool"""
+        try:
+            rows, total = self.fetch_page_with_retry(category_name, category_info, 1)
+        except Exception:
+            return
+        
+        if not self.check_table_rows(rows or None):
+            return
+        self.record_headers(category_name, rows[0])
+        
+        last_page = -(-total // self.api_page_size) if total else None
+        if self.max_pages:
+            last_page = min(last_page or self.max_pages, self.max_pages)
+        
+        # Re-run of failed pages: page 1 only for its headers, then just the listed pages
+        wanted = self.page_filter.get(category_name)
+        if wanted is None or 1 in wanted:
+            logger.info(f"📄 {category_name}: page 1 ({len(rows) - 1} rows)")
+            yield rows
+        pages = None
+        if wanted is not None:
+            pages = [p for p in wanted if p > 1]
+            if wanted.onward is not None:
+                # Paging broke there last time: read on to the end from that page
+                start = max(2, wanted.onward)
+                pages += range(start, last_page + 1) if last_page is not None else itertools.count(start)
+            pages = iter(pages)
+        
+        # Keep up to http_concurrency requests in flight, consume in page order
+        executor = ThreadPoolExecutor(max_workers=self.http_concurrency, thread_name_prefix="ahri-http")
+        try:
+            pending = deque()
+            next_page = 2
+            while True:
+                while len(pending) < self.http_concurrency:
+                    if pages is not None:
+                        next_page = next(pages, None)
+                        if next_page is None:
+                            break
+                    elif last_page is not None and next_page > last_page:
+                        break
+                    pending.append((next_page, executor.submit(
+                        self.fetch_page_with_retry, category_name, category_info, next_page, last_page
+                    )))
+                    if pages is None:
+                        next_page += 1
+                if not pending:
+                    return
+                
+                page, future = pending.popleft()
+                try:
+                    rows, _ = future.result()
+                except Exception:
+                    continue  # already logged and recorded for a re-run
+                
+                # Without a total count, the first empty page marks the end
+                if not rows or len(rows) < 2:
+                    if last_page is None:
+                        return
+                    continue
+                
+                logger.info(f"📄 {category_name}: page {page} ({len(rows) - 1} rows)")
+                yield rows
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def get_nav_cache(self):
+        """Open the navigation cache on first use (None when disabled)"""
+        with self.lock:
+            if self.nav_cache is None and self.nav_cache_file:
+                self.nav_cache = NavigationCache(self.nav_cache_file)
+            return self.nav_cache
+    
+    def open_cached_results(self, category_name, category_info, url):
+        """Load a cached results URL; True only if it shows this category's results table"""
+        try:
+            logger.info(f"⚡ {category_name}: opening cached results URL {url}")
+            self.driver.get(url)
+            self.wait_for_document_ready()
+            if not self.wait_for_results_table():
+                logger.info(f"⚠️  {category_name}: no results table at the cached URL")
                 return False
             
-            self.brand_counts[brand] += 1
+            verify_text = category_info.get("verify_text", "").lower()
+            if verify_text and verify_text not in self.driver.title.lower() and not self.driver.execute_script(
+                "return document.body.innerText.toLowerCase().includes(arguments[0]);", verify_text
+            ):
+                logger.info(f"⚠️  {category_name}: cached page does not mention '{category_info['verify_text']}'")
+                return False
             return True
-        except:
+            
+        except Exception as e:
+            logger.info(f"⚠️  {category_name}: cached URL failed: {e}")
+            return False
+    
+    def open_category_results(self, category_name, category_info):
+        """Open the category's rendered results: cached URL first, else Homepage → Card → Search"""
+        nav_cache = self.get_nav_cache()
+        cached_url = nav_cache.get(self.base_url, category_name) if nav_cache else None
+        if cached_url:
+            with self.metrics.stage("cached_navigation", category=category_name):
+                opened = self.open_cached_results(category_name, category_info, cached_url)
+            if opened:
+                self.metrics.count("nav_cache", result="hit")
+                nav_cache.hit(self.base_url, category_name)
+                return True
+            self.metrics.count("nav_cache", result="stale")
+            nav_cache.invalidate(self.base_url, category_name)
+            logger.info(f"🔁 {category_name}: falling back to the click-through flow")
+        
+        if not self.click_through_to_results(category_name, category_info):
+            return False
+        
+        # Only a URL that really renders a results table is worth remembering
+        if nav_cache and self.wait_for_results_table():
+            nav_cache.record(self.base_url, category_name, self.driver.current_url)
+        return True
+    
+    def click_through_to_results(self, category_name, category_info):
+        """Navigate Homepage → Card → Search so the category's results are rendered"""
+        # Step 1: Go to fresh homepage
+        with self.metrics.stage("homepage", category=category_name):
+            if not self.go_to_homepage_fresh():
+                return False
+        
+        # Step 2: Find and click category card
+        with self.metrics.stage("category_card", category=category_name):
+            if not self.find_and_click_category_card(category_name, category_info):
+                return False
+        
+        # Step 3: Click Search button
+        with self.metrics.stage("search", category=category_name):
+            return self.click_search_button_and_wait()
+    
+    def open_results_with_retry(self, category_name, category_info):
+        """open_category_results under the retry policy; False once every attempt failed"""
+        def attempt():
+            if not self.open_category_results(category_name, category_info):
+                raise TransientError("results page did not open")
             return True
+        try:
+            return self.run_step(category_name, "navigation", attempt)
+        except Exception:
+            return False
     
     def scrape_single_category(self, category_name, category_info):
-        """Scrape one category following exact process"""
+        """Scrape one category following exact process; returns products streamed"""
+        count = 0
+        started = time.perf_counter()
         try:
             target_count = category_info["target"]
-            logger.info(f"\n🎯 === {category_name.upper()} (Target: {target_count}) ===")
+            logger.info(f"\n🎯 === {category_name.upper()} (Target: {target_count or 'all'}) ===")
             
-            # Step 1: Go to fresh homepage
-            if not self.go_to_homepage_fresh():
-                return []
+            # A resumed run only tops the category up to its target
+            resumed = self.resumed_counts.get(category_name, 0)
+            remaining = target_count - resumed if target_count else 0
+            if target_count and remaining <= 0:
+                logger.info(f"⏭️  {category_name}: {resumed} products already in the resumed stream")
+                return 0
             
-            # Step 2: Find and click category card
-            if not self.find_and_click_category_card(category_name, category_info):
-                return []
+            if self.backend == "http":
+                pages = self.iter_http_result_pages(category_name, category_info)
+            elif self.driver_pool is not None:
+                pages = self.iter_pooled_result_pages(category_name, category_info)
+            elif self.open_results_with_retry(category_name, category_info):
+                pages = self.iter_result_pages(category_name)
+            else:
+                return 0
             
-            # Step 3: Click Search button
-            if not self.click_search_button_and_wait():
-                return []
+            # Step 4: Extract table data page by page, streaming to the sink
+            # (reservoir sampling reads every row and applies the target when selecting)
+            stopped_early = False
+            read_limit = 0 if self.sampling == "reservoir" else remaining
+            for product in self.iter_category_products(category_name, read_limit, pages):
+                self.emit_product(product)
+                count += 1
+                
+                if self.incremental_run:
+                    self.incremental_run.observe(product)
+                    if self.incremental_run.should_stop(category_name):
+                        logger.info(f"⏭️  {category_name}: reached {self.stop_after_unchanged} known, unchanged records - stopping")
+                        stopped_early = True
+                        break
             
-            # Step 4: Extract table data
-            products = self.extract_table_data(category_name, target_count)
+            if self.incremental_run:
+                # Only a crawl that saw every row can tell which records were delisted -
+                # a failed page or a re-run of selected pages leaves rows unread
+                complete = not (stopped_early or target_count or self.max_pages
+                                or self.max_per_brand or self.max_per_brand_per_category
+                                or self.page_filter.get(category_name) is not None
+                                or self.failure_log.has_failures(category_name))
+                self.incremental_run.finish_category(category_name, complete)
             
-            if products:
-                brands = len(set(self.extract_brand(p) for p in products))
-                logger.info(f"✅ {category_name}: {len(products)} products from {brands} brands")
+            if count:
+                brands = len(self.category_brands[category_name])
+                logger.info(f"✅ {category_name}: {count} products from {brands} brands")
+            elif self.sampling == "reservoir":
+                logger.info(f"🎲 {category_name}: rows held for sampling ({self.get_quota().held()} in reservoir)")
             else:
                 logger.warning(f"⚠️  {category_name}: No products extracted")
             
-            return products
+            return count
             
         except Exception as e:
             logger.error(f"❌ Error scraping {category_name}: {e}")
-            return []
+            self.failure_log.record(category_name, "category", e)
+            return count
+        finally:
+            self.metrics.observe("stage_seconds", time.perf_counter() - started, stage="category", category=category_name)
+            self.metrics.count("products_emitted", count, category=category_name)
+            self.write_metrics()
+    
+    def write_metrics(self, summary=None):
+        """Write the JSON run report / Prometheus text file, when metrics are on"""
+        if not self.metrics.enabled:
+            return
+        try:
+            if self.metrics_file:
+                self.metrics.write_report(self.metrics_file, summary)
+            if self.prometheus_file:
+                self.metrics.write_prometheus(self.prometheus_file)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not write metrics: {e}")
     
     def extract_brand(self, product):
-        """Extract brand for reporting"""
-        brand_fields = ["Outdoor Unit Brand Name", "Brand Name", "Brand"]
-        for field in brand_fields:
-            if field in product and product[field]:
-                return str(product[field]).upper()
-        return "UNKNOWN"
+        """Extract brand for reporting (same resolution as the brand caps)"""
+        return resolve_brand(product)
     
-    def run_all_categories(self):
-        """Main function - scrape all 6 categories"""
+    def categories_to_scrape(self):
+        """(name, info) of every category - or only those listed for a failed-pages re-run"""
+        return [(name, info) for name, info in self.categories.items()
+                if not self.page_filter or name in self.page_filter]
+    
+    def scrape_categories_sequentially(self):
+        """Scrape every category in order through the single main session"""
+        all_results = {}
+        
+        for category_name, category_info in self.categories_to_scrape():
+            try:
+                count = self.scrape_single_category(category_name, category_info)
+                if count:
+                    all_results[category_name] = count
+                
+            except Exception as e:
+                logger.error(f"❌ {category_name} failed: {e}")
+                continue
+        
+        return all_results
+    
+    def scrape_categories_concurrently(self):
+        """Scrape categories side by side, their page-range jobs shared across the WebDriver pool
+
+        Each category is consumed in page order on its own thread, which holds
+        no session; sessions are borrowed per job (see iter_pooled_result_pages),
+        so even a single large category keeps every session busy.
+        """
+        self.driver_pool = queue.Queue()
+        for driver in self.drivers:
+            self.driver_pool.put(driver)
+        self.page_executor = ThreadPoolExecutor(max_workers=len(self.drivers), thread_name_prefix="ahri-worker")
+        
+        categories = self.categories_to_scrape()
+        results = {}
         try:
-            if not self.setup_driver():
-                return {}
-            
-            total_target = sum(cat["target"] for cat in self.categories.values())
+            with ThreadPoolExecutor(max_workers=max(1, len(categories)), thread_name_prefix="ahri-category") as executor:
+                futures = {
+                    executor.submit(self.scrape_single_category, category_name, category_info): category_name
+                    for category_name, category_info in categories
+                }
+                for future in as_completed(futures):
+                    category_name = futures[future]
+                    try:
+                        results[category_name] = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ {category_name} failed: {e}")
+        finally:
+            self.page_executor.shutdown(wait=True, cancel_futures=True)
+            self.page_executor = None
+            self.driver_pool = None
+        
+        # Merge in category order so output matches a sequential run
+        return {name: results[name] for name in self.categories if results.get(name)}
+    
+    def get_detail_enricher(self):
+        """DetailEnricher for this run's categories, cache and retry settings (caller closes it)"""
+        programs = {name: info["api_program"] for name, info in self.categories.items()}
+        return DetailEnricher(self.base_url, programs, HTTPCache(self.detail_cache_dir, self.detail_max_age),
+                              workers=self.detail_workers, retry_policy=self.retry_policy,
+                              rate_limiter=self.rate_limiter, metrics=self.metrics,
+                              timeout=self.timeouts["page_load"])
+    
+    def scrape_and_save(self):
+        """Scrape every category on the ready session(s) and save all outputs; {category: count}"""
+        concurrent = bool(self.drivers) and self.backend != "http"
+        self.run_summary = None
+        try:
+            targets = [cat["target"] for cat in self.categories.values()]
+            total_target = sum(targets) if all(targets) else "all"
             logger.info(f"🚀 AHRI SPECIALIZED 6 PRODUCTS SCRAPER")
-            logger.info(f"🎯 Target: {total_target} products from 6 categories")
-            logger.info(f"🔄 Process: Homepage → Click Card → Search → Extract")
+            logger.info(f"🎯 Target: {total_target} products from {len(self.categories)} categories")
+            if self.backend == "http":
+                logger.info(f"🔄 Process: HTTP search endpoint → Extract (all pages, {self.http_concurrency} in flight)")
+            else:
+                logger.info(f"🔄 Process: Homepage → Click Card → Search → Extract (all pages)")
+            logger.info(f"💾 Streaming products to {self.stream_file}")
             
-            all_results = {}
+            store = None
+            if self.incremental:
+                store = RecordStore(self.store_file)
+                self.incremental_run = IncrementalRun(store, stop_after=self.stop_after_unchanged)
+                logger.info(f"🗄️  Incremental mode: comparing against {self.store_file}")
+                if (self.max_pages or self.max_per_brand or self.max_per_brand_per_category
+                        or any(info["target"] for info in self.categories.values())):
+                    # Capped crawls leave rows unread, so finish_category never delists anything
+                    logger.warning("⚠️  Targets / brand caps / --max-pages are set: delisted records will not be "
+                                   "deactivated (crawl everything with --target 0 --max-per-brand 0)")
             
-            for category_name, category_info in self.categories.items():
-                try:
-                    products = self.scrape_single_category(category_name, category_info)
-                    if products:
-                        all_results[category_name] = products
-                    
-                    # Pause between categories
-                    time.sleep(3)
-                    
-                except Exception as e:
-                    logger.error(f"❌ {category_name} failed: {e}")
-                    continue
+            # Resuming a run keeps its stream and skips rows its dedup index already holds
+            resuming = self.run_id is not None
+            dedup_index = self.get_dedup_index()
+            logger.info(f"🧾 Dedup run {self.run_id} ({self.dedup_file}){' - resuming' if resuming else ''}")
+            if resuming:
+                restored = self.restore_stream_state()
+                logger.info(f"📂 Resumed stream holds {restored} products")
+            
+            self.failure_log = FailureLog(self.failed_pages_file, run_id=self.run_id)
+            self.sink = NDJSONSink(self.stream_file, flush_every=self.flush_every, append=resuming,
+                                   on_flush=dedup_index.commit)
+            try:
+                if concurrent:
+                    logger.info(f"⚡ Concurrent mode: {len(self.drivers)} browser sessions")
+                    all_results = self.scrape_categories_concurrently()
+                else:
+                    all_results = self.scrape_categories_sequentially()
+                
+                if self.sampling == "reservoir":
+                    all_results = self.emit_sampled_products()
+                if self.resumed_counts:
+                    all_results = {name: all_results.get(name, 0) + self.resumed_counts.get(name, 0)
+                                   for name in self.categories
+                                   if all_results.get(name) or self.resumed_counts.get(name)}
+            finally:
+                self.sink.close()
+                self.failure_log.save()
+            
+            if self.failure_log:
+                logger.warning(f"🔁 {len(self.failure_log)} steps still failed after retries - "
+                               f"re-run them with --retry-failed {self.failed_pages_file}")
+            if self.backend == "http":
+                logger.info(f"🚦 Request rate settled at {self.rate_limiter.rate:.1f}/s "
+                            f"({self.rate_limiter.decreases} slow-downs)")
             
             # Save results
             if all_results:
-                total_products = sum(len(products) for products in all_results.values())
-                
-                output_data = {
-                    "scraping_summary": {
-                        "total_products": total_products,
-                        "categories_scraped": len(all_results),
-                        "duplicates_filtered": self.duplicate_count,
-                        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                        "source": "ahridirectory.org",
-                        "method": "specialized_6_products_scraper"
-                    },
-                    "brand_distribution": dict(sorted(self.brand_counts.items(), key=lambda x: x[1], reverse=True)),
-                    "products_by_category": all_results
+                summary = {
+                    "duplicates_filtered": self.duplicate_count,
+                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "source": "ahridirectory.org",
+                    "method": "specialized_6_products_scraper"
                 }
+                if self.failure_log:
+                    summary["failed_steps"] = len(self.failure_log)
+                brand_distribution = dict(sorted(self.brand_counts.items(), key=lambda x: x[1], reverse=True))
                 
-                filename = "ahri_6_products_results.json"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(output_data, f, indent=2, ensure_ascii=False)
+                # Detail pages are merged into the stream on its way to the results file
+                enricher = self.get_detail_enricher() if self.enrich_details else None
+                finalize = enricher.finalize_enriched if enricher else finalize_results
+                # NDJSON holding exactly the saved records, for the shards
+                final_stream = self.output_file + ".snapshot.ndjson" if self.incremental_run else self.stream_file
+                try:
+                    with self.metrics.stage("finalize"):
+                        if self.incremental_run:
+                            # Delta of this run plus the merged snapshot of everything known
+                            delta_counts = self.incremental_run.write_delta(self.delta_file)
+                            summary = write_snapshot(store, self.output_file, summary, brand_distribution,
+                                                     list(self.categories), categories=list(self.categories),
+                                                     finalize=finalize, snapshot_stream=final_stream)
+                            store.close()
+                            logger.info(f"🔁 Delta {delta_counts} saved to {self.delta_file}")
+                        else:
+                            summary = finalize(self.stream_file, self.output_file, summary,
+                                               brand_distribution=brand_distribution,
+                                               category_order=list(self.categories))
+                finally:
+                    if enricher:
+                        enricher.close()
+                total_products = summary["total_products"]
+                
+                if enricher:
+                    counts = summary["detail_pages"]
+                    cached = counts["fresh"] + counts["revalidated"]
+                    print(f"🔎 Detail pages: {counts['fetched']} fetched, {cached} from cache, {counts['failed']} failed")
+                self.run_summary = summary
                 
                 print(f"\n🎉 6 PRODUCTS SCRAPING COMPLETED!")
-                print(f"✅ Categories successfully scraped: {len(all_results)}/6")
+                print(f"✅ Categories successfully scraped: {len(all_results)}/{len(self.categories)}")
                 print(f"📦 Total products collected: {total_products}")
                 print(f"🚫 Duplicates filtered: {self.duplicate_count}")
-                print(f"📁 Data saved to {filename}")
+                print(f"📁 Data saved to {self.output_file}")
+                
+                if self.category_headers:
+                    with open(self.headers_file, 'w', encoding='utf-8') as f:
+                        json.dump(self.category_headers, f, indent=2, ensure_ascii=False)
+                
+                try:
+                    if self.shards_dir:
+                        # Sharded from the stream, one shard's records in memory at a time
+                        with self.metrics.stage("shards"):
+                            manifest, rebuilt = write_ndjson_shards(final_stream, summary, self.shards_dir,
+                                                                    list(self.categories))
+                        print(f"🧩 {len(manifest['shards'])} shards ({rebuilt} changed) saved to {self.shards_dir}/")
+                finally:
+                    if final_stream != self.stream_file:
+                        os.remove(final_stream)
+                
+                if self.columnar_dir:
+                    with open(self.output_file, 'r', encoding='utf-8') as f:
+                        saved = json.load(f)
+                    with self.metrics.stage("columnar_export"):
+                        export_columnar(saved, self.columnar_dir, self.category_headers)
+                    print(f"🧱 Columnar export saved to {self.columnar_dir}/")
+                
+                if self.catalog_file:
+                    with self.metrics.stage("catalog_build"):
+                        with open(self.output_file, 'r', encoding='utf-8') as f:
+                            catalog = build_catalog(json.load(f))
+                        catalog_dir = os.path.dirname(self.catalog_file)
+                        specs_file = os.path.join(catalog_dir, CATALOG_SPECS_FILE)
+                        write_catalog(catalog, self.catalog_file, specs_file)
+                        
+                        search_file = os.path.join(catalog_dir, "search_index.json")
+                        SearchIndex.build(catalog["records"]).save(search_file)
+                        patterns_file = os.path.join(catalog_dir, "model_pattern_index.json")
+                        ModelPatternIndex.build(catalog["records"]).save(patterns_file)
+                    print(f"📚 Catalog index ({len(catalog['brands'])} brands) saved to {self.catalog_file}")
+                    print(f"📐 Spec table saved to {specs_file}")
+                    print(f"🔤 Search index saved to {search_file}")
+                    print(f"🧬 Model pattern index saved to {patterns_file}")
                 
                 # Show results breakdown
                 print(f"\n📋 Results by category:")
-                for category, products in all_results.items():
-                    target = self.categories[category]['target']
-                    brands = len(set(self.extract_brand(p) for p in products))
-                    print(f"   • {category}: {len(products)}/{target} products ({brands} brands)")
+                for category, count in all_results.items():
+                    target = self.categories[category]['target'] or 'all'
+                    brands = len(self.category_brands[category])
+                    print(f"   • {category}: {count}/{target} products ({brands} brands)")
                 
                 # Show top brands
                 if self.brand_counts:
@@ -514,22 +1514,161 @@ class AHRISpecialized6Products:
             else:
                 print("❌ No categories were successfully scraped")
                 return {}
+        finally:
+            if self.dedup_index:
+                self.dedup_index.close()
+                self.dedup_index = None
+    
+    def run_all_categories(self):
+        """Main function - scrape all 6 categories"""
+        try:
+            concurrent = self.workers > 1 and self.backend != "http"
+            with self.metrics.stage("setup"):
+                if self.backend == "http":
+                    ready = self.setup_http_session()
+                elif concurrent:
+                    ready = self.setup_driver_pool()
+                else:
+                    ready = self.setup_driver()
+            if not ready:
+                return {}
+            
+            return self.scrape_and_save()
                 
         except Exception as e:
             logger.error(f"❌ Scraper error: {e}")
             return {}
         finally:
-            if self.driver:
+            self.write_metrics(self.run_summary)
+            if self.metrics.enabled and self.metrics_file:
+                logger.info(f"⏱️  Run report saved to {self.metrics_file}")
+            if self.driver or self.drivers:
                 try:
-                    input("\n🛑 Press Enter to close browser...")
-                    self.driver.quit()
+                    # Visible, attended runs keep the browser open for inspection; nothing else blocks
+                    if self.pause_before_close and sys.stdin.isatty():
+                        input("\n🛑 Press Enter to close browser...")
+                    for driver in [self.driver] + self.drivers:
+                        if driver:
+                            driver.quit()
                     logger.info("✅ Browser closed")
                 except:
                     pass
 
 def main():
     """Run the specialized 6 products scraper"""
-    scraper = AHRISpecialized6Products(headless=False)  # Visible browser
+    parser = argparse.ArgumentParser(description="AHRI specialized 6 products scraper")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of parallel browser sessions sharing page-range jobs (1 = single sequential session)")
+    parser.add_argument("--pages-per-job", type=int, default=None,
+                        help="results pages per job in --workers mode (default 5)")
+    parser.add_argument("--headless", action="store_true", help="run Chrome without a visible window")
+    parser.add_argument("--lean", action="store_true",
+                        help="lean headless profile: eager page loads, no images / media / fonts / trackers")
+    parser.add_argument("--profile-dir", default=None,
+                        help="keep warm Chrome profiles (cache, cookies) under this directory between runs")
+    parser.add_argument("--chromedriver", default=None, help="chromedriver binary (skips the driver manager)")
+    parser.add_argument("--no-pause", action="store_true", help="close the browser at the end without waiting for Enter")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium",
+                        help="drive Chrome, or call the directory's search endpoint directly")
+    parser.add_argument("--base-url", default="https://www.ahridirectory.org",
+                        help="directory root (point at a local stand-in server for testing)")
+    parser.add_argument("--http-concurrency", type=int, default=None, help="requests in flight for --backend http")
+    parser.add_argument("--target", type=int, default=None,
+                        help="products per category (0 = every row in the directory)")
+    parser.add_argument("--max-pages", type=int, default=None, help="stop after this many results pages per category")
+    parser.add_argument("--max-per-brand", type=int, default=None, help="brand cap across categories (0 = no cap)")
+    parser.add_argument("--max-per-brand-category", type=int, default=None,
+                        help="brand cap within each category (0 = no cap)")
+    parser.add_argument("--sampling", choices=["first", "reservoir"], default="first",
+                        help="fill brand caps in arrival order while streaming, or sample every row "
+                             "deterministically by seeded priority (reads all pages)")
+    parser.add_argument("--seed", default="0", help="seed for --sampling reservoir")
+    parser.add_argument("--build-catalog", nargs="?", const=DEFAULT_CATALOG_FILE, default=None, metavar="PATH",
+                        help=f"write the catalog, its spec table and search indexes after scraping (default {DEFAULT_CATALOG_FILE})")
+    parser.add_argument("--export-columnar", nargs="?", const=DEFAULT_COLUMNAR_DIR, default=None, metavar="DIR",
+                        help=f"write typed per-category .npz columns after scraping (default {DEFAULT_COLUMNAR_DIR}/)")
+    parser.add_argument("--shards-dir", default=DEFAULT_SHARDS_DIR,
+                        help=f"where to write hashed, pre-compressed catalog shards (default {DEFAULT_SHARDS_DIR}/)")
+    parser.add_argument("--no-shards", action="store_true", help="skip writing catalog shards")
+    parser.add_argument("--enrich-details", action="store_true",
+                        help="fetch each product's detail page (cached on disk) and merge its extra fields")
+    parser.add_argument("--detail-workers", type=int, default=None, help="detail pages fetched concurrently (default 8)")
+    parser.add_argument("--detail-cache", default=DEFAULT_DETAIL_CACHE_DIR,
+                        help=f"on-disk detail page cache (default {DEFAULT_DETAIL_CACHE_DIR}/)")
+    parser.add_argument("--detail-max-age", type=int, default=None,
+                        help="seconds a cached detail page is used without revalidating (0 = always revalidate)")
+    parser.add_argument("--no-nav-cache", action="store_true",
+                        help=f"always click through homepage → card → Search (ignore {DEFAULT_NAV_CACHE_FILE})")
+    parser.add_argument("--run-id", default=None,
+                        help="resume an interrupted run: append to its stream, skip rows it already emitted")
+    parser.add_argument("--retry-failed", nargs="?", const="ahri_failed_pages.json", default=None, metavar="PATH",
+                        help="re-run only the pages / categories a previous run logged as failed, resuming that run")
+    parser.add_argument("--retries", type=int, default=None, help="attempts per page / navigation step (default 4)")
+    parser.add_argument("--rate", type=float, default=None, help="starting request rate per second (adapts AIMD-style)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="compare against the ref-keyed store, stop at known records, write a delta; "
+                             "delisted records are only deactivated by a full crawl (--target 0 --max-per-brand 0)")
+    parser.add_argument("--stop-after", type=int, default=None,
+                        help="consecutive known, unchanged records that end a category in --incremental mode")
+    parser.add_argument("--metrics-report", nargs="?", const="ahri_run_report.json", default=None, metavar="PATH",
+                        help="write per-stage timings and counters as a JSON run report (default ahri_run_report.json)")
+    parser.add_argument("--prometheus-file", default=None, metavar="PATH",
+                        help="keep a Prometheus text file of the run metrics up to date (textfile collector)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics at /metrics on this port")
+    args = parser.parse_args()
+    
+    scraper = AHRISpecialized6Products(headless=args.headless, workers=args.workers,  # Visible browser unless --headless
+                                       backend=args.backend, base_url=args.base_url)
+    scraper.lean = args.lean
+    scraper.pause_before_close = not (args.no_pause or args.headless or args.lean)
+    scraper.profile_dir = args.profile_dir
+    scraper.driver_path = args.chromedriver
+    if args.http_concurrency:
+        scraper.http_concurrency = args.http_concurrency
+    if args.pages_per_job:
+        scraper.pages_per_job = args.pages_per_job
+    if args.target is not None:
+        for category_info in scraper.categories.values():
+            category_info["target"] = args.target
+    if args.max_pages is not None:
+        scraper.max_pages = args.max_pages
+    if args.max_per_brand is not None:
+        scraper.max_per_brand = args.max_per_brand
+    if args.max_per_brand_category is not None:
+        scraper.max_per_brand_per_category = args.max_per_brand_category
+    scraper.sampling = args.sampling
+    scraper.sample_seed = args.seed
+    scraper.incremental = args.incremental
+    scraper.run_id = args.run_id
+    scraper.catalog_file = args.build_catalog
+    scraper.columnar_dir = args.export_columnar
+    scraper.shards_dir = None if args.no_shards else args.shards_dir
+    if args.no_nav_cache:
+        scraper.nav_cache_file = None
+    scraper.enrich_details = args.enrich_details
+    scraper.detail_cache_dir = args.detail_cache
+    if args.detail_workers:
+        scraper.detail_workers = args.detail_workers
+    if args.detail_max_age is not None:
+        scraper.detail_max_age = args.detail_max_age
+    if args.stop_after is not None:
+        scraper.stop_after_unchanged = args.stop_after
+    if args.retries is not None:
+        scraper.retry_policy = RetryPolicy(attempts=args.retries)
+    if args.rate is not None:
+        scraper.rate_limiter = AdaptiveRateLimiter(rate=args.rate)
+    if args.retry_failed:
+        run_id, scraper.page_filter = FailureLog.load(args.retry_failed)
+        scraper.failed_pages_file = args.retry_failed
+        scraper.run_id = args.run_id or run_id
+        print(f"🔁 Re-running {len(scraper.page_filter)} categories from {args.retry_failed} (run {scraper.run_id})")
+    if args.metrics_report or args.prometheus_file or args.metrics_port:
+        scraper.metrics = RunMetrics()
+        scraper.metrics_file = args.metrics_report
+        scraper.prometheus_file = args.prometheus_file
+    if args.metrics_port:
+        start_metrics_server(scraper.metrics, args.metrics_port)
+        print(f"📈 Metrics at http://127.0.0.1:{args.metrics_port}/metrics")
     
     try:
         results = scraper.run_all_categories()
@@ -0,0 +1,62 @@
+import os
+import sys
+import logging
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ahri_fixture_server import FixtureDirectory, start_fixture_server  # noqa: E402
+from ahri_retry import RetryPolicy  # noqa: E402
+from selenium_scraper import AHRISpecialized6Products  # noqa: E402
+
+RECORDED = os.path.join(ROOT, "ahri_6_products_results.json")
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def fixture_site():
+    """start(synthetic_rows=0, faults=None) -> base_url of a local fixture directory"""
+    servers = []
+
+    def start(synthetic_rows=0, faults=None):
+        categories = AHRISpecialized6Products().categories
+        directory = FixtureDirectory(categories, recorded_path=RECORDED, synthetic_rows=synthetic_rows,
+                                     faults=faults)
+        server, base_url = start_fixture_server(directory)
+        servers.append(server)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_scraper(tmp_path):
+    """HTTP-backend scraper with every output file under tmp_path, caps and targets off"""
+    def make(base_url, attempts=4, **attributes):
+        scraper = AHRISpecialized6Products(headless=True, backend="http", base_url=base_url)
+        for category_info in scraper.categories.values():
+            category_info["target"] = 0
+        scraper.max_per_brand = 0
+        scraper.pause_before_close = False
+        scraper.shards_dir = None
+        scraper.nav_cache_file = None
+        scraper.retry_policy = RetryPolicy(attempts=attempts, base_delay=0.01, max_delay=0.05, seed=1)
+        for name in ("output_file", "stream_file", "dedup_file", "store_file", "delta_file",
+                     "headers_file", "failed_pages_file"):
+            setattr(scraper, name, str(tmp_path / os.path.basename(getattr(scraper, name))))
+        for name, value in attributes.items():
+            setattr(scraper, name, value)
+        return scraper
+
+    return make
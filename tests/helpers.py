@@ -0,0 +1,43 @@
+"""Reference implementations shared by the model-pattern and query-service tests"""
+
+import random
+import string
+
+from ahri_dedup_index import MODEL_FIELDS
+from ahri_model_patterns import WILDCARD, expand_pattern, normalize_model_number, variant_matches
+
+
+def linear_match(records, model):
+    """Reference: expand and test every pattern of every record"""
+    query = normalize_model_number(model)
+    best = {}
+    for record in records:
+        for field in MODEL_FIELDS:
+            value = record["product"].get(field)
+            if not isinstance(value, str) or not value.strip():
+                continue
+            for variant, accessory_dropped in expand_pattern(value.strip()):
+                if variant_matches(variant, query):
+                    score = (len(query) - variant.count(WILDCARD), not accessory_dropped)
+                    best[record["id"]] = max(best.get(record["id"], score), score)
+    return sorted(((rid, specificity, not kept) for rid, (specificity, kept) in best.items()),
+                  key=lambda hit: (-hit[1], hit[2], hit[0]))
+
+
+def sample_models(records, count, seed=0):
+    """Concrete model numbers: filled-in pattern variants, some reformatted or mutated"""
+    rng = random.Random(seed)
+    patterns = [record["product"][f].strip() for record in records for f in MODEL_FIELDS
+                if isinstance(record["product"].get(f), str) and record["product"][f].strip()]
+    models = []
+    while len(models) < count:
+        variant, _ = rng.choice(expand_pattern(rng.choice(patterns)))
+        model = "".join(rng.choice(string.ascii_uppercase + string.digits) if c == WILDCARD else c for c in variant)
+        roll = rng.random()
+        if roll < 0.2 and len(model) > 3:
+            position = rng.randrange(len(model))
+            model = model[:position] + rng.choice("XQ9") + model[position + 1:]
+        elif roll < 0.4 and len(model) > 3:
+            model = model[:3] + "-" + model[3:].lower()
+        models.append(model)
+    return models
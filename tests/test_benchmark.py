@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+
+import ahri_benchmark
+from ahri_benchmark import StageTimer, bench_http, bench_parser, compare
+from ahri_fixture_server import FixtureDirectory
+from conftest import RECORDED
+from selenium_scraper import AHRISpecialized6Products
+
+
+def test_stage_timer_summarises_each_stage():
+    timer = StageTimer()
+    assert timer.time("parse", lambda x: x * 2, 21) == 42
+    timer.time("parse", lambda: None)
+    timer.time("load", lambda: None)
+    summary = timer.summary()
+    assert list(summary) == ["parse", "load"]
+    assert summary["parse"]["count"] == 2 and summary["parse"]["max_s"] >= summary["parse"]["median_s"]
+
+
+def test_parser_scenario_reads_every_row():
+    directory = FixtureDirectory(AHRISpecialized6Products().categories, recorded_path=RECORDED, synthetic_rows=40)
+    result = bench_parser(directory, repeat=2)
+    assert result["rows_parsed"] == 6 * 40
+    assert result["stages"]["parse_results_table_html"]["count"] == 6 * 2
+    assert result["rows_per_s"] > 0
+
+
+def test_http_scenario_reads_every_row(fixture_site, tmp_path):
+    result = bench_http(fixture_site(synthetic_rows=120), str(tmp_path), page_size=50)
+    assert result["products_accepted"] == 6 * 120
+    assert result["stages"]["http_category"]["count"] == 6
+
+
+def test_report_is_written_and_compared(monkeypatch, tmp_path, capsys):
+    output_dir = tmp_path / "bench"
+    argv = ["ahri_benchmark.py", "--scenarios", "parser,http", "--rows", "30", "--page-size", "20",
+            "--recorded", RECORDED, "--output-dir", str(output_dir)]
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", argv)
+    ahri_benchmark.main()
+
+    (report_name,) = os.listdir(output_dir)
+    with open(output_dir / report_name, encoding="utf-8") as f:
+        report = json.load(f)
+    assert set(report["scenarios"]) == {"parser", "http"}
+    assert report["config"] == {"rows": 30, "page_size": 20, "latency_ms": 0, "lean": False}
+    assert report["scenarios"]["http"]["products_accepted"] == 6 * 30
+
+    capsys.readouterr()
+    compare(report, report)
+    printed = capsys.readouterr().out
+    assert "parse_results_table_html" in printed and "(+0.0%)" in printed
+    assert "rows/s" in printed
@@ -0,0 +1,46 @@
+import json
+import os
+
+from ahri_catalog_build import META_FIELDS, build_catalog, write_catalog
+from conftest import RECORDED
+
+
+def test_catalog_on_disk_holds_entities_and_a_separate_spec_table(tmp_path):
+    with open(RECORDED, encoding="utf-8") as f:
+        data = json.load(f)
+    catalog = build_catalog(data)
+    catalog_file = tmp_path / "new" / "dir" / "catalog_index.json"
+    specs_file = tmp_path / "new" / "dir" / "catalog_specs.json"
+    write_catalog(catalog, str(catalog_file), str(specs_file))
+
+    saved = json.loads(catalog_file.read_text(encoding="utf-8"))
+    assert all(set(record) == {"id", "ref", "brand", "category", "series", "model"} for record in saved["records"])
+    assert os.path.getsize(catalog_file) < os.path.getsize(RECORDED) / 3
+
+    specs = json.loads(specs_file.read_text(encoding="utf-8"))
+    products = [p for ps in data["products_by_category"].values() for p in ps]
+    for record, row, product in zip(saved["records"], specs["rows"], products):
+        rebuilt = {k: v for k, v in zip(specs["columns"][record["category"]], row) if v is not None}
+        assert rebuilt == {k: v for k, v in product.items() if k not in META_FIELDS and v is not None}
+
+
+def test_lookup_maps_point_at_matching_records():
+    with open(RECORDED, encoding="utf-8") as f:
+        catalog = build_catalog(json.load(f))
+    records = catalog["records"]
+    for ref, rid in catalog["ref_index"].items():
+        assert records[rid]["ref"] == ref
+    for model, ids in catalog["model_index"].items():
+        assert all(records[rid]["model"] == model for rid in ids)
+    for brand, categories in catalog["brand_index"].items():
+        for category, groups in categories.items():
+            for group, ids in groups.items():
+                assert all(records[rid]["brand"] == brand and records[rid]["category"] == category
+                           and (records[rid]["series"] or category) == group for rid in ids)
+
+
+def test_scrape_builds_the_catalog_into_a_missing_directory(fixture_site, make_scraper, tmp_path):
+    scraper = make_scraper(fixture_site(), catalog_file=str(tmp_path / "cat" / "catalog.json"))
+    assert scraper.run_all_categories()
+    for name in ("catalog.json", "catalog_specs.json", "search_index.json", "model_pattern_index.json"):
+        assert (tmp_path / "cat" / name).exists()
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from ahri_columnar import ColumnarCatalog, export_columnar, infer_schema, parse_number
+from conftest import RECORDED
+
+HEAT_PUMPS = [
+    {"AHRI Ref. #": "201", "Model Number": "HP-24", "HSPF2": "8.1", "Cooling Capacity (95F)": "24,000",
+     "Heating Capacity (47F)": "23,400", "Brand Name": "ACME", "product_category": "Heat Pumps"},
+    {"AHRI Ref. #": "202", "Model Number": "HP-36", "HSPF2": "7.5", "Cooling Capacity (95F)": "36,000",
+     "Heating Capacity (47F)": "35,000", "Brand Name": "ZED", "product_category": "Heat Pumps"},
+    {"AHRI Ref. #": "203", "Model Number": "HP-30", "HSPF2": "9.0", "Cooling Capacity (95F)": "30,000",
+     "Brand Name": "ACME", "product_category": "Heat Pumps"},
+    {"AHRI Ref. #": "204", "Model Number": "HP-48", "HSPF2": "", "Cooling Capacity (95F)": "48,000",
+     "Heating Capacity (47F)": "n/a", "Brand Name": "ZED", "product_category": "Heat Pumps"},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    data = {"scraping_summary": {"total_products": 4}, "products_by_category": {"Heat Pumps": HEAT_PUMPS}}
+    export_columnar(data, str(tmp_path), {"Heat Pumps": ["AHRI Ref. #", "Model Number", "HSPF2"]})
+    return ColumnarCatalog(str(tmp_path))
+
+
+def test_schema_keeps_identifiers_as_text():
+    schema = dict(infer_schema(["AHRI Ref. #", "Model Number", "HSPF2"], HEAT_PUMPS))
+    assert list(schema)[:3] == ["AHRI Ref. #", "Model Number", "HSPF2"]
+    assert schema["AHRI Ref. #"] == "string" and schema["Model Number"] == "string"
+    assert schema["HSPF2"] == "number" and schema["Cooling Capacity (95F)"] == "number"
+    # One unparseable cell keeps the whole column as text
+    assert schema["Heating Capacity (47F)"] == "string"
+    assert parse_number("29,800") == 29800.0 and parse_number("n/a") is None
+
+
+def test_range_filters_drop_missing_values(catalog):
+    table = catalog.table("Heat Pumps")
+    mask = table.mask({"HSPF2": (8, None), "Cooling Capacity (95F)": (24000, 36000)})
+    assert [r["AHRI Ref. #"] for r in table.records(mask)] == ["201", "203"]
+    assert int(table.mask({"HSPF2": (None, None)}).sum()) == 3
+    assert int(table.mask({"Brand Name": "ZED", "Cooling": (40000, None)}).sum()) == 1
+    assert int(table.mask({"Brand Name": "NOBODY"}).sum()) == 0
+
+
+def test_column_names_resolve_by_unique_substring(catalog):
+    table = catalog.table("Heat Pumps")
+    assert table.column("hspf2").tolist()[:3] == [8.1, 7.5, 9.0]
+    with pytest.raises(KeyError):
+        table.resolve("Capacity")
+
+
+def test_recorded_catalog_round_trips(tmp_path):
+    with open(RECORDED, encoding="utf-8") as f:
+        data = json.load(f)
+    manifest = export_columnar(data, str(tmp_path))
+    catalog = ColumnarCatalog(str(tmp_path))
+    assert catalog.categories == list(data["products_by_category"])
+
+    for category, products in data["products_by_category"].items():
+        assert manifest["categories"][category]["rows"] == len(products)
+        numbers = {c["name"] for c in manifest["categories"][category]["columns"] if c["type"] == "number"}
+        expected = [{k: parse_number(v) if k in numbers else v for k, v in p.items() if v not in (None, "")}
+                    for p in products]
+        assert list(catalog.table(category).records()) == expected, category
@@ -0,0 +1,99 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ahri_retry import AdaptiveRateLimiter, FailureLog, RetryPolicy
+from selenium_scraper import AHRISpecialized6Products, page_url
+
+HEADERS = ["AHRI Ref. #", "Outdoor Unit Brand Name", "Outdoor Unit Model Number", "SEER2"]
+RESULTS_URL = "http://stand-in/results/air-conditioners?page=1"
+
+
+class StandInSession:
+    """Plays one browser session on page-addressable results: every page load takes `delay` seconds"""
+
+    def __init__(self, page_count, delay):
+        self.page_count = page_count
+        self.delay = delay
+        self.current_url = None
+        self.loads = 0
+
+    def get(self, url):
+        time.sleep(self.delay)
+        self.current_url = url
+        self.loads += 1
+
+    @property
+    def page(self):
+        return int(self.current_url.rsplit("=", 1)[1])
+
+    def rows(self):
+        if self.page > self.page_count:
+            return [HEADERS]
+        return [HEADERS] + [[str(self.page * 100 + i), f"BRAND{i % 3}", f"M{self.page}-{i}", "16"] for i in range(5)]
+
+    def has_next(self):
+        return self.page < self.page_count
+
+
+def pooled_scraper(tmp_path, sessions, pages_per_job=2):
+    scraper = AHRISpecialized6Products(headless=True)
+    scraper.retry_policy = RetryPolicy(attempts=2, base_delay=0, max_delay=0, seed=1)
+    scraper.rate_limiter = AdaptiveRateLimiter(rate=1000, max_rate=1000)
+    scraper.failure_log = FailureLog(str(tmp_path / "failed.json"), run_id="run-1")
+    scraper.pages_per_job = pages_per_job
+    scraper.drivers = sessions
+    scraper.open_results_with_retry = lambda name, info: scraper.driver.get(RESULTS_URL) or True
+    scraper.extract_table_rows = lambda: scraper.driver.rows()
+    scraper.find_next_button = lambda: scraper.driver.has_next() or None
+    scraper.table_signature = lambda: "rendered"
+    scraper.wait_for_document_ready = lambda: True
+    scraper.wait_for = lambda condition, step: condition(scraper.driver)
+    return scraper
+
+
+def read_pooled(scraper):
+    """Pages read through the pool, in the order they were yielded"""
+    scraper.driver_pool = queue.Queue()
+    for session in scraper.drivers:
+        scraper.driver_pool.put(session)
+    scraper.page_executor = ThreadPoolExecutor(max_workers=len(scraper.drivers))
+    try:
+        info = scraper.categories["Air Conditioning"]
+        return [int(rows[1][0]) // 100 for rows in scraper.iter_pooled_result_pages("Air Conditioning", info)]
+    finally:
+        scraper.page_executor.shutdown(wait=True)
+
+
+def test_page_url_replaces_only_the_page_number():
+    assert page_url(RESULTS_URL, 7) == "http://stand-in/results/air-conditioners?page=7"
+    assert page_url("http://stand-in/results?program=ac&page=1&size=25", 3) == \
+        "http://stand-in/results?program=ac&page=3&size=25"
+    assert page_url("http://stand-in/results#ac", 2) is None
+
+
+def test_one_category_is_spread_across_every_session(tmp_path):
+    sessions = [StandInSession(13, 0) for _ in range(4)]
+    scraper = pooled_scraper(tmp_path, sessions)
+    assert read_pooled(scraper) == list(range(1, 14))
+    assert all(session.loads for session in sessions)
+    assert not scraper.failure_log
+
+
+def test_wall_time_scales_with_sessions(tmp_path):
+    def timed(session_count):
+        sessions = [StandInSession(24, 0.02) for _ in range(session_count)]
+        started = time.perf_counter()
+        assert read_pooled(pooled_scraper(tmp_path, sessions)) == list(range(1, 25))
+        return time.perf_counter() - started
+
+    assert timed(4) < timed(1) / 2.5
+
+
+def test_unaddressable_pager_is_walked_on_one_session(tmp_path):
+    sessions = [StandInSession(3, 0) for _ in range(2)]
+    scraper = pooled_scraper(tmp_path, sessions)
+    scraper.open_results_with_retry = lambda name, info: scraper.driver.get("http://stand-in/results#1") or True
+    scraper.iter_result_pages = lambda name: iter([[HEADERS, ["100"]], [HEADERS, ["200"]]])
+    assert read_pooled(scraper) == [1, 2]
+    assert sum(session.loads for session in sessions) == 1
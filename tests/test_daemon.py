@@ -0,0 +1,74 @@
+import os
+import json
+
+from ahri_daemon import ScraperDaemon
+from ahri_retry import RetryPolicy
+
+
+def make_daemon(base_url, output_dir, workers=2):
+    daemon = ScraperDaemon(workers=workers, backend="http", base_url=base_url, output_dir=str(output_dir))
+    build_scraper = daemon.build_scraper
+
+    def fast_retries(job, session):
+        scraper = build_scraper(job, session)
+        scraper.retry_policy = RetryPolicy(attempts=2, base_delay=0.01, max_delay=0.05, seed=1)
+        return scraper
+
+    daemon.build_scraper = fast_retries
+    return daemon
+
+
+def run_jobs(daemon, specs):
+    daemon.start()
+    try:
+        jobs = [daemon.submit(spec) for spec in specs]
+        for job in jobs:
+            assert job.done.wait(120)
+        return jobs
+    finally:
+        daemon.stop()
+
+
+def test_failure_log_stays_in_the_job_directory(fixture_site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    daemon = make_daemon(fixture_site(faults={"error_rate": 1.0}), tmp_path / "jobs")
+
+    job, = run_jobs(daemon, [{"categories": ["Air Conditioning"]}])
+
+    assert os.path.exists(os.path.join(daemon.job_dir(job), "failed_pages.json"))
+    assert not os.path.exists(tmp_path / "ahri_failed_pages.json")
+
+
+def test_concurrent_incremental_jobs_share_the_record_store(fixture_site, tmp_path):
+    """Slow jobs writing one store at once must not time out on its write lock"""
+    daemon = make_daemon(fixture_site(synthetic_rows=600, faults={"jitter_ms": 400, "seed": 2}), tmp_path)
+    build_scraper = daemon.build_scraper
+
+    def paced(job, session):
+        scraper = build_scraper(job, session)
+        scraper.api_page_size = 20
+        scraper.http_concurrency = 1
+        return scraper
+
+    daemon.build_scraper = paced
+    specs = [{"categories": [name], "incremental": True, "target": 0, "max_per_brand": 0}
+             for name in ("Air Conditioning", "Residential Boilers")]
+
+    jobs = run_jobs(daemon, specs)
+
+    assert [job.status for job in jobs] == ["done"] * 2, [job.error for job in jobs]
+    assert [job.results for job in jobs] == [{spec["categories"][0]: 600} for spec in specs]
+
+
+def test_incremental_job_snapshot_holds_only_its_categories(fixture_site, tmp_path):
+    daemon = make_daemon(fixture_site(), tmp_path, workers=1)
+    specs = [{"categories": [name], "incremental": True, "target": 0, "max_per_brand": 0}
+             for name in ("Air Conditioning", "Residential Boilers")]
+
+    jobs = run_jobs(daemon, specs)
+
+    for job, spec in zip(jobs, specs):
+        with open(job.output_file, encoding="utf-8") as f:
+            results = json.load(f)
+        assert list(results["products_by_category"]) == spec["categories"]
+        assert results["scraping_summary"]["total_products"] == job.results[spec["categories"][0]]
@@ -0,0 +1,55 @@
+import json
+
+from ahri_enrich import COMPONENTS_FIELD, DetailEnricher, HTTPCache
+from ahri_retry import RetryPolicy
+from ahri_stream import NDJSONSink, iter_ndjson
+from conftest import RECORDED
+from selenium_scraper import AHRISpecialized6Products
+
+
+def make_enricher(base_url, tmp_path):
+    programs = {name: info["api_program"] for name, info in AHRISpecialized6Products().categories.items()}
+    return DetailEnricher(base_url, programs, HTTPCache(str(tmp_path / "cache")), workers=2,
+                          retry_policy=RetryPolicy(attempts=2, base_delay=0.01, max_delay=0.05, seed=1))
+
+
+def test_detail_counts_land_in_the_scraping_summary(fixture_site, tmp_path):
+    with open(RECORDED, encoding="utf-8") as f:
+        recorded = json.load(f)
+    products = recorded["products_by_category"]["Air Conditioning"][:5]
+    stream = tmp_path / "results.ndjson"
+    with NDJSONSink(str(stream)) as sink:
+        for product in products + [{"product_category": "Air Conditioning"}]:
+            sink.write(product)
+
+    enricher = make_enricher(fixture_site(), tmp_path)
+    try:
+        summary = enricher.finalize_enriched(str(stream), str(tmp_path / "results.json"), {"source": "test"})
+    finally:
+        enricher.close()
+
+    counts = summary["detail_pages"]
+    assert counts["fetched"] == 5 and counts["skipped"] == 1
+    results = json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))
+    assert results["scraping_summary"]["detail_pages"] == counts
+    enriched = results["products_by_category"]["Air Conditioning"]
+    assert [p.get("AHRI Ref. #") for p in enriched] == [p.get("AHRI Ref. #") for p in products] + [None]
+    assert all(COMPONENTS_FIELD in p for p in enriched[:5])
+
+
+def test_stream_is_enriched_in_input_order(fixture_site, tmp_path):
+    stream = tmp_path / "results.ndjson"
+    with open(RECORDED, encoding="utf-8") as f:
+        products = [p for ps in json.load(f)["products_by_category"].values() for p in ps][:40]
+    with NDJSONSink(str(stream)) as sink:
+        for product in products:
+            sink.write(product)
+
+    enricher = make_enricher(fixture_site(), tmp_path)
+    try:
+        counts = enricher.enrich_ndjson(str(stream))
+    finally:
+        enricher.close()
+
+    assert counts["fetched"] + counts["skipped"] == len(products)
+    assert [p.get("AHRI Ref. #") for p in iter_ndjson(str(stream))] == [p.get("AHRI Ref. #") for p in products]
@@ -0,0 +1,58 @@
+import json
+
+from ahri_quota import quota_brand
+from ahri_table_parser import iter_row_products
+from conftest import RECORDED
+
+VOLATILE = ("extraction_timestamp", "data_source")
+
+
+def comparable(product):
+    return {k: v for k, v in product.items() if k not in VOLATILE and v != ""}
+
+
+def load_results(scraper):
+    with open(scraper.output_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_http_run_collects_the_recorded_directory(fixture_site, make_scraper):
+    scraper = make_scraper(fixture_site())
+    scraper.run_all_categories()
+
+    with open(RECORDED, encoding="utf-8") as f:
+        recorded = json.load(f)["products_by_category"]
+    collected = load_results(scraper)["products_by_category"]
+    assert list(collected) == [name for name in scraper.categories if recorded.get(name)]
+    for name, products in collected.items():
+        assert [comparable(p) for p in products] == [comparable(p) for p in recorded[name]], name
+
+
+def test_http_rows_go_through_the_brand_cap(fixture_site, make_scraper):
+    scraper = make_scraper(fixture_site(synthetic_rows=120), max_per_brand=15)
+    scraper.run_all_categories()
+
+    results = load_results(scraper)
+    counts = {}
+    for product in (p for ps in results["products_by_category"].values() for p in ps):
+        brand = quota_brand(product)
+        counts[brand] = counts.get(brand, 0) + 1
+    assert counts and max(counts.values()) <= 15
+    assert results["brand_distribution"] == dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+
+def test_json_and_rendered_html_pages_give_the_same_products(fixture_site, make_scraper):
+    scraper = make_scraper(fixture_site(synthetic_rows=60))
+    assert scraper.setup_http_session()
+    try:
+        info = scraper.categories["Air Conditioning"]
+        api_rows, total = scraper.fetch_results_page(info, 1)
+        scraper.api_search_path = "/results/{program}?page={page}"
+        html_rows, _ = scraper.fetch_results_page(info, 1)
+    finally:
+        scraper.http_session.close()
+
+    assert total == 60
+    from_api = [comparable(p) for p in iter_row_products("Air Conditioning", api_rows)]
+    from_html = [comparable(p) for p in iter_row_products("Air Conditioning", html_rows)]
+    assert len(from_api) == 60 and from_api == from_html
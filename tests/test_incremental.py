@@ -0,0 +1,59 @@
+import json
+
+from ahri_incremental import RecordStore
+
+
+def listed_count(store_file):
+    store = RecordStore(store_file)
+    try:
+        return sum(1 for _ in store.records())
+    finally:
+        store.close()
+
+
+def test_failed_pages_do_not_deactivate_records(fixture_site, make_scraper):
+    """A faulty re-crawl must not delist the rows of pages it never read"""
+    clean_url = fixture_site(synthetic_rows=300)
+    seed = make_scraper(clean_url, incremental=True, stop_after_unchanged=0)
+    assert seed.run_all_categories()
+    baseline = listed_count(seed.store_file)
+    assert baseline == 6 * 300
+
+    faulty_url = fixture_site(synthetic_rows=300, faults={"error_rate": 0.3, "seed": 7})
+    rerun = make_scraper(faulty_url, attempts=1, incremental=True, stop_after_unchanged=0)
+    rerun.run_all_categories()
+    assert rerun.failure_log
+
+    with open(rerun.delta_file, encoding="utf-8") as f:
+        delta = json.load(f)
+    assert delta["counts"]["deactivated"] == 0
+    assert listed_count(rerun.store_file) == baseline
+    with open(rerun.output_file, encoding="utf-8") as f:
+        assert json.load(f)["scraping_summary"]["total_products"] == baseline
+
+
+def test_clean_recrawl_still_deactivates_delisted_records(fixture_site, make_scraper):
+    seed = make_scraper(fixture_site(synthetic_rows=300), incremental=True, stop_after_unchanged=0)
+    seed.run_all_categories()
+
+    rerun = make_scraper(fixture_site(synthetic_rows=250), incremental=True, stop_after_unchanged=0)
+    rerun.run_all_categories()
+
+    with open(rerun.delta_file, encoding="utf-8") as f:
+        assert json.load(f)["counts"]["deactivated"] == 6 * 50
+
+
+def test_relisted_records_are_reported(fixture_site, make_scraper):
+    seed = make_scraper(fixture_site(synthetic_rows=300), incremental=True, stop_after_unchanged=0)
+    seed.run_all_categories()
+    delist = make_scraper(fixture_site(synthetic_rows=250), incremental=True, stop_after_unchanged=0)
+    delist.run_all_categories()
+
+    relist = make_scraper(fixture_site(synthetic_rows=300), incremental=True, stop_after_unchanged=0)
+    relist.run_all_categories()
+    with open(relist.delta_file, encoding="utf-8") as f:
+        delta = json.load(f)
+    assert delta["counts"]["relisted"] == 6 * 50
+    assert delta["counts"]["added"] == delta["counts"]["changed"] == 0
+    assert len(delta["relisted"]) == 6 * 50
+    assert listed_count(relist.store_file) == 6 * 300
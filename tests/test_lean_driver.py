@@ -0,0 +1,119 @@
+import sys
+import types
+
+import pytest
+from selenium import webdriver
+from selenium.webdriver.chrome import service as chrome_service
+
+from ahri_metrics import RunMetrics
+from selenium_scraper import AHRISpecialized6Products
+
+
+class StandInChrome:
+    """Records what create_driver asks of a Chrome session instead of launching one"""
+
+    def __init__(self, service=None, options=None):
+        self.service = service
+        self.options = options
+        self.implicit_wait = None
+        self.page_load_timeout = None
+        self.cdp = []
+
+    def implicitly_wait(self, seconds):
+        self.implicit_wait = seconds
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+
+class StandInService:
+    def __init__(self, path):
+        self.path = path
+
+
+@pytest.fixture
+def scraper(monkeypatch, tmp_path):
+    monkeypatch.setattr(webdriver, "Chrome", StandInChrome)
+    monkeypatch.setattr(chrome_service, "Service", StandInService)
+    scraper = AHRISpecialized6Products(headless=False)
+    scraper.driver_cache_file = str(tmp_path / "chromedriver_path")
+    scraper.resolve_driver_path = lambda: "/opt/chromedriver"
+    return scraper
+
+
+def test_lean_session_is_headless_eager_and_blocks_heavy_requests(scraper, tmp_path):
+    scraper.lean = True
+    scraper.profile_dir = str(tmp_path / "profiles")
+    driver = scraper.create_driver()
+
+    arguments = driver.options.arguments
+    assert "--headless=new" in arguments and "--blink-settings=imagesEnabled=false" in arguments
+    assert driver.options.page_load_strategy == "eager"
+    assert driver.options.experimental_options["prefs"]["profile.managed_default_content_settings.images"] == 2
+    assert f"--user-data-dir={tmp_path / 'profiles' / 'session-0'}" in arguments
+    assert driver.service.path == "/opt/chromedriver"
+    assert driver.implicit_wait == 0 and driver.page_load_timeout == scraper.timeouts["page_load"]
+    assert driver.cdp == [("Network.enable", {}),
+                          ("Network.setBlockedURLs", {"urls": scraper.blocked_url_patterns})]
+    assert "*.woff2" in scraper.blocked_url_patterns
+
+
+def test_default_session_keeps_the_visible_normal_profile(scraper):
+    driver = scraper.create_driver()
+    assert "--headless=new" not in driver.options.arguments
+    assert driver.options.page_load_strategy == "normal"
+    assert driver.implicit_wait == 0 and driver.cdp == []
+
+
+def test_metrics_time_every_webdriver_command(scraper):
+    scraper.metrics = RunMetrics()
+    driver = scraper.create_driver()
+    driver.execute("findElements", {})
+    timings = scraper.metrics.to_report()["timings"]["webdriver_command_seconds"]
+    assert [(t["command"], t["count"]) for t in timings] == [("findElements", 1)]
+
+
+def test_lean_pages_are_ready_once_the_dom_is_parsed():
+    scraper = AHRISpecialized6Products(headless=True)
+    scraper.wait_for = lambda condition, step: condition(types.SimpleNamespace(
+        execute_script=lambda script: "interactive"))
+    assert not scraper.wait_for_document_ready()
+    scraper.lean = True
+    assert scraper.wait_for_document_ready()
+
+
+def test_chromedriver_is_downloaded_once_then_reused(monkeypatch, tmp_path):
+    binary = tmp_path / "chromedriver"
+    binary.write_text("")
+    installs = []
+
+    class StandInManager:
+        def install(self):
+            installs.append(1)
+            return str(binary)
+
+    chrome = types.ModuleType("webdriver_manager.chrome")
+    chrome.ChromeDriverManager = StandInManager
+    monkeypatch.setitem(sys.modules, "webdriver_manager", types.ModuleType("webdriver_manager"))
+    monkeypatch.setitem(sys.modules, "webdriver_manager.chrome", chrome)
+
+    def fresh_scraper():
+        scraper = AHRISpecialized6Products(headless=True)
+        scraper.driver_cache_file = str(tmp_path / "chromedriver_path")
+        return scraper
+
+    assert fresh_scraper().resolve_driver_path() == str(binary)
+    second = fresh_scraper()
+    assert second.resolve_driver_path() == str(binary) == second.resolve_driver_path()
+    assert len(installs) == 1
+
+    # A cached path whose binary is gone is downloaded again
+    binary.unlink()
+    fresh_scraper().resolve_driver_path()
+    assert len(installs) == 2
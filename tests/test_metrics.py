@@ -0,0 +1,97 @@
+import json
+import threading
+import urllib.request
+
+from ahri_metrics import NullMetrics, RunMetrics, start_metrics_server
+
+
+def test_counts_and_timings_are_keyed_by_labels():
+    metrics = RunMetrics()
+    metrics.count("rows", 3, category="Boilers", outcome="accepted")
+    metrics.count("rows", category="Boilers", outcome="accepted")
+    metrics.count("rows", outcome="duplicate", category="Boilers")
+    metrics.observe("stage_seconds", 0.5, stage="search")
+    metrics.observe("stage_seconds", 1.5, stage="search")
+    with metrics.stage("finalize"):
+        pass
+
+    report = metrics.to_report({"total_products": 4})
+    assert report["summary"] == {"total_products": 4}
+    assert report["counters"]["rows"] == [
+        {"category": "Boilers", "outcome": "accepted", "value": 4},
+        {"category": "Boilers", "outcome": "duplicate", "value": 1},
+    ]
+    stages = {t["stage"]: t for t in report["timings"]["stage_seconds"]}
+    assert stages["search"] == {"stage": "search", "count": 2, "total_s": 2.0, "mean_s": 1.0, "max_s": 1.5}
+    assert stages["finalize"]["count"] == 1
+
+
+def test_counts_are_thread_safe():
+    metrics = RunMetrics()
+
+    def work():
+        for _ in range(2000):
+            metrics.count("retries", step="fetch_page")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.to_report()["counters"]["retries"] == [{"step": "fetch_page", "value": 16000}]
+
+
+def test_report_and_prometheus_files(tmp_path):
+    metrics = RunMetrics()
+    metrics.count("fallback_hits", step="search_button", selector='//button[@type="submit"]')
+    metrics.observe("webdriver_command_seconds", 0.25, command="findElements")
+
+    metrics.write_report(str(tmp_path / "report.json"))
+    with open(tmp_path / "report.json", encoding="utf-8") as f:
+        assert json.load(f)["timings"]["webdriver_command_seconds"][0]["command"] == "findElements"
+
+    metrics.write_prometheus(str(tmp_path / "ahri.prom"))
+    lines = (tmp_path / "ahri.prom").read_text(encoding="utf-8").splitlines()
+    assert lines[:2] == [
+        "# TYPE ahri_fallback_hits_total counter",
+        'ahri_fallback_hits_total{selector="//button[@type=\\"submit\\"]",step="search_button"} 1',
+    ]
+    assert 'ahri_webdriver_command_seconds_count{command="findElements"} 1' in lines
+    assert 'ahri_webdriver_command_seconds_sum{command="findElements"} 0.250000' in lines
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    metrics = RunMetrics()
+    metrics.count("nav_cache", result="hit")
+    server = start_metrics_server(metrics, 0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.read().decode("utf-8") == metrics.prometheus_text()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_null_metrics_record_nothing():
+    metrics = NullMetrics()
+    driver = object()
+    metrics.count("rows", category="Boilers")
+    metrics.observe("stage_seconds", 1.0, stage="search")
+    with metrics.stage("search"):
+        pass
+    assert metrics.instrument_driver(driver) is driver and not metrics.enabled
+
+
+def test_run_report_counts_row_outcomes(fixture_site, make_scraper, tmp_path):
+    scraper = make_scraper(fixture_site(synthetic_rows=40), metrics=RunMetrics(),
+                           metrics_file=str(tmp_path / "ahri_run_report.json"))
+    scraper.run_all_categories()
+
+    with open(scraper.metrics_file, encoding="utf-8") as f:
+        report = json.load(f)
+    accepted = {r["category"]: r["value"] for r in report["counters"]["rows"] if r["outcome"] == "accepted"}
+    assert accepted == {name: 40 for name in scraper.categories}
+    assert {r["status"] for r in report["counters"]["http_responses"]} == {200}
+    assert report["summary"]["total_products"] == 6 * 40
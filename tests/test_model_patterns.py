@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from ahri_catalog_build import build_catalog
+from ahri_model_patterns import ModelPatternIndex
+from conftest import RECORDED
+from helpers import linear_match, sample_models
+
+
+@pytest.fixture(scope="module")
+def records():
+    with open(RECORDED, encoding="utf-8") as f:
+        return build_catalog(json.load(f))["records"]
+
+
+def test_match_agrees_with_a_linear_scan(records):
+    index = ModelPatternIndex.build(records)
+    matched = 0
+    for model in sample_models(records, 300):
+        hits = [(hit["record"], hit["specificity"], hit["accessory_dropped"]) for hit in index.match(model)]
+        assert hits == linear_match(records, model), model
+        matched += bool(hits)
+    assert matched > 200
+
+
+def test_saved_index_matches_the_same(records, tmp_path):
+    index = ModelPatternIndex.build(records)
+    index.save(str(tmp_path / "model_pattern_index.json"))
+    loaded = ModelPatternIndex.load(str(tmp_path / "model_pattern_index.json"))
+    for model in sample_models(records, 50, seed=1):
+        assert loaded.match(model) == index.match(model), model
@@ -0,0 +1,96 @@
+import json
+import types
+
+from ahri_metrics import RunMetrics
+from ahri_nav_cache import NavigationCache
+from selenium_scraper import AHRISpecialized6Products
+
+LIVE = "https://www.ahridirectory.org"
+LOCAL = "http://127.0.0.1:8000"
+RESULTS = "/search/air-conditioners/results?page=1"
+
+
+def test_entries_persist_per_directory_root(tmp_path):
+    path = str(tmp_path / "nav.json")
+    cache = NavigationCache(path)
+    cache.record(LIVE, "Air Conditioning", LIVE + RESULTS)
+    cache.record(LOCAL, "Air Conditioning", LOCAL + RESULTS)
+    cache.hit(LIVE, "Air Conditioning")
+    cache.hit(LIVE, "Residential Boilers")  # no entry, nothing to count
+
+    reloaded = NavigationCache(path)
+    assert reloaded.get(LIVE, "Air Conditioning") == LIVE + RESULTS
+    assert reloaded.get(LOCAL, "Air Conditioning") == LOCAL + RESULTS
+    assert reloaded.get(LIVE, "Residential Boilers") is None
+    assert reloaded.entries[LIVE]["Air Conditioning"]["hits"] == 1
+
+    # Re-recording the same URL keeps its hit count; invalidation is persisted
+    reloaded.record(LIVE, "Air Conditioning", LIVE + RESULTS)
+    reloaded.invalidate(LOCAL, "Air Conditioning")
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    assert entries[LIVE]["Air Conditioning"]["hits"] == 1 and entries[LOCAL] == {}
+
+
+def test_unreadable_cache_is_a_cold_start(tmp_path):
+    path = tmp_path / "nav.json"
+    path.write_text('{"half', encoding="utf-8")
+    assert NavigationCache(str(path)).entries == {}
+
+
+def navigating_scraper(tmp_path, cached_page_ok):
+    """Scraper whose browser steps are recorded instead of driven"""
+    scraper = AHRISpecialized6Products(headless=True, base_url=LOCAL)
+    scraper.nav_cache_file = str(tmp_path / "nav.json")
+    scraper.metrics = RunMetrics()
+    scraper.steps = []
+    scraper.driver = types.SimpleNamespace(current_url=LOCAL + RESULTS)
+
+    def open_cached(name, info, url):
+        scraper.steps.append(("cached", url))
+        return cached_page_ok
+
+    def click_through(name, info):
+        scraper.steps.append(("click_through", name))
+        return True
+
+    scraper.open_cached_results = open_cached
+    scraper.click_through_to_results = click_through
+    scraper.wait_for_results_table = lambda: True
+    return scraper
+
+
+def nav_counts(scraper):
+    return {c["result"]: c["value"] for c in scraper.metrics.to_report()["counters"].get("nav_cache", [])}
+
+
+def test_second_run_opens_the_cached_url(tmp_path):
+    info = AHRISpecialized6Products().categories["Air Conditioning"]
+    first = navigating_scraper(tmp_path, cached_page_ok=True)
+    assert first.open_category_results("Air Conditioning", info)
+    assert first.steps == [("click_through", "Air Conditioning")]
+
+    second = navigating_scraper(tmp_path, cached_page_ok=True)
+    assert second.open_category_results("Air Conditioning", info)
+    assert second.steps == [("cached", LOCAL + RESULTS)]
+    assert nav_counts(second) == {"hit": 1}
+    assert NavigationCache(second.nav_cache_file).entries[LOCAL]["Air Conditioning"]["hits"] == 1
+
+
+def test_stale_cached_url_falls_back_to_click_through(tmp_path):
+    info = AHRISpecialized6Products().categories["Air Conditioning"]
+    NavigationCache(str(tmp_path / "nav.json")).record(LOCAL, "Air Conditioning", LOCAL + "/moved")
+
+    scraper = navigating_scraper(tmp_path, cached_page_ok=False)
+    assert scraper.open_category_results("Air Conditioning", info)
+    assert scraper.steps == [("cached", LOCAL + "/moved"), ("click_through", "Air Conditioning")]
+    assert nav_counts(scraper) == {"stale": 1}
+    # The URL the click-through actually reached replaces the stale one
+    assert NavigationCache(scraper.nav_cache_file).get(LOCAL, "Air Conditioning") == LOCAL + RESULTS
+
+
+def test_other_directory_roots_never_share_entries(tmp_path):
+    NavigationCache(str(tmp_path / "nav.json")).record(LIVE, "Air Conditioning", LIVE + RESULTS)
+    scraper = navigating_scraper(tmp_path, cached_page_ok=True)
+    scraper.open_category_results("Air Conditioning", AHRISpecialized6Products().categories["Air Conditioning"])
+    assert scraper.steps == [("click_through", "Air Conditioning")]
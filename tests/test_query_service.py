@@ -0,0 +1,133 @@
+import json
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from ahri_columnar import parse_number
+from ahri_query_service import FACETS, TEXT_SORTS, CatalogIndex, facet_value, parse_query
+from conftest import RECORDED
+from helpers import linear_match, sample_models
+
+
+@pytest.fixture(scope="module")
+def index():
+    with open(RECORDED, encoding="utf-8") as f:
+        return CatalogIndex(json.load(f))
+
+
+def metric(index, record, slug):
+    value = record["product"].get(index.metric_columns[slug])
+    number = parse_number(value) if value not in (None, "") else None
+    return math.nan if number is None else number
+
+
+def linear_filter(index, query, skip_facet=None):
+    """Reference: test every record against every filter"""
+    model_ids = {hit[0] for hit in linear_match(index.records, query["model"])} if query["model"] else None
+    ids = []
+    for record in index.records:
+        if any(facet != skip_facet and wanted and facet_value(record, facet) not in wanted
+               for facet, wanted in query["facets"].items()):
+            continue
+        if any(not (low if low is not None else -math.inf) <= metric(index, record, slug)
+               <= (high if high is not None else math.inf)
+               for slug, (low, high) in query["ranges"].items()):
+            continue
+        if model_ids is not None and record["id"] not in model_ids:
+            continue
+        ids.append(record["id"])
+    return ids
+
+
+def linear_sort(index, ids, sort):
+    """Reference order: ascending by value then id, descending is its exact reverse; missing values last"""
+    if not sort:
+        return list(ids)
+    key = sort.lstrip("-")
+    if key in index.metric_values:
+        value = {rid: metric(index, index.records[rid], key) for rid in ids}
+        present = sorted((rid for rid in ids if not math.isnan(value[rid])), key=lambda rid: (value[rid], rid))
+        missing = [rid for rid in ids if math.isnan(value[rid])]
+    else:
+        value = {rid: index.records[rid].get(key) for rid in ids}
+        present = sorted((rid for rid in ids if value[rid] is not None),
+                         key=lambda rid: (str(value[rid]).upper(), rid))
+        missing = [rid for rid in ids if value[rid] is None]
+    return (present[::-1] if sort.startswith("-") else present) + missing
+
+
+def sample_queries(index, count, seed=0):
+    rng = random.Random(seed)
+    slugs = sorted(index.metric_columns, key=lambda slug: -len(index.metric_order[slug]))[:6]
+    models = sample_models(index.records, 40, seed=seed)
+    sorts = [None] + list(TEXT_SORTS) + slugs
+    for _ in range(count):
+        query = {"facets": {}, "ranges": {}, "model": None}
+        for facet in FACETS:
+            if rng.random() < 0.35 and index.values[facet]:
+                query["facets"][facet] = set(rng.sample(index.values[facet], min(len(index.values[facet]),
+                                                                                rng.randint(1, 3))))
+        for slug in rng.sample(slugs, rng.randint(0, 2)):
+            ordered = index.metric_sorted[slug]
+            low, high = sorted(rng.choice(ordered) for _ in range(2))
+            query["ranges"][slug] = (low if rng.random() < 0.8 else None, high if rng.random() < 0.8 else None)
+        if rng.random() < 0.2:
+            query["model"] = rng.choice(models)
+        sort = rng.choice(sorts)
+        if sort and rng.random() < 0.5:
+            sort = "-" + sort
+        yield query, sort
+
+
+def test_candidates_match_a_linear_filter(index):
+    for query, _ in sample_queries(index, 300):
+        assert list(index.candidates(query)) == linear_filter(index, query), query
+
+
+def test_pages_and_facets_match_a_linear_scan(index):
+    for query, sort in sample_queries(index, 150, seed=1):
+        expected = linear_filter(index, query)
+        ordered = linear_sort(index, expected, sort)
+        for page in (1, 2):
+            result = index.search(query, sort=sort, page=page, page_size=25, facet_limit=10000)
+            assert result["total"] == len(expected)
+            assert [r["id"] for r in result["results"]] == ordered[(page - 1) * 25:page * 25], (query, sort)
+
+        for facet in FACETS:
+            source = linear_filter(index, query, skip_facet=facet) if query["facets"].get(facet) else expected
+            tally = Counter(facet_value(index.records[rid], facet) for rid in source)
+            tally.pop(None, None)
+            assert dict(result["facets"][facet]) == tally, (query, facet)
+
+
+def test_unfiltered_sorts_walk_the_whole_catalog(index):
+    query = {"facets": {}, "ranges": {}, "model": None}
+    everything = list(range(len(index)))
+    for key in list(TEXT_SORTS) + list(index.metric_columns)[:5]:
+        for sort in (key, "-" + key):
+            assert index.page_ids(index.candidates(query), sort, 40, 60) == \
+                linear_sort(index, everything, sort)[40:100], sort
+
+
+def test_sorted_pages_within_one_category(index):
+    """Small result sets take the heap path; it must order exactly like the full walk"""
+    for category in index.values["category"]:
+        query = {"facets": {"category": {category}}, "ranges": {}, "model": None}
+        ids = index.candidates(query)
+        for key in list(TEXT_SORTS) + list(index.metric_columns)[:5]:
+            for sort in (key, "-" + key):
+                assert index.page_ids(ids, sort, 0, len(ids)) == linear_sort(index, list(ids), sort), \
+                    (category, sort)
+
+
+def test_parse_query_reads_url_parameters(index):
+    slug = next(iter(index.metric_columns))
+    query, sort, page, page_size, facets = parse_query(
+        {"brand": ["LENNOX", "TRANE"], f"min.{slug}": ["16"], "sort": [f"-{slug}"], "page": ["3"],
+         "page_size": ["9999"], "facets": ["brand,status,bogus"]}, index)
+    assert query == {"facets": {"brand": {"LENNOX", "TRANE"}}, "ranges": {slug: (16.0, None)}, "model": None}
+    assert (sort, page, page_size, facets) == (f"-{slug}", 3, 500, ["brand", "status"])
+    with pytest.raises(ValueError):
+        parse_query({"min.no_such_metric": ["1"]}, index)
@@ -0,0 +1,61 @@
+import json
+import random
+
+import pytest
+
+from ahri_dedup_index import product_identity
+from ahri_quota import QuotaEngine, quota_brand, resolve_brand, sample_priority
+from conftest import RECORDED
+
+
+def recorded_products():
+    with open(RECORDED, encoding="utf-8") as f:
+        by_category = json.load(f)["products_by_category"]
+    return [product for products in by_category.values() for product in products], list(by_category)
+
+
+def reservoir_selection(products, categories, seed):
+    engine = QuotaEngine(global_cap=12, category_cap=5, category_targets={c: 40 for c in categories},
+                         seed=seed, mode="reservoir")
+    for product in products:
+        engine.offer(product)
+    return {category: [product_identity(p) for p in selected]
+            for category, selected in engine.selection(categories).items()}
+
+
+@pytest.mark.parametrize("seed", [0, 7])
+def test_reservoir_selection_ignores_arrival_order(seed):
+    products, categories = recorded_products()
+    expected = reservoir_selection(products, categories, seed)
+    assert sum(map(len, expected.values())) > 0
+
+    for shuffle_seed in range(3):
+        shuffled = list(products)
+        random.Random(shuffle_seed).shuffle(shuffled)
+        assert reservoir_selection(shuffled, categories, seed) == expected
+
+
+def test_brand_resolution_covers_indoor_unit_brands():
+    assert resolve_brand({"Indoor Unit Brand Name": " carrier  corp "}) == "CARRIER CORP"
+    assert resolve_brand({"Outdoor Unit Brand Name": "Trane", "Indoor Unit Brand Name": "Carrier"}) == "TRANE"
+
+
+def test_slots_a_full_category_frees_go_to_the_brand_elsewhere():
+    # Brand X's five best-ranked rows: three in A (target 1), the other two in B
+    rows = sorted(({"AHRI Ref. #": str(i), "Outdoor Unit Brand Name": "X"} for i in range(5)), key=sample_priority)
+    for product, category in zip(rows, "AAABB"):
+        product["product_category"] = category
+    engine = QuotaEngine(global_cap=2, category_targets={"A": 1, "B": 5}, mode="reservoir")
+    for product in rows:
+        engine.offer(product)
+    selection = engine.selection(["A", "B"])
+    assert selection == {"A": [rows[0]], "B": [rows[3]]}
+
+
+def test_brandless_rows_are_capped_by_their_first_meaningful_field():
+    engine = QuotaEngine(global_cap=1)
+    assert engine.offer({"AHRI Ref. #": "1001", "SEER2": "16"})
+    assert engine.offer({"AHRI Ref. #": "1002", "SEER2": "16"})
+    assert not engine.offer({"AHRI Ref. #": "1002", "EER2": "12"})
+    assert quota_brand({"product_category": "Air Conditioning", "AHRI Ref. #": "1001"}) == "1001"
+    assert resolve_brand({"AHRI Ref. #": "1001"}) == "UNKNOWN"
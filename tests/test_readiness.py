@@ -0,0 +1,79 @@
+import time
+
+from selenium_scraper import AHRISpecialized6Products
+
+
+class StandInElement:
+    def __init__(self, text, displayed=True, stale=False):
+        self.text = text
+        self.displayed = displayed
+        self.stale = stale
+
+    def is_displayed(self):
+        if self.stale:
+            raise RuntimeError("stale element reference")
+        return self.displayed
+
+
+class StandInDriver:
+    """Answers find_elements / current_url the way a page that settles after a few polls would"""
+
+    def __init__(self, elements=(), ready_after=0, next_url=None):
+        self.elements = list(elements)
+        self.ready_after = ready_after
+        self.next_url = next_url
+        self.polls = 0
+        self.url = "http://stand-in/"
+
+    def find_elements(self, by, selector):
+        self.polls += 1
+        return self.elements if self.polls > self.ready_after else []
+
+    @property
+    def current_url(self):
+        self.polls += 1
+        if self.next_url and self.polls > self.ready_after:
+            return self.next_url
+        return self.url
+
+
+def stand_in_scraper(driver, **timeouts):
+    scraper = AHRISpecialized6Products(headless=True)
+    scraper.driver = driver
+    scraper.poll_interval = 0.01
+    scraper.timeouts.update(timeouts)
+    return scraper
+
+
+def test_wait_returns_as_soon_as_the_page_is_ready():
+    button = StandInElement("Search")
+    scraper = stand_in_scraper(StandInDriver([button], ready_after=3), search_button=10)
+    started = time.perf_counter()
+    found = scraper.wait_for(lambda d: scraper.find_displayed("xpath", "//button"), "search_button")
+    assert found is button
+    assert time.perf_counter() - started < 1
+
+
+def test_each_step_has_its_own_timeout():
+    scraper = stand_in_scraper(StandInDriver(), cookie_banner=0.2, results_table=30)
+    started = time.perf_counter()
+    assert scraper.wait_for(lambda d: scraper.find_displayed("xpath", "//button"), "cookie_banner") is None
+    assert 0.2 <= time.perf_counter() - started < 2
+
+
+def test_find_displayed_skips_hidden_and_stale_elements_without_waiting():
+    hidden, stale, other, card = (StandInElement("Air Conditioning", displayed=False),
+                                  StandInElement("Air Conditioning", stale=True),
+                                  StandInElement("Boilers"), StandInElement("Air Conditioning"))
+    scraper = stand_in_scraper(StandInDriver([hidden, stale, other, card]))
+    assert scraper.find_displayed("xpath", "//*", lambda e: "Air" in e.text) is card
+
+    empty = stand_in_scraper(StandInDriver())
+    started = time.perf_counter()
+    assert empty.find_displayed("xpath", "//*") is None
+    assert time.perf_counter() - started < 0.1
+
+
+def test_navigation_wait_returns_the_new_url():
+    scraper = stand_in_scraper(StandInDriver(ready_after=2, next_url="http://stand-in/search/ac"), navigation=5)
+    assert scraper.wait_for_url_change("http://stand-in/") == "http://stand-in/search/ac"
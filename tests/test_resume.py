@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from ahri_dedup_index import DedupIndex, product_identity
+from ahri_quota import QuotaEngine
+from ahri_stream import NDJSONSink, iter_ndjson
+
+
+def test_dedup_keys_wait_for_the_sink_flush(tmp_path):
+    """Keys of rows still in the write buffer at a crash stay unseen for the resumed run"""
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"), run_id="run-1")
+    sink = NDJSONSink(str(tmp_path / "stream.ndjson"), flush_every=50, on_flush=index.commit)
+    for i in range(70):
+        product = {"AHRI Ref. #": str(i), "product_category": "Air Conditioning"}
+        assert not index.check_and_add(product)
+        sink.write(product)
+        index.settle(product)
+    # Crash: no close(), the last 20 rows never reach the disk
+    index.close()
+
+    durable = sum(1 for _ in iter_ndjson(str(tmp_path / "stream.ndjson")))
+    resumed = DedupIndex(str(tmp_path / "dedup.sqlite"), run_id="run-1")
+    seen = [resumed.check_and_add({"AHRI Ref. #": str(i)}) for i in range(70)]
+    resumed.close()
+    sink.file.close()
+    assert durable == 50
+    assert seen[:49] == [True] * 49 and not any(seen[durable:])
+
+
+def test_reservoir_settles_the_claims_of_rows_it_drops(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"), run_id="run-1")
+    engine = QuotaEngine(global_cap=3, category_targets={"Air Conditioning": 5}, mode="reservoir",
+                         on_release=index.settle)
+    for i in range(60):
+        product = {"AHRI Ref. #": str(i), "Outdoor Unit Brand Name": f"BRAND{i % 4}",
+                   "product_category": "Air Conditioning"}
+        assert not index.check_and_add(product)
+        if engine.offer(product) is False:
+            index.settle(product)
+    for product in engine.selection()["Air Conditioning"]:
+        index.settle(product)  # emitted
+    index.commit()
+    assert not index.claimed
+    assert len(index) == 60
+    index.close()
+
+
+def test_identity_is_directory_wide():
+    ac = {"Outdoor Unit Brand Name": "Trane", "Outdoor Unit Model Number": "4TTR6036", "product_category": "Air Conditioning"}
+    hp = {**ac, "product_category": "Heat Pumps"}
+    assert product_identity(ac) == product_identity(hp)
+    assert product_identity({**ac, "AHRI Ref. #": "1"}) == product_identity({**hp, "AHRI Ref. #": "1"})
+
+
+def test_torn_last_line_is_cut_before_appending(tmp_path):
+    path = tmp_path / "stream.ndjson"
+    path.write_text('{"a": 1}\n{"a": 2}\n{"a"', encoding="utf-8")
+    with NDJSONSink(str(path), append=True) as sink:
+        sink.write({"a": 3})
+    assert [row["a"] for row in iter_ndjson(str(path))] == [1, 2, 3]
+
+
+def test_resumed_run_keeps_targets_and_brand_counts(fixture_site, make_scraper, monkeypatch):
+    base_url = fixture_site(synthetic_rows=300)
+    first = make_scraper(base_url)
+    for info in first.categories.values():
+        info["target"] = 50
+
+    # Interrupt the first run part-way through its third category
+    emit_product = first.emit_product
+    emitted = []
+
+    def interrupted(product):
+        if len(emitted) == 120:
+            raise KeyboardInterrupt
+        emitted.append(product)
+        emit_product(product)
+
+    monkeypatch.setattr(first, "emit_product", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        first.run_all_categories()
+    assert sum(1 for _ in iter_ndjson(first.stream_file)) == 120
+
+    resumed = make_scraper(base_url, run_id=first.run_id)
+    for info in resumed.categories.values():
+        info["target"] = 50
+    resumed.run_all_categories()
+
+    with open(resumed.output_file, encoding="utf-8") as f:
+        results = json.load(f)
+    assert {c: len(p) for c, p in results["products_by_category"].items()} == \
+        {name: 50 for name in resumed.categories}
+    assert sum(results["brand_distribution"].values()) == 300
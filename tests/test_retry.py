@@ -0,0 +1,113 @@
+import pytest
+
+from ahri_retry import AdaptiveRateLimiter, FailureLog, PageSet, RetryPolicy, TransientError, run_step
+from selenium_scraper import AHRISpecialized6Products
+
+HEADERS = ["AHRI Ref. #", "Outdoor Unit Brand Name", "Outdoor Unit Model Number", "SEER2"]
+
+
+class StandInPager:
+    """Plays the Selenium results pager: rendered table rows, Next clicks, refreshes
+
+    broken_next: page whose Next click never renders (raises every time);
+    blank_renders: {page: how many reads come back without data rows first}.
+    """
+
+    def __init__(self, page_count, broken_next=None, blank_renders=None):
+        self.page_count = page_count
+        self.broken_next = broken_next
+        self.blank_renders = dict(blank_renders or {})
+        self.page = 1
+        self.refreshes = 0
+
+    def rows(self):
+        if self.blank_renders.get(self.page):
+            self.blank_renders[self.page] -= 1
+            return [HEADERS]
+        return [HEADERS] + [[str(self.page * 100 + i), f"BRAND{i % 3}", f"M{self.page}-{i}", "16"] for i in range(5)]
+
+    def next(self):
+        if self.page >= self.page_count:
+            return False
+        if self.page == self.broken_next:
+            raise TransientError("next page never rendered")
+        self.page += 1
+        return True
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+def stand_in_scraper(pager, tmp_path, page_filter=None):
+    scraper = AHRISpecialized6Products(headless=True)
+    scraper.retry_policy = RetryPolicy(attempts=2, base_delay=0, max_delay=0, seed=1)
+    scraper.rate_limiter = AdaptiveRateLimiter(rate=1000)
+    scraper.failure_log = FailureLog(str(tmp_path / "failed.json"), run_id="run-1")
+    scraper.page_filter = page_filter or {}
+    scraper.driver = pager
+    scraper.extract_table_rows = pager.rows
+    scraper.go_to_next_page = pager.next
+    scraper.wait_for_document_ready = lambda: True
+    scraper.wait_for_results_table = lambda: True
+    return scraper
+
+
+def read_pages(scraper):
+    return [int(rows[1][0]) // 100 for rows in scraper.iter_result_pages("Air Conditioning")]
+
+
+def test_blank_render_is_refreshed_and_read(tmp_path):
+    pager = StandInPager(3, blank_renders={2: 1})
+    scraper = stand_in_scraper(pager, tmp_path)
+    assert read_pages(scraper) == [1, 2, 3]
+    assert pager.refreshes == 1
+    assert not scraper.failure_log
+
+
+def test_broken_pager_is_logged_open_ended_and_recovered(tmp_path):
+    scraper = stand_in_scraper(StandInPager(6, broken_next=3, blank_renders={2: 5}), tmp_path)
+    assert read_pages(scraper) == [1, 3]
+    scraper.failure_log.save()
+
+    run_id, page_filter = FailureLog.load(scraper.failure_log.path)
+    assert run_id == "run-1"
+    assert page_filter == {"Air Conditioning": PageSet([2], onward=4)}
+
+    rerun = stand_in_scraper(StandInPager(6), tmp_path, page_filter)
+    assert read_pages(rerun) == [2, 4, 5, 6]
+
+
+def test_page_set_membership():
+    pages = PageSet([9, 2, 5, 2], onward=5)
+    assert list(pages) == [2]
+    assert [p for p in range(1, 8) if p in pages] == [2, 5, 6, 7]
+    assert pages.last is None
+    assert PageSet([3, 1]).last == 3
+
+
+def test_failed_first_page_reruns_the_whole_category(tmp_path):
+    log = FailureLog(str(tmp_path / "failed.json"))
+    log.record("Air Conditioning", "fetch_page", "boom", page=4)
+    log.record("Air Conditioning", "open_results", "boom")
+    log.record("Residential Boilers", "fetch_page", "boom", page=7)
+    log.save()
+    assert FailureLog.load(log.path)[1] == {"Air Conditioning": None, "Residential Boilers": PageSet([7])}
+
+
+def test_only_retryable_failures_slow_the_limiter():
+    limiter = AdaptiveRateLimiter(rate=10)
+    policy = RetryPolicy(attempts=3, base_delay=0, max_delay=0)
+
+    def not_found():
+        raise ValueError("HTTP 404")
+
+    with pytest.raises(ValueError):
+        run_step(not_found, policy, limiter, retry_on=(TransientError,))
+    assert limiter.decreases == 0
+
+    def server_error():
+        raise TransientError("HTTP 500")
+
+    with pytest.raises(TransientError):
+        run_step(server_error, policy, limiter, retry_on=(TransientError,))
+    assert limiter.decreases == 3
@@ -0,0 +1,23 @@
+import json
+
+from ahri_retry import FailureLog
+
+
+def test_retry_failed_finalizes_the_whole_run(fixture_site, make_scraper):
+    """Re-running failed pages completes the same stream; outputs cover every category"""
+    first = make_scraper(fixture_site(synthetic_rows=300, faults={"error_rate": 0.2, "seed": 3}), attempts=1)
+    first.run_all_categories()
+    assert first.failure_log
+
+    run_id, page_filter = FailureLog.load(first.failed_pages_file)
+    retry = make_scraper(fixture_site(synthetic_rows=300), run_id=run_id, page_filter=page_filter)
+    retry.run_all_categories()
+    assert not retry.failure_log
+
+    with open(retry.output_file, encoding="utf-8") as f:
+        results = json.load(f)
+    assert list(results["products_by_category"]) == list(retry.categories)
+    assert results["scraping_summary"]["total_products"] == 6 * 300
+    assert sum(results["brand_distribution"].values()) == 6 * 300
+    with open(retry.headers_file, encoding="utf-8") as f:
+        assert set(json.load(f)) == set(retry.categories)
@@ -0,0 +1,71 @@
+import json
+import random
+import re
+
+import pytest
+
+from ahri_catalog_build import build_catalog
+from ahri_dedup_index import MODEL_FIELDS
+from ahri_search_index import SERIES_FIELDS, SearchIndex, delta_decode
+from conftest import RECORDED
+
+
+@pytest.fixture(scope="module")
+def records():
+    with open(RECORDED, encoding="utf-8") as f:
+        return build_catalog(json.load(f))["records"]
+
+
+def linear_search(records, query):
+    """Reference: scan every record's model and series fields (whole tokens for queries under a trigram)"""
+    q = query.lower()
+
+    def matches(value):
+        value = value.lower()
+        if len(q) < 3:
+            return q == value or q in re.split(r"[^0-9a-z]+", value)
+        return q in value
+
+    model_hits, series_hits = set(), set()
+    for record in records:
+        product = record["product"]
+        for hits, fields in ((model_hits, MODEL_FIELDS), (series_hits, SERIES_FIELDS)):
+            if any(isinstance(product.get(f), str) and matches(product[f]) for f in fields):
+                hits.add(record["id"])
+    return sorted(model_hits) + sorted(series_hits - model_hits)
+
+
+def sample_queries(records, count, seed=0):
+    rng = random.Random(seed)
+    values = [record["product"][f] for record in records for f in MODEL_FIELDS + SERIES_FIELDS
+              if isinstance(record["product"].get(f), str) and record["product"][f]]
+    queries = ["zz9q", "-", "*", "A", "heat pump", "ac", "hp", "16"]
+    while len(queries) < count:
+        value = rng.choice(values)
+        start = rng.randrange(len(value))
+        query = value[start:start + rng.randint(1, 8)]
+        queries.append(query.lower() if rng.random() < 0.5 else query)
+    return queries
+
+
+def test_search_matches_a_linear_scan(records):
+    index = SearchIndex.build(records)
+    for query in sample_queries(records, 300):
+        assert index.search(query) == linear_search(records, query), query
+
+
+def test_saved_index_answers_the_same(records, tmp_path):
+    index = SearchIndex.build(records)
+    index.save(str(tmp_path / "search_index.json"))
+    loaded = SearchIndex.load(str(tmp_path / "search_index.json"))
+    for query in sample_queries(records, 50, seed=1):
+        assert loaded.search(query, limit=20) == linear_search(records, query)[:20], query
+
+
+def test_postings_are_delta_encoded_on_disk(records):
+    index = SearchIndex.build(records)
+    data = index.to_json()
+    assert all(len(gram) == 3 for gram in data["postings"])
+    for gram, deltas in list(data["postings"].items())[:200]:
+        assert all(delta > 0 for delta in deltas[1:])
+        assert delta_decode(deltas) == index.postings[gram]
@@ -0,0 +1,41 @@
+import json
+
+from ahri_shards import write_ndjson_shards, write_shards
+from ahri_stream import NDJSONSink, iter_ndjson
+from conftest import RECORDED
+
+
+def test_rescrape_with_same_content_changes_no_shard(tmp_path):
+    with open(RECORDED, encoding="utf-8") as f:
+        data = json.load(f)
+    manifest, rebuilt = write_shards(data, str(tmp_path))
+    assert rebuilt == len(manifest["shards"])
+
+    for products in data["products_by_category"].values():
+        for product in products:
+            product["extraction_timestamp"] = "2030-01-01 00:00:00"
+            product["data_source"] = "AHRI Directory - rescrape"
+    again, rebuilt = write_shards(data, str(tmp_path))
+    assert rebuilt == 0
+    assert again["shards"] == manifest["shards"]
+
+
+def test_stream_shards_match_document_shards(tmp_path):
+    with open(RECORDED, encoding="utf-8") as f:
+        data = json.load(f)
+    stream = tmp_path / "results.ndjson"
+    with NDJSONSink(str(stream)) as sink:
+        # Interleave categories: the stream is in arrival order, not grouped
+        for products in zip(*data["products_by_category"].values()):
+            for product in products:
+                sink.write(product)
+    grouped = {category: [p for p in iter_ndjson(str(stream)) if p["product_category"] == category]
+               for category in data["products_by_category"]}
+
+    from_document, _ = write_shards({"scraping_summary": data["scraping_summary"], "products_by_category": grouped},
+                                    str(tmp_path / "document"))
+    from_stream, rebuilt = write_ndjson_shards(str(stream), data["scraping_summary"], str(tmp_path / "stream"),
+                                               list(data["products_by_category"]))
+    assert rebuilt == len(from_stream["shards"])
+    assert from_stream["shards"] == from_document["shards"]
+    assert from_stream["categories"] == from_document["categories"]
@@ -0,0 +1,84 @@
+import json
+
+from ahri_stream import NDJSONSink, brand_distribution_from_ndjson, finalize_results, iter_ndjson
+
+PRODUCTS = [
+    {"product_category": "Boilers", "AHRI Ref. #": "1", "Brand Name": "ACME"},
+    {"product_category": "Air Conditioning", "AHRI Ref. #": "2", "Brand Name": "ÉLAN"},
+    {"product_category": "Boilers", "AHRI Ref. #": "3", "Brand Name": "ACME"},
+    {"product_category": "Furnaces", "AHRI Ref. #": "4", "Brand Name": "ZED"},
+]
+
+
+def write_stream(path, products, **options):
+    with NDJSONSink(str(path), **options) as sink:
+        for product in products:
+            sink.write(product)
+    return sink
+
+
+def test_finalized_file_matches_the_classic_layout(tmp_path):
+    stream = tmp_path / "results.ndjson"
+    write_stream(stream, PRODUCTS)
+    output = tmp_path / "results.json"
+    brands = brand_distribution_from_ndjson(str(stream), lambda p: p["Brand Name"])
+
+    summary = finalize_results(str(stream), str(output), {"source": "test", "total_products": 99}, brands,
+                               category_order=["Air Conditioning", "Heat Pumps", "Boilers"])
+
+    assert summary == {"total_products": 4, "categories_scraped": 3, "source": "test"}
+    text = output.read_text(encoding="utf-8")
+    expected = {
+        "scraping_summary": summary,
+        "brand_distribution": {"ACME": 2, "ÉLAN": 1, "ZED": 1},
+        "products_by_category": {
+            "Air Conditioning": [PRODUCTS[1]],
+            "Boilers": [PRODUCTS[0], PRODUCTS[2]],
+            "Furnaces": [PRODUCTS[3]],
+        },
+    }
+    # Byte-for-byte what json.dump(indent=2, ensure_ascii=False) wrote before streaming
+    assert text == json.dumps(expected, indent=2, ensure_ascii=False)
+    assert not (tmp_path / "results.json.tmp").exists()
+
+
+def test_empty_stream_still_finalizes(tmp_path):
+    stream = tmp_path / "results.ndjson"
+    write_stream(stream, [])
+    output = tmp_path / "results.json"
+    finalize_results(str(stream), str(output), {})
+    assert json.loads(output.read_text(encoding="utf-8"))["products_by_category"] == {}
+
+
+def test_sink_flushes_periodically(tmp_path):
+    flushes = []
+    stream = tmp_path / "results.ndjson"
+    sink = write_stream(stream, PRODUCTS * 3, flush_every=5, on_flush=lambda: flushes.append(1))
+    # two periodic flushes plus the one on close
+    assert len(flushes) == 3
+    assert sink.total == 12 and sink.category_counts["Boilers"] == 6
+
+
+def test_torn_line_is_skipped_when_reading_and_finalizing(tmp_path):
+    stream = tmp_path / "results.ndjson"
+    write_stream(stream, PRODUCTS)
+    with open(stream, "a", encoding="utf-8") as f:
+        f.write('{"product_category": "Boil')
+    assert len(list(iter_ndjson(str(stream)))) == 4
+
+    output = tmp_path / "results.json"
+    assert finalize_results(str(stream), str(output), {})["total_products"] == 4
+
+
+def test_every_results_page_is_streamed(fixture_site, make_scraper):
+    # 230 rows at 50 per page: the last of five pages is partial
+    scraper = make_scraper(fixture_site(synthetic_rows=230), api_page_size=50)
+    scraper.run_all_categories()
+
+    streamed = list(iter_ndjson(scraper.stream_file))
+    assert len(streamed) == 6 * 230
+    with open(scraper.output_file, encoding="utf-8") as f:
+        results = json.load(f)
+    assert {c: len(p) for c, p in results["products_by_category"].items()} == \
+        {name: 230 for name in scraper.categories}
+    assert [p for ps in results["products_by_category"].values() for p in ps] == streamed
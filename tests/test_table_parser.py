@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from ahri_fixture_server import FixtureDirectory, render_results_page
+from ahri_table_parser import (_TableCollector, api_payload_to_rows, iter_row_products, parse_results_table_html,
+                               parse_tables_html)
+from conftest import RECORDED
+from selenium_scraper import AHRISpecialized6Products
+
+VOLATILE = ("extraction_timestamp", "data_source")
+
+
+def comparable(product):
+    return {k: v for k, v in product.items() if k not in VOLATILE and v != ""}
+
+
+@pytest.fixture(scope="module")
+def recorded():
+    with open(RECORDED, encoding="utf-8") as f:
+        return json.load(f)["products_by_category"]
+
+
+@pytest.fixture(scope="module")
+def directory():
+    return FixtureDirectory(AHRISpecialized6Products().categories, recorded_path=RECORDED)
+
+
+def test_saved_results_pages_parse_to_the_recorded_products(directory, recorded, tmp_path):
+    for program, (name, headers, rows) in directory.tables.items():
+        saved = tmp_path / f"{program}.html"
+        saved.write_text(render_results_page(directory, program, 1, page_size=len(rows)), encoding="utf-8")
+
+        parsed = parse_results_table_html(saved.read_text(encoding="utf-8"))
+        products = list(iter_row_products(name, parsed))
+        assert products
+        assert [comparable(p) for p in products] == [comparable(p) for p in recorded[name]], name
+
+
+def test_nested_tables_count_rows_like_the_browser():
+    html = ("<table><tr><td>outer<table><tr><td>a</td></tr><tr><td>b</td></tr></table></td></tr></table>"
+            "<table><tr><th>only</th></tr></table>")
+    collector = _TableCollector()
+    collector.feed(html)
+    outer, inner, small = collector.tables
+    # querySelectorAll('tr') on the outer table also returns the two nested rows
+    assert len(outer) == 3 and inner == [["a"], ["b"]] and small == [["only"]]
+    assert parse_results_table_html(html) == outer
+    assert parse_tables_html("<p>no tables</p>") == []
+
+
+def test_api_payload_rows_build_the_same_products(directory, recorded):
+    name, headers, rows, total = directory.page("residential-boilers", 1, page_size=10)
+    payload = {"totalCount": total, "results": [dict(zip(headers, row)) for row in rows]}
+    api_rows, api_total = api_payload_to_rows(payload)
+    assert api_total == total
+    products = [comparable(p) for p in iter_row_products(name, api_rows)]
+    assert len(products) == len(rows) > 0
+    assert products == [comparable(p) for p in recorded[name][:10]]